@@ -22,6 +22,7 @@ from typing import List, Dict, Optional
 import yaml
 
 from data.market import MarketData
+from data.history import HistoryDownloader
 from data.features import FeatureEngine
 from strategy.regimes import RegimeDetector, MarketRegime
 from strategy.signal_scorer import SignalScorer
@@ -55,7 +56,7 @@ def run_backtest(
     limit = days * 24  # 1 candle per hour
 
     print(f"Fetching {limit} candles for {symbol}...")
-    candles = market.fetch_ohlcv(symbol, timeframe, limit=min(limit, 1000))
+    candles = HistoryDownloader(market).load_candles(symbol, timeframe, days)
     if not candles or len(candles) < 50:
         print(f"ERROR: Not enough candles ({len(candles) if candles else 0}). Need at least 50.")
         return {"error": "insufficient_data"}
@@ -0,0 +1,154 @@
+"""
+Parity + speed check: IncrementalFeatureEngine vs FeatureEngine.compute_indicators.
+
+For several random-walk series the incremental engine is grown one bar at a
+time (with a few ticks of the forming bar in between), and after every step
+its frame is compared against compute_indicators() over the same bars. Any
+mismatch beyond floating-point rounding fails with the offending column.
+
+A second pass runs the engine as the live cycle does: each call gets the
+latest fixed-size window, so the first bar moves on and the series runs far
+past its seed. Columns fully determined by the window must still match,
+both in the frame and for a bar streamed with update(): OHLCV and VWAP on
+every row, Bollinger and volume MA/ratio once past their 20-bar warm-up
+(compute_indicators() warms them up again at the start of each window). The
+EMA-based columns re-seed the same way and only converge.
+
+Usage:
+    python -m benchmarks.feature_parity
+    python -m benchmarks.feature_parity --series 20 --bars 400 --ticks 3
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.types import CandleBlock
+from data.features import FeatureEngine
+from data.incremental_features import IncrementalFeatureEngine
+
+HOUR_MS = 3600 * 1000
+RTOL = 1e-9
+ATOL = 1e-9
+WINDOW_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'vwap']
+ROLLING_COLUMNS = ['bb_upper', 'bb_lower', 'bb_mid', 'volume_ma', 'volume_ratio']
+ROLLING_WARMUP = 20
+
+
+def random_walk(rng: np.random.Generator, bars: int, start: float) -> CandleBlock:
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    open_ = np.concatenate(([start], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.004, bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(8, 1, bars)
+    volume[rng.random(bars) < 0.02] = 0.0          # the odd empty bar
+    ts = np.arange(bars, dtype=np.int64) * HOUR_MS + 1_700_000_000_000
+    return CandleBlock(ts, open_, high, low, close, volume)
+
+
+def assert_parity(expected: pd.DataFrame, actual: pd.DataFrame, where: str) -> None:
+    assert list(expected.columns) == list(actual.columns), f"{where}: columns differ"
+    assert len(expected) == len(actual), f"{where}: {len(expected)} vs {len(actual)} rows"
+    assert (expected.index == actual.index).all(), f"{where}: index differs"
+    for col in expected.columns:
+        e = expected[col].to_numpy(dtype=np.float64)
+        a = actual[col].to_numpy(dtype=np.float64)
+        if not np.allclose(e, a, rtol=RTOL, atol=ATOL, equal_nan=True):
+            bad = int(np.argmax(~np.isclose(e, a, rtol=RTOL, atol=ATOL, equal_nan=True)))
+            raise AssertionError(f"{where}: {col}[{bad}] expected {e[bad]!r}, got {a[bad]!r}")
+
+
+def check_series(block: CandleBlock, warmup: int, ticks: int, rng: np.random.Generator) -> int:
+    engine = IncrementalFeatureEngine()
+    checks = 0
+    for end in range(warmup, len(block) + 1):
+        window = block[:end]
+        # Ticks of the forming bar must not leak into the committed state
+        for _ in range(ticks):
+            tick = block[:end]
+            tick = CandleBlock(tick.timestamp, tick.open, tick.high.copy(), tick.low.copy(),
+                               tick.close.copy(), tick.volume.copy())
+            tick.close[-1] *= 1 + rng.normal(0, 0.002)
+            tick.high[-1] = max(tick.high[-1], tick.close[-1])
+            tick.low[-1] = min(tick.low[-1], tick.close[-1])
+            tick.volume[-1] *= rng.random()
+            assert_parity(FeatureEngine.compute_indicators(tick),
+                          engine.compute('SYM/USDT', '1h', tick), f"bar {end} tick")
+            checks += 1
+        assert_parity(FeatureEngine.compute_indicators(window),
+                      engine.compute('SYM/USDT', '1h', window), f"bar {end}")
+        checks += 1
+    return checks
+
+
+def check_sliding(block: CandleBlock, window: int) -> int:
+    engine = IncrementalFeatureEngine()
+    checks = 0
+    for start in range(len(block) - window):
+        frame = block[start:start + window]
+        expected, actual = FeatureEngine.compute_indicators(frame), engine.compute('SYM/USDT', '1h', frame)
+        assert_parity(expected[WINDOW_COLUMNS], actual[WINDOW_COLUMNS], f"window at {start}")
+        assert_parity(expected[ROLLING_COLUMNS].iloc[ROLLING_WARMUP:],
+                      actual[ROLLING_COLUMNS].iloc[ROLLING_WARMUP:], f"window at {start}")
+        # Close the forming bar from the stream, then tick the next one
+        engine.update('SYM/USDT', '1h', block[start + window - 1], closed=True)
+        row = engine.update('SYM/USDT', '1h', block[start + window], closed=False)
+        expected = FeatureEngine.compute_indicators(block[start + 1:start + window + 1]).iloc[-1]
+        for col in WINDOW_COLUMNS + ROLLING_COLUMNS:
+            assert np.isclose(expected[col], row[col], rtol=RTOL, atol=ATOL, equal_nan=True), \
+                f"streamed bar after window at {start}: {col} expected {expected[col]!r}, got {row[col]!r}"
+        checks += 2
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental indicator parity check")
+    parser.add_argument("--series", type=int, default=5)
+    parser.add_argument("--bars", type=int, default=260)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--ticks", type=int, default=2)
+    parser.add_argument("--window", type=int, default=200, help="live fetch window for the sliding pass")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    checks = 0
+    for _ in range(args.series):
+        block = random_walk(rng, args.bars, start=float(10 ** rng.uniform(-4, 5)))
+        checks += check_series(block, args.warmup, args.ticks, rng)
+    print(f"parity OK: {checks} frames across {args.series} series (rtol={RTOL})")
+
+    checks, sliding_bars = 0, args.window * 2
+    for _ in range(args.series):
+        block = random_walk(rng, sliding_bars, start=float(10 ** rng.uniform(-4, 5)))
+        checks += check_sliding(block, args.window)
+    print(f"sliding-window parity OK: {checks} frames/streamed bars, "
+          f"{args.window}-bar window over {sliding_bars} bars")
+
+    # Speed: one scan cycle = one new closed bar + a forming bar per symbol
+    symbols, window = 50, 200
+    blocks = [random_walk(rng, window + 1, 100.0) for _ in range(symbols)]
+    engine = IncrementalFeatureEngine()
+    for s, block in enumerate(blocks):
+        engine.compute(f"S{s}/USDT", '1h', block[:window])
+
+    started = time.perf_counter()
+    for block in blocks:
+        FeatureEngine.compute_indicators(block[1:])
+    batch = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for s, block in enumerate(blocks):
+        engine.compute(f"S{s}/USDT", '1h', block[1:])
+    incremental = time.perf_counter() - started
+
+    print(f"\n{symbols} symbols × {window} bars, one new bar per symbol")
+    print(f"  {'compute_indicators':<26} {batch * 1000:8.2f} ms/cycle")
+    print(f"  {'IncrementalFeatureEngine':<26} {incremental * 1000:8.2f} ms/cycle   "
+          f"({batch / incremental:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
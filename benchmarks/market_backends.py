@@ -0,0 +1,115 @@
+"""
+Latency benchmark: blocking MarketData vs AsyncMarketData.
+
+Both backends run against an in-process stand-in exchange that answers
+fetch_ohlcv after a simulated round trip, so the numbers measure how well
+each backend overlaps network waits — not the real venues.
+
+Usage:
+    python -m benchmarks.market_backends
+    python -m benchmarks.market_backends --symbols 200 --latency-ms 120 --with-limits
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from data.async_market import AsyncMarketData
+from data.market import DEFAULT_EXCHANGES, MarketData
+
+HOUR_MS = 3600 * 1000
+NO_LIMITS = {eid: (1e9, 10 ** 9) for eid in DEFAULT_EXCHANGES}
+
+
+def _symbols(n: int) -> List[str]:
+    return [f"C{i:03d}/USDT" for i in range(n)]
+
+
+def _rows(limit: int) -> List[list]:
+    end = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+    return [[end - (limit - 1 - i) * HOUR_MS, 100.0, 101.0, 99.0, 100.5, 1000.0]
+            for i in range(limit)]
+
+
+class StandInExchange:
+    """Blocking stand-in: every request costs one simulated round trip."""
+
+    def __init__(self, symbols: List[str], latency: float):
+        self.symbols = symbols
+        self.latency = latency
+
+    def load_markets(self) -> Dict[str, dict]:
+        return {s: {} for s in self.symbols}
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        time.sleep(self.latency)
+        return _rows(limit)
+
+
+class AsyncStandInExchange(StandInExchange):
+    """Non-blocking stand-in with the same simulated round trip."""
+
+    async def load_markets(self) -> Dict[str, dict]:
+        return {s: {} for s in self.symbols}
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        await asyncio.sleep(self.latency)
+        return _rows(limit)
+
+    async def close(self):
+        pass
+
+
+def _report(name: str, started: float, done_at: List[float]) -> None:
+    wall = time.perf_counter() - started
+    lat = sorted(t - started for t in done_at)
+    p95 = lat[max(0, int(len(lat) * 0.95) - 1)]
+    print(f"{name:<34} wall={wall * 1000:9.1f} ms | time-to-result "
+          f"p50={statistics.median(lat) * 1000:8.1f} ms  p95={p95 * 1000:8.1f} ms  "
+          f"({len(lat)} symbols)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MarketData backend latency benchmark")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8, help="Thread pool size for MarketData")
+    parser.add_argument("--with-limits", action="store_true",
+                        help="Keep the production per-exchange rate limits")
+    args = parser.parse_args()
+
+    symbols = _symbols(args.symbols)
+    latency = args.latency_ms / 1000
+    limits = None if args.with_limits else NO_LIMITS
+
+    sync_md = MarketData('bybit', rate_limits=limits, exchanges={
+        eid: StandInExchange(symbols, latency) for eid in DEFAULT_EXCHANGES})
+    async_md = AsyncMarketData('bybit', rate_limits=limits, exchanges={
+        eid: AsyncStandInExchange(symbols, latency) for eid in DEFAULT_EXCHANGES})
+
+    print(f"{args.symbols} symbols × {args.bars} bars, {args.latency_ms:.0f} ms simulated RTT, "
+          f"rate limits {'on' if args.with_limits else 'off'}\n")
+    try:
+        started, done_at = time.perf_counter(), []
+        for sym in symbols:
+            sync_md.fetch_ohlcv(sym, '1h', limit=args.bars)
+            done_at.append(time.perf_counter())
+        _report("MarketData (sequential)", started, done_at)
+
+        started, done_at = time.perf_counter(), []
+        for _ in sync_md.fetch_ohlcv_many(symbols, '1h', limit=args.bars, max_workers=args.workers):
+            done_at.append(time.perf_counter())
+        _report(f"MarketData.fetch_ohlcv_many ({args.workers}w)", started, done_at)
+
+        started, done_at = time.perf_counter(), []
+        for _ in async_md.fetch_ohlcv_many(symbols, '1h', limit=args.bars):
+            done_at.append(time.perf_counter())
+        _report("AsyncMarketData.fetch_ohlcv_many", started, done_at)
+    finally:
+        async_md.close()
+
+
+if __name__ == "__main__":
+    main()
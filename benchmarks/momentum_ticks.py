@@ -0,0 +1,146 @@
+"""
+Throughput + parity: WebSocketMonitor momentum detection, legacy vs ring buffer.
+
+Ticks come from a recorded file of Binance aggTrade frames, one JSON object
+per line ({"e":"aggTrade","s":"BTCUSDT","p":"...","q":"...","T":...}); trade
+time T is used as the tick clock so runs are reproducible. Without --ticks a
+synthetic recording (random walks with occasional bursts) is written first.
+
+Both implementations see every tick; the momentum signals they emit must be
+identical, then ticks/second is reported for each.
+
+Usage:
+    python -m benchmarks.momentum_ticks
+    python -m benchmarks.momentum_ticks --ticks recorded.jsonl
+    python -m benchmarks.momentum_ticks --symbols 100 --count 500000 --save synthetic.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+
+from data.websocket_monitor import WebSocketMonitor
+
+Tick = Tuple[str, float, float, float]
+
+
+class LegacyMonitor(WebSocketMonitor):
+    """The pre-ring-buffer tick path, kept verbatim for comparison."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.price_history = {s: deque(maxlen=self.HISTORY_SIZE) for s in self.symbols}
+
+    def _on_tick(self, symbol, price, volume, timestamp):
+        history = self.price_history.get(symbol)
+        if history is not None:
+            history.append((price, volume, timestamp))
+            if len(history) >= 10:
+                self._legacy_check(symbol, price, timestamp, history)
+
+    def _legacy_check(self, symbol, current_price, now, history):
+        ticks = list(history)
+        ticks_30s = [t for t in ticks if now - t[2] <= 30]
+        if len(ticks_30s) < 5:
+            return
+        price_30s_ago = ticks_30s[0][0]
+        if price_30s_ago <= 0:
+            return
+        price_change = (current_price - price_30s_ago) / price_30s_ago
+        vol_30s = sum(t[1] for t in ticks_30s)
+        older_ticks = [t for t in ticks if now - t[2] > 30]
+        if len(older_ticks) >= 5:
+            avg_vol_30s = sum(t[1] for t in older_ticks) / len(older_ticks) * len(ticks_30s)
+            volume_ratio = vol_30s / avg_vol_30s if avg_vol_30s > 0 else 1.0
+        else:
+            volume_ratio = 1.0
+        if abs(price_change) >= self.momentum_threshold and volume_ratio >= self.volume_multiplier:
+            self.on_momentum(symbol=self.symbol_map.get(symbol, symbol),
+                             direction="BUY" if price_change > 0 else "SELL",
+                             price=current_price, price_change_pct=price_change,
+                             volume_ratio=volume_ratio, timestamp=now)
+
+
+def write_synthetic(path: str, symbols: int, count: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    names = [f"S{i:03d}USDT" for i in range(symbols)]
+    price = np.full(symbols, 100.0)
+    t = 1_700_000_000_000.0
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            # Mostly quiet; every 5000 ticks one symbol bursts (half the
+            # flow for 400 ticks, drifting and trading larger)
+            bursting = (i // 5000) % symbols
+            burst = i % 5000 < 400 and rng.random() < 0.5
+            s = bursting if burst else rng.integers(0, symbols)
+            price[s] *= 1 + rng.normal(0.0004 if burst else 0.0, 0.0005)
+            qty = rng.lognormal(0, 1) * (5 if burst else 1)
+            t += rng.exponential(20.0)
+            f.write(json.dumps({"e": "aggTrade", "s": names[s], "p": f"{price[s]:.6f}",
+                                "q": f"{qty:.4f}", "T": int(t)}) + "\n")
+
+
+def load_ticks(path: str) -> List[Tick]:
+    ticks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line)
+            if data.get('e') == 'aggTrade':
+                ticks.append((data['s'].lower(), float(data['p']), float(data['q']), data['T'] / 1000))
+    return ticks
+
+
+def run(monitor_cls, ticks: List[Tick]):
+    signals = []
+    symbols = sorted({t[0].upper().replace('USDT', '/USDT') for t in ticks})
+    monitor = monitor_cls(symbols, on_momentum=lambda **kw: signals.append(kw))
+    on_tick = monitor._on_tick
+    started = time.perf_counter()
+    for symbol, price, qty, ts in ticks:
+        on_tick(symbol, price, qty, ts)
+    return time.perf_counter() - started, signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Momentum detection throughput benchmark")
+    parser.add_argument("--ticks", help="Recorded aggTrade JSONL file")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--save", help="Keep the synthetic recording at this path")
+    args = parser.parse_args()
+    logging.getLogger('data.websocket_monitor').setLevel(logging.ERROR)   # one line per signal otherwise
+
+    path = args.ticks
+    if path is None:
+        path = args.save or os.path.join(tempfile.mkdtemp(), "ticks.jsonl")
+        write_synthetic(path, args.symbols, args.count, args.seed)
+    ticks = load_ticks(path)
+    if path != args.ticks and not args.save:
+        os.remove(path)
+
+    legacy_sec, legacy_signals = run(LegacyMonitor, ticks)
+    ring_sec, ring_signals = run(WebSocketMonitor, ticks)
+
+    assert len(legacy_signals) == len(ring_signals), \
+        f"{len(legacy_signals)} legacy signals vs {len(ring_signals)}"
+    for a, b in zip(legacy_signals, ring_signals):
+        assert a['symbol'] == b['symbol'] and a['direction'] == b['direction'] and a['timestamp'] == b['timestamp'], (a, b)
+        assert abs(a['price_change_pct'] - b['price_change_pct']) < 1e-12, (a, b)
+        assert abs(a['volume_ratio'] - b['volume_ratio']) <= 1e-9 * max(1.0, a['volume_ratio']), (a, b)
+    print(f"parity OK: {len(ring_signals)} momentum signals from {len(ticks)} ticks")
+
+    print(f"\n{len(ticks)} ticks, {len({t[0] for t in ticks})} symbols")
+    print(f"  {'deque + list scans':<20} {len(ticks) / legacy_sec:12,.0f} ticks/s")
+    print(f"  {'TickWindow ring':<20} {len(ticks) / ring_sec:12,.0f} ticks/s   "
+          f"({legacy_sec / ring_sec:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
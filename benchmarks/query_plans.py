@@ -0,0 +1,159 @@
+"""
+Query-plan regression check: the store's hot queries must be served by an
+index (storage/migrations.py), not a full table scan or a temp-B-tree sort.
+
+Builds a fresh database through SQLiteStore (schema.sql + migrations),
+seeds some history, runs EXPLAIN QUERY PLAN on each query and exits non-zero
+if any plan scans its table or sorts in a temp B-tree. Also upgrades a
+database in the pre-migration layout and checks it ends up identical.
+
+Usage:
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --verbose
+"""
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from storage.migrations import LATEST_VERSION, schema_version
+from storage.sqlite_store import SQLiteStore
+
+NOW_MS = int(time.time() * 1000)
+DAY_MS = 86400 * 1000
+
+# (name, table, sql, params) — copied from the call sites
+HOT_QUERIES = [
+    ('open positions', 'positions',
+     "SELECT * FROM positions WHERE status = 'OPEN'", ()),
+    ('open position for symbol', 'positions',
+     "SELECT * FROM positions WHERE status = 'OPEN' AND symbol = ?", ('BTC/USDT',)),
+    ('closed trades for a day', 'positions',
+     "SELECT * FROM positions WHERE status = 'CLOSED' AND exit_time >= ? AND exit_time < ?",
+     (NOW_MS - DAY_MS, NOW_MS)),
+    ('weekly report trades', 'positions',
+     "SELECT * FROM positions WHERE status = 'CLOSED' AND exit_time >= ? AND exit_time < ? ORDER BY exit_time",
+     (NOW_MS - 7 * DAY_MS, NOW_MS)),
+    ('last n trades', 'positions',
+     "SELECT * FROM positions WHERE status = 'CLOSED' ORDER BY exit_time DESC LIMIT ?", (10,)),
+    ('dashboard metrics', 'positions',
+     "SELECT pnl, pnl_percent FROM positions WHERE status = 'CLOSED' AND pnl IS NOT NULL "
+     "AND exit_time IS NOT NULL ORDER BY exit_time DESC LIMIT 200", ()),
+    ('edge tracker', 'positions',
+     "SELECT symbol, pnl, pnl_percent FROM positions WHERE status = 'CLOSED' AND pnl IS NOT NULL "
+     "AND exit_time IS NOT NULL AND exit_time > strftime('%s','now','-30 days') * 1000 "
+     "ORDER BY exit_time DESC", ()),
+    ('monte carlo pnl', 'positions',
+     "SELECT pnl_percent FROM positions WHERE status = 'CLOSED' AND pnl_percent IS NOT NULL "
+     "AND pnl_percent != 0", ()),
+    ('trade outcome update', 'trade_features',
+     "UPDATE trade_features SET outcome = ?, pnl = ? WHERE trade_id = ?", (1, 1.0, 't1')),
+    ('training data', 'trade_features',
+     "SELECT * FROM trade_features WHERE outcome IS NOT NULL ORDER BY captured_at", ()),
+    ('training data count', 'trade_features',
+     "SELECT COUNT(*) as cnt FROM trade_features WHERE outcome IS NOT NULL", ()),
+    ('bandit arm stats', 'arm_performance',
+     "SELECT arm_id, r_multiple, COALESCE(regime, 'transition') AS regime FROM arm_performance", ()),
+    ('latest polymarket snapshot', 'polymarket_snapshots',
+     "SELECT * FROM polymarket_snapshots ORDER BY timestamp DESC LIMIT 1", ()),
+]
+
+
+def legacy_schema() -> str:
+    """schema.sql as it was before migrations: no triple-barrier columns (and,
+    as ever, no arm_performance.regime or conservative_mode_state)."""
+    with open('storage/schema.sql', 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    return '\n'.join(line for line in lines if not re.match(r'\s+tb_', line))
+
+
+def seed(conn: sqlite3.Connection, rows: int) -> None:
+    conn.executemany(
+        "INSERT INTO positions (id, symbol, status, entry_time, exit_time, pnl, pnl_percent) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(f"p{i}", f"S{i % 40}/USDT", 'OPEN' if i % 50 == 0 else 'CLOSED', NOW_MS - i * 3600_000,
+          None if i % 50 == 0 else NOW_MS - i * 3600_000 + 1800_000, (i % 7) - 3.0, ((i % 7) - 3.0) / 10)
+         for i in range(rows)])
+    conn.executemany(
+        "INSERT INTO trade_features (id, trade_id, symbol, outcome, captured_at) VALUES (?, ?, ?, ?, ?)",
+        [(f"f{i}", f"p{i}", f"S{i % 40}/USDT", None if i % 10 == 0 else i % 2, i) for i in range(rows)])
+    conn.executemany(
+        "INSERT INTO arm_performance (arm_id, timestamp, r_multiple, pnl_percent, outcome, regime) VALUES (?, ?, ?, ?, ?, ?)",
+        [(i % 6, i, 0.5, 1.0, 'WIN', 'trending_up') for i in range(rows)])
+    conn.executemany(
+        "INSERT INTO polymarket_snapshots (timestamp, market_key, probability, risk_scale) VALUES (?, ?, ?, ?)",
+        [(i, 'fed', 0.5, 1.0) for i in range(rows)])
+    conn.commit()
+    conn.execute("ANALYZE")
+
+
+def plan_problems(conn: sqlite3.Connection, table: str, sql: str, params) -> tuple:
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    problems = [d for d in details
+                if (d.startswith(f"SCAN {table}") and 'INDEX' not in d) or 'TEMP B-TREE' in d]
+    if not any(table in d and 'INDEX' in d for d in details):
+        problems.append(f"no index used on {table}")
+    return details, problems
+
+
+def shape(conn: sqlite3.Connection) -> dict:
+    tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                         "AND name NOT LIKE 'sqlite_%'")]
+    return {
+        'columns': {t: sorted(r[1] for r in conn.execute(f"PRAGMA table_info({t})")) for t in tables},
+        'indexes': sorted(r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-query plan regression check")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    # schema.sql is read relative to the project root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tmp = tempfile.mkdtemp(prefix='query_plans_')
+    failures = 0
+    try:
+        fresh_path = os.path.join(tmp, 'fresh.db')
+        store = SQLiteStore(db_path=fresh_path)
+        conn = store.get_connection()
+        seed(conn, args.rows)
+
+        print(f"schema version {schema_version(conn)} (latest {LATEST_VERSION})")
+        for name, table, sql, params in HOT_QUERIES:
+            details, problems = plan_problems(conn, table, sql, params)
+            failures += bool(problems)
+            print(f"  {'FAIL' if problems else 'ok':4}  {name}")
+            for line in (details if args.verbose or problems else []):
+                print(f"          {line}")
+        conn.close()
+
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        with sqlite3.connect(legacy_path) as legacy:
+            legacy.executescript(legacy_schema())
+            legacy.execute("INSERT INTO arm_performance VALUES (1, 0, 1.5, 2.0, 'WIN')")
+        upgraded = SQLiteStore(db_path=legacy_path).get_connection()
+        fresh = store.get_connection()
+        same = shape(upgraded) == shape(fresh) and schema_version(upgraded) == LATEST_VERSION
+        kept = upgraded.execute("SELECT regime FROM arm_performance").fetchone()[0] == 'transition'
+        upgraded.close()
+        fresh.close()
+        failures += not (same and kept)
+        print(f"  {'ok' if same and kept else 'FAIL':4}  legacy database upgrades to the fresh schema")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if failures:
+        print(f"\n{failures} check(s) failed")
+        sys.exit(1)
+    print("\nall hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
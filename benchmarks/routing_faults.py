@@ -0,0 +1,172 @@
+"""
+Fault injection: exchange routing and circuit breaker under a degraded venue.
+
+MarketData runs against in-process fake exchanges. Bybit (the primary) is
+degraded part-way through — every request stalls for --timeout-ms and then
+fails, like a ccxt RequestTimeout — while Binance and MEXC stay healthy.
+Checks that:
+
+  * the breaker opens after BREAKER_FAILURES failures, so the stall is paid
+    a handful of times instead of once per symbol;
+  * symbols whose sticky source is Bybit fall back to a healthy venue;
+  * unassigned symbols are routed to the fastest healthy venue;
+  * once Bybit recovers and the cooldown passes, a half-open trial closes it.
+
+Breaker cooldowns run on a manual clock, so the breaker stays open through
+the degraded and routing phases however slow the machine is, and recovery is
+checked by advancing the clock past the cooldown.
+
+Usage:
+    python -m benchmarks.routing_faults
+    python -m benchmarks.routing_faults --symbols 60 --timeout-ms 300
+"""
+import argparse
+import time
+from typing import Dict, List
+
+import ccxt
+
+import data.routing as routing
+from data.market import DEFAULT_EXCHANGES, MarketData
+from data.routing import ExchangeRouter
+
+HOUR_MS = 3600 * 1000
+NO_LIMITS = {eid: (1e9, 10 ** 9) for eid in DEFAULT_EXCHANGES}
+
+
+class ManualClock:
+    """Monotonic seconds that only move when advance() is called."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeExchange:
+    """
+    Answers after `latency` seconds; while `down`, stalls `timeout` seconds and
+    raises RequestTimeout. Symbols it does not list raise BadSymbol at once.
+    """
+
+    def __init__(self, eid: str, symbols: List[str], latency: float, timeout: float):
+        self.id = eid
+        self.symbols = symbols
+        self.latency = latency
+        self.timeout = timeout
+        self.down = False
+        self.calls = 0
+
+    def load_markets(self) -> Dict[str, dict]:
+        return {s: {} for s in self.symbols}
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        self.calls += 1
+        if self.down:
+            time.sleep(self.timeout)
+            raise ccxt.RequestTimeout(f"{self.id} fetch_ohlcv timed out")
+        if symbol not in self.symbols:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        time.sleep(self.latency)
+        end = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+        return [[end - (limit - 1 - i) * HOUR_MS, 100.0, 101.0, 99.0, 100.5, 1000.0]
+                for i in range(limit)]
+
+
+def _fetch_all(md: MarketData, symbols: List[str]) -> float:
+    started = time.perf_counter()
+    for sym in symbols:
+        assert len(md.fetch_ohlcv(sym, '1h', limit=20)) == 20, sym
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exchange routing fault injection")
+    parser.add_argument("--symbols", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--timeout-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    latency, timeout = args.latency_ms / 1000, args.timeout_ms / 1000
+
+    symbols = [f"F{i:03d}/USDT" for i in range(args.symbols)]
+    fakes = {
+        'bybit':   FakeExchange('bybit', symbols, latency, timeout),
+        'binance': FakeExchange('binance', symbols, latency * 2, timeout),
+        'mexc':    FakeExchange('mexc', symbols, latency * 4, timeout),
+    }
+    md = MarketData('bybit', rate_limits=NO_LIMITS, exchanges=fakes)
+    clock = ManualClock()
+    md.router = ExchangeRouter(list(DEFAULT_EXCHANGES), clock=clock)
+
+    # 0. Request errors (a symbol no venue lists goes to the primary anyway)
+    #    are answers, not outages — they must not open the breaker
+    for _ in range(routing.BREAKER_FAILURES + 1):
+        try:
+            md._fetch_ohlcv_remote('DELISTED/USDT', '1h', 20)
+        except ccxt.BadSymbol:
+            pass
+    state = md.get_routing_stats()['bybit']
+    print(f"bad symbol: {routing.BREAKER_FAILURES + 1} BadSymbol answers, breaker {state['breaker']}")
+    assert state['breaker'] == 'closed' and state['failures'] == 0, state
+
+    # 1. Healthy: pin the first half of the symbols to bybit
+    pinned, fresh = symbols[:len(symbols) // 2], symbols[len(symbols) // 2:]
+    for sym in pinned:
+        md._ohlcv_source[sym] = 'bybit'
+    healthy = _fetch_all(md, pinned)
+    print(f"healthy:    {len(pinned)} symbols in {healthy * 1000:7.1f} ms")
+
+    # 2. Bybit degrades
+    fakes['bybit'].down = True
+    calls_before = fakes['bybit'].calls
+    degraded = _fetch_all(md, pinned)
+    stalls = fakes['bybit'].calls - calls_before
+    state = md.get_routing_stats()['bybit']
+    print(f"degraded:   {len(pinned)} symbols in {degraded * 1000:7.1f} ms "
+          f"({stalls} bybit stalls, breaker {state['breaker']})")
+    assert state['breaker'] == 'open', state
+    assert stalls == routing.BREAKER_FAILURES, f"{stalls} stalls, expected {routing.BREAKER_FAILURES}"
+    naive = len(pinned) * (timeout + latency)
+    assert degraded < naive / 2, f"{degraded:.2f}s vs {naive:.2f}s without a breaker"
+
+    # 3. Unassigned symbols go to the fastest healthy venue
+    md._assign_ohlcv_sources(fresh)
+    venues = {md._ohlcv_source[sym] for sym in fresh}
+    assert 'bybit' not in venues, venues
+    _fetch_all(md, fresh)
+    order = md.router.order(list(DEFAULT_EXCHANGES))
+    print(f"routing:    fresh symbols → {sorted(venues)}, fallback order {order}")
+    # The clock has not moved, so the breaker is still open and bybit ranks last
+    assert not md.router.is_available('bybit'), md.get_routing_stats()['bybit']
+    assert order == ['binance', 'mexc', 'bybit'], order
+
+    # 4. Recovery: the cooldown passes, bybit is offered again (half-open) and
+    #    a successful trial closes the breaker
+    fakes['bybit'].down = False
+    clock.advance(routing.BREAKER_COOLDOWN_SEC - 1)
+    assert not md.router.is_available('bybit'), "breaker closed before its cooldown"
+    clock.advance(1)
+    state = md.get_routing_stats()['bybit']
+    assert state['breaker'] == 'half-open', state
+    assert md.router.order(list(DEFAULT_EXCHANGES), preferred='bybit')[0] == 'bybit'
+    calls_before = fakes['bybit'].calls
+    _fetch_all(md, pinned[:1])
+    state = md.get_routing_stats()['bybit']
+    print(f"recovered:  bybit breaker {state['breaker']} after {state['breaker_trips']} trip(s), "
+          f"{fakes['bybit'].calls - calls_before} trial request(s)")
+    assert state['breaker'] == 'closed', state
+    assert fakes['bybit'].calls - calls_before == 1
+
+    print("\nper-exchange stats:")
+    for eid, stats in md.get_routing_stats().items():
+        print(f"  {eid:<8} {stats}")
+    print("\nrouting fault injection OK")
+
+
+if __name__ == '__main__':
+    main()
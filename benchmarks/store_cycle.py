@@ -0,0 +1,195 @@
+"""
+Before/after: one job() cycle worth of SQLite calls with connect-per-call
+vs the pooled WAL connections (storage.connection_pool).
+
+The cycle mirrors what run.py and its collaborators issue per scan: daily
+and peak-balance reads, open-position checks, candle save/read/prune for
+every scanned symbol, scan results, a couple of entries (order, position,
+features, committee decision), conservative-mode / bandit / edge-tracker
+reads and an outbox poll. A second pass times it while dashboard-like readers
+poll the same database, each request on a new short-lived thread as Flask's
+threaded dev server does; the pooled run also reports how many connections
+those requests opened.
+
+Usage:
+    python -m benchmarks.store_cycle
+    python -m benchmarks.store_cycle --symbols 50 --cycles 20 --readers 4
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.types import CandleBlock, Order, OrderStatus, OrderType, Position, ScanResult, Side
+from optimize.bandit import Bandit
+from risk.conservative_mode import ConservativeMode
+import storage.edge_tracker as edge_tracker
+from storage.connection_pool import get_pool
+from storage.sqlite_store import SQLiteStore
+
+HOUR_MS = 3600 * 1000
+
+
+class ConnectPerCall:
+    """The previous behaviour: a new rollback-journal connection for every call."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+class ConnectPerCallStore(SQLiteStore):
+    def get_connection(self):
+        return ConnectPerCall(self.db_path).connection()
+
+
+def _candles(rng, bars: int, end_ms: int) -> CandleBlock:
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    rows = [(end_ms - (bars - i) * HOUR_MS, c, c * 1.01, c * 0.99, c, 1000.0) for i, c in enumerate(close)]
+    return CandleBlock.from_ohlcv(rows)
+
+
+def run_cycle(store: SQLiteStore, extras, symbols, rng, cycle: int) -> None:
+    conservative, bandit, edge = extras
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    now_ms = int(time.time() * 1000) + cycle * HOUR_MS
+
+    store.get_daily_stats(today)
+    store.get_daily_trade_stats(today)
+    store.get_peak_balance()
+    store.update_peak_balance(today, 1000.0 + cycle)
+    store.get_latest_polymarket_snapshot()
+    conservative._load_state()
+
+    # Phase A — exits
+    for pos in store.get_open_positions():
+        store.get_latest_candles(pos.symbol, limit=200)
+
+    # Phase B — scan
+    for sym in symbols:
+        store.save_candles(_candles(rng, 3, now_ms), sym)
+        store.get_latest_candles(sym, limit=200)
+        store.prune_candles(sym, keep=1000)
+        store.get_open_position_for_symbol(sym)
+    store.save_scan_results([
+        ScanResult(symbol=sym, score=float(rng.random()), rsi=50.0, atr_pct=1.5, volume_rank=i + 1,
+                   trend='UP', regime='trending_up', scanned_at=now_ms)
+        for i, sym in enumerate(symbols)
+    ])
+    edge.refresh()
+    bandit.update_stats()
+
+    # Entries
+    for sym in symbols[:2]:
+        store.get_open_positions()
+        oid = str(uuid.uuid4())
+        store.save_order(Order(id=oid, symbol=sym, side=Side.BUY, order_type=OrderType.MARKET,
+                               amount=1.0, price=100.0, status=OrderStatus.FILLED, timestamp=now_ms))
+        store.save_position(Position(id=oid, symbol=sym, side=Side.BUY, entry_price=100.0, amount=1.0,
+                                     stop_loss=95.0, take_profit=110.0, entry_time=now_ms))
+        store.save_trade_features({'trade_id': oid, 'symbol': sym, 'price': 100.0})
+        store.save_committee_decision({'symbol': sym, 'approved': True, 'trade_id': oid})
+    store.get_last_n_trades(10)
+    store.update_daily_stats(today, {'end_balance': 1000.0 + cycle})
+    store.get_due_notifications(time.time())
+
+
+def dashboard_request(store: SQLiteStore) -> None:
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    store.get_open_positions()
+    store.get_latest_scan_results()
+    store.get_daily_trade_stats(today)
+    store.get_overall_stats()
+
+
+def dashboard_reader(store: SQLiteStore, stop: threading.Event, counter: list) -> None:
+    while not stop.is_set():
+        request = threading.Thread(target=dashboard_request, args=(store,))
+        request.start()
+        request.join()
+        counter[0] += 1
+
+
+def measure(store_cls, pool_factory, db_path: str, args) -> dict:
+    edge_tracker.get_pool = pool_factory   # EdgeTracker opens its own connections
+    store = store_cls(db_path=db_path)
+    extras = (ConservativeMode(store), Bandit(store), edge_tracker.EdgeTracker(db_path=db_path))
+    symbols = [f"S{i:03d}/USDT" for i in range(args.symbols)]
+    rng = np.random.default_rng(args.seed)
+    run_cycle(store, extras, symbols, rng, 0)   # warm-up: schema, first candles
+
+    cycle_ms = []
+    for c in range(1, args.cycles + 1):
+        started = time.perf_counter()
+        run_cycle(store, extras, symbols, rng, c)
+        cycle_ms.append((time.perf_counter() - started) * 1000)
+
+    opened_before = get_pool(db_path).stats['opened']
+    stop, counter = threading.Event(), [0]
+    readers = [threading.Thread(target=dashboard_reader, args=(store, stop, counter), daemon=True)
+               for _ in range(args.readers)]
+    for t in readers:
+        t.start()
+    contended_ms = []
+    read_started = time.perf_counter()
+    for c in range(args.cycles + 1, 2 * args.cycles + 1):
+        started = time.perf_counter()
+        run_cycle(store, extras, symbols, rng, c)
+        contended_ms.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    for t in readers:
+        t.join()
+    reads_per_sec = counter[0] / (time.perf_counter() - read_started)
+    # Only the pool counts its connections; connect-per-call opens one per store call
+    opened = str(get_pool(db_path).stats['opened'] - opened_before) if store_cls is SQLiteStore else '-'
+
+    with sqlite3.connect(db_path) as conn:
+        journal = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    return {'journal': journal, 'cycle_ms': float(np.median(cycle_ms)),
+            'contended_ms': float(np.median(contended_ms)), 'reads_per_sec': reads_per_sec,
+            'requests': counter[0], 'opened': opened}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store cycle benchmark")
+    parser.add_argument("--symbols", type=int, default=30)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--readers", type=int, default=2, help="dashboard-like reader threads")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    # schema.sql is read relative to the project root
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    tmp = tempfile.mkdtemp(prefix='store_cycle_')
+    try:
+        results = {
+            'connect per call': measure(ConnectPerCallStore, ConnectPerCall, os.path.join(tmp, 'legacy.db'), args),
+            'pooled WAL': measure(SQLiteStore, get_pool, os.path.join(tmp, 'pooled.db'), args),
+        }
+    finally:
+        edge_tracker.get_pool = get_pool
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"\n{args.symbols} symbols, median of {args.cycles} cycles, {args.readers} reader threads")
+    print(f"  {'':18}{'journal':>9}{'cycle ms':>11}{'w/ readers':>12}{'reads/s':>10}{'requests':>10}{'conns opened':>14}")
+    for name, r in results.items():
+        print(f"  {name:18}{r['journal']:>9}{r['cycle_ms']:>11.1f}{r['contended_ms']:>12.1f}"
+              f"{r['reads_per_sec']:>10.0f}{r['requests']:>10}{r['opened']:>14}")
+    base, pooled = results['connect per call'], results['pooled WAL']
+    print(f"\n  speed-up: {base['cycle_ms'] / pooled['cycle_ms']:.1f}x idle, "
+          f"{base['contended_ms'] / pooled['contended_ms']:.1f}x with readers")
+
+
+if __name__ == "__main__":
+    main()
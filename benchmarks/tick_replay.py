@@ -0,0 +1,153 @@
+"""
+Replay recorded WebSocket frames through the momentum pipeline.
+
+Frames from TickRecorder segments are pushed into a WebSocketMonitor shard
+exactly as the socket thread would (a local stand-in replaces the network):
+receive-side enqueue → the shard's parser thread → _on_message → momentum
+detection → a bounded queue.put_nowait mirroring run.py's momentum_queue.
+The recorded receive times drive the monitor's tick clock, so the 30s
+momentum window means the same thing at any replay speed.
+
+Reports, per momentum signal, the latency from the frame being handed to
+the shard until the event sits in the queue (p50/p95/p99/max). Frames carry
+a sequence number (taken as the parser thread picks each frame up, in feed
+order), so many frames sharing one trade timestamp are still told apart.
+
+Replays are paced (default 50x real time) so the figure is pipeline
+latency. --speed max feeds frames as fast as they can be queued: that
+measures throughput, and the per-frame time is dominated by parser backlog.
+
+Usage:
+    python -m benchmarks.tick_replay recordings/ticks/*.seg.gz
+    python -m benchmarks.tick_replay --speed 10 recordings/ticks/*.seg.gz
+    python -m benchmarks.tick_replay --speed max          # throughput / backlog
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.momentum_ticks import write_synthetic
+from data.tick_recorder import read_frames, write_segment
+from data.websocket_monitor import WebSocketMonitor, _StreamConnection
+
+
+class LocalStandIn:
+    """Takes the place of websocket.WebSocketApp: nothing to send to, nothing to close."""
+
+    def send(self, message: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def synthetic_segment(directory: str, symbols: int, count: int, seed: int) -> str:
+    """aggTrade frames from benchmarks.momentum_ticks, stamped with their trade time."""
+    jsonl = os.path.join(directory, "ticks.jsonl")
+    write_synthetic(jsonl, symbols, count, seed)
+    with open(jsonl, encoding="utf-8") as f:
+        frames = [(json.loads(line)['T'] / 1000, line.rstrip('\n')) for line in f]
+    path = os.path.join(directory, "synthetic.seg.gz")
+    write_segment(path, frames)
+    os.remove(jsonl)
+    return path
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def replay(paths: List[str], speed: Optional[float]) -> Dict:
+    frames = list(read_frames(paths))
+    if not frames:
+        raise SystemExit("no frames in the given segments")
+
+    symbols = sorted({json.loads(frame).get('s', '') for _, frame in frames} - {''})
+    momentum_queue: queue.Queue = queue.Queue(maxsize=10_000)
+    handed_at: List[float] = []        # perf_counter at feed(), indexed by frame sequence number
+    parsing = {'seq': -1}              # sequence number of the frame the parser is on
+    latencies: List[float] = []
+
+    def on_momentum(symbol, direction, price, price_change_pct, volume_ratio, timestamp):
+        # Same shape as run.py's on_momentum_detected, plus the triggering frame's seq
+        seq = parsing['seq']
+        try:
+            momentum_queue.put_nowait({'symbol': symbol, 'direction': direction, 'price': price,
+                                       'price_change_pct': price_change_pct,
+                                       'volume_ratio': volume_ratio, 'timestamp': timestamp,
+                                       'seq': seq})
+        except queue.Full:
+            return
+        latencies.append(time.perf_counter() - handed_at[seq])
+
+    monitor = WebSocketMonitor([s.replace('USDT', '/USDT') for s in symbols], on_momentum=on_momentum)
+    deliver = monitor._on_message
+
+    def on_message(ws, message, received_at=None):
+        # The parser drains the shard FIFO, so the n-th frame parsed is the n-th fed
+        parsing['seq'] += 1
+        deliver(ws, message, received_at=received_at)
+
+    monitor._on_message = on_message
+    shard = _StreamConnection(monitor, 0)
+    shard.ws = LocalStandIn()
+    shard.symbols = set(monitor.symbols)
+    shard.start(connect=False)
+
+    first_rx = frames[0][0]
+    started = time.perf_counter()
+    for received_at, frame in frames:
+        if speed:
+            delay = (received_at - first_rx) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        handed_at.append(time.perf_counter())
+        shard.feed(frame, received_at, block=True)
+
+    while not shard._frames.empty():
+        time.sleep(0.001)
+    time.sleep(0.01)
+    shard.stop()
+    wall = time.perf_counter() - started
+
+    return {'frames': len(frames), 'symbols': len(symbols), 'signals': momentum_queue.qsize(),
+            'wall_sec': wall, 'recorded_sec': frames[-1][0] - first_rx, 'latencies': latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ticks through the momentum pipeline")
+    parser.add_argument("segments", nargs="*", help="TickRecorder segment files (*.seg.gz)")
+    parser.add_argument("--speed", default="50", help="1, N (times real time) or max (throughput)")
+    parser.add_argument("--symbols", type=int, default=50, help="Synthetic recording: symbols")
+    parser.add_argument("--count", type=int, default=100_000, help="Synthetic recording: frames")
+    args = parser.parse_args()
+    logging.getLogger('data.websocket_monitor').setLevel(logging.ERROR)
+
+    speed = None if args.speed == 'max' else float(args.speed)
+    paths = args.segments
+    if not paths:
+        paths = [synthetic_segment(tempfile.mkdtemp(), args.symbols, args.count, seed=5)]
+
+    result = replay(paths, speed)
+    lat = result['latencies']
+    print(f"{result['frames']} frames, {result['symbols']} symbols, "
+          f"{result['recorded_sec']:.0f}s recorded → replayed in {result['wall_sec']:.2f}s "
+          f"({'max' if speed is None else f'{speed:g}x'} speed, "
+          f"{result['frames'] / result['wall_sec']:,.0f} frames/s)")
+    print(f"{result['signals']} momentum events queued")
+    if lat:
+        label = ("frame → momentum_queue latency" if speed is not None
+                 else "frame → momentum_queue time incl. parser backlog (not latency)")
+        print(f"{label}: "
+              f"p50={_percentile(lat, 50) * 1e6:,.0f} µs  p95={_percentile(lat, 95) * 1e6:,.0f} µs  "
+              f"p99={_percentile(lat, 99) * 1e6:,.0f} µs  max={max(lat) * 1e6:,.0f} µs")
+
+
+if __name__ == '__main__':
+    main()
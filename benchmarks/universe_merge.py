@@ -0,0 +1,93 @@
+"""
+Parity + speed check: merge_universe vs the per-ticker dict loop DynamicScanner
+used before (split + keyword scan per symbol, two dict lookups per ticker).
+
+Usage:
+    python -m benchmarks.universe_merge
+    python -m benchmarks.universe_merge --bases 3000 --repeat 10
+"""
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from strategy.dynamic_scanner import BANNED_BASES, BANNED_KEYWORDS, EXCHANGE_IDS, merge_universe
+
+
+def legacy_merge(all_tickers: Dict[str, Dict[str, dict]], min_volume: float, max_symbols: int) -> List[dict]:
+    merged: Dict[str, Dict] = {}
+    for eid, tickers in all_tickers.items():
+        for symbol, data in tickers.items():
+            if '/USDT' not in symbol or ':' in symbol:
+                continue
+            base = symbol.split('/')[0]
+            if base in BANNED_BASES or any(kw in base for kw in BANNED_KEYWORDS):
+                continue
+            vol_24h = float(data.get('quoteVolume', 0) or 0)
+            if base not in merged:
+                merged[base] = {'symbol': f"{base}/USDT", 'total_volume': 0, 'exchanges': []}
+            merged[base]['total_volume'] += vol_24h
+            merged[base]['exchanges'].append(eid)
+    candidates = [v for v in merged.values() if v['total_volume'] >= min_volume]
+    candidates.sort(key=lambda x: x['total_volume'], reverse=True)
+    return candidates[:max_symbols]
+
+
+def synthetic_tickers(rng, bases: int) -> Dict[str, Dict[str, dict]]:
+    names = [f"C{i:04d}" for i in range(bases)] + ['USDC', 'BTCUP', 'ETHBULL', 'XRP3L']
+    all_tickers = {}
+    for eid in EXCHANGE_IDS:
+        tickers = {}
+        for name in names:
+            if rng.random() < 0.3:
+                continue   # not listed here
+            vol = None if rng.random() < 0.02 else float(10 ** rng.uniform(3, 9))
+            tickers[f"{name}/USDT"] = {'symbol': f"{name}/USDT", 'quoteVolume': vol, 'last': 1.0}
+            if rng.random() < 0.5:
+                tickers[f"{name}/USDT:USDT"] = {'quoteVolume': vol, 'last': 1.0}
+            if rng.random() < 0.2:
+                tickers[f"{name}/BTC"] = {'quoteVolume': vol, 'last': 1.0}
+        all_tickers[eid] = tickers
+    return all_tickers
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scanner universe merge benchmark")
+    parser.add_argument("--bases", type=int, default=2000)
+    parser.add_argument("--min-volume", type=float, default=1_000_000)
+    parser.add_argument("--max-symbols", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    all_tickers = synthetic_tickers(np.random.default_rng(args.seed), args.bases)
+    rows = sum(len(t) for t in all_tickers.values())
+
+    for max_symbols in (args.max_symbols, args.bases * 2):
+        expected = legacy_merge(all_tickers, args.min_volume, max_symbols)
+        got = merge_universe(all_tickers, args.min_volume, max_symbols)
+        assert [c['symbol'] for c in got] == [c['symbol'] for c in expected], "ranking differs"
+        for e, g in zip(expected, got):
+            assert g['exchanges'] == e['exchanges'], e['symbol']
+            assert abs(g['total_volume'] - e['total_volume']) <= 1e-6 * max(1.0, e['total_volume']), e['symbol']
+    print(f"parity OK: {len(expected)} bases from {rows} tickers")
+
+    legacy = best_of(lambda: legacy_merge(all_tickers, args.min_volume, args.max_symbols), args.repeat)
+    merged = best_of(lambda: merge_universe(all_tickers, args.min_volume, args.max_symbols), args.repeat)
+    print(f"\n{rows} tickers across {len(all_tickers)} exchanges")
+    print(f"  legacy loop      {legacy * 1000:8.2f} ms")
+    print(f"  merge_universe   {merged * 1000:8.2f} ms   ({legacy / merged:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,32 @@
 Multi-platform notification system for Swingbot.
 Supports Discord (webhooks), Telegram (bot API), and custom webhooks.
 Loads settings from config.yaml. If a platform fails, logs error and continues.
+
+With a NotificationOutbox attached, notify_* calls only write to the SQLite
+outbox; a background worker delivers them (batched, rate-limit aware) so a
+slow or hung webhook never holds up the trading loop.
 """
 import json
 import logging
+import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, List, Dict, Any
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+OUTBOX_POLL_SEC = 1.0          # worker wake-up when nothing is enqueued
+OUTBOX_FETCH_LIMIT = 100
+OUTBOX_MAX_ATTEMPTS = 8        # then the message is dropped (logged)
+OUTBOX_MAX_BACKOFF_SEC = 300
+DISCORD_MAX_EMBEDS = 10        # per webhook message
+DISCORD_MAX_EMBED_CHARS = 5500 # Discord caps a message's embeds at 6000 chars
+TELEGRAM_MAX_CHARS = 4000      # Telegram caps a message at 4096
+LATENCY_SAMPLES = 500
+
 
 class Notifier:
     """
@@ -21,9 +36,10 @@ class Notifier:
     If any platform fails, logs the error and continues — never stops the bot.
     """
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, outbox: Optional['NotificationOutbox'] = None):
         self.config = config
         self.notif_config = config.get('notifications', {})
+        self.outbox = outbox
 
     def _get_discord_url(self, channel: str = "general") -> Optional[str]:
         """Get Discord webhook URL for a channel, falling back to general."""
@@ -98,7 +114,13 @@ class Notifier:
 
     def _broadcast(self, discord_payload: dict, telegram_text: str,
                    channel: str = "general") -> None:
-        """Send to all enabled platforms. Never raises."""
+        """Send to all enabled platforms (or queue in the outbox). Never raises."""
+        if self.outbox is not None:
+            try:
+                self.outbox.enqueue(discord_payload, telegram_text, channel)
+                return
+            except Exception as e:
+                logger.error(f"[Notifier] Outbox enqueue failed, sending inline: {e}")
         try:
             self._send_discord(discord_payload, channel)
         except Exception as e:
@@ -353,3 +375,226 @@ class Notifier:
                 return False, f"Webhook connection failed: {e}"
 
         return False, f"Unknown platform: {platform}"
+
+
+class NotificationOutbox:
+    """
+    Persistent notification queue (notification_outbox table) + delivery worker.
+
+    enqueue() writes one row per enabled platform and returns. The worker
+    thread sends due rows over a pooled session: consecutive Discord embeds
+    for a channel are coalesced into one message (up to 10 embeds), Telegram
+    texts into one message, custom webhooks are sent one by one. A 429
+    pauses that platform/channel for its retry_after; other failures back off
+    exponentially. Rows survive restarts until delivered.
+    """
+
+    def __init__(self, store, notifier: Notifier):
+        self.store = store
+        self.notifier = notifier
+        self.session = requests.Session()
+
+        self.delivered = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rate_limited = 0
+        self._latency_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._paused_until: Dict[tuple, float] = {}
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name='notification-outbox')
+        self._thread.start()
+        depth = self.store.get_notification_outbox_stats()['depth']
+        if depth:
+            logger.warning(f"[Notifier] Outbox: {depth} undelivered message(s) from a previous run")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+
+    # ── Enqueue (trading path) ──────────────────────────────────────────
+
+    def enqueue(self, discord_payload: dict, telegram_text: str, channel: str = "general") -> None:
+        n = self.notifier
+        now = time.time()
+        rows = []
+        if n._get_discord_url(channel):
+            rows.append(('discord', channel, json.dumps(discord_payload), now))
+        tg = n.notif_config.get('telegram', {})
+        if tg.get('enabled', False) and tg.get('bot_token') and tg.get('chat_id'):
+            rows.append(('telegram', channel, telegram_text, now))
+        custom = n.notif_config.get('custom', {})
+        if custom.get('enabled', False) and custom.get('webhook_url'):
+            rows.append(('custom', channel, json.dumps(discord_payload), now))
+        if rows:
+            self.store.enqueue_notifications(rows)
+            self._wake.set()
+
+    # ── Worker ──────────────────────────────────────────────────────────
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(OUTBOX_POLL_SEC)
+            self._wake.clear()
+            try:
+                self._deliver_due()
+            except Exception as e:
+                logger.error(f"[Notifier] Outbox delivery error: {e}")
+
+    def _deliver_due(self) -> None:
+        now = time.time()
+        groups: Dict[tuple, List[dict]] = {}
+        for row in self.store.get_due_notifications(now, limit=OUTBOX_FETCH_LIMIT):
+            groups.setdefault((row['platform'], row['channel']), []).append(row)
+
+        for key, rows in groups.items():
+            if self._paused_until.get(key, 0) > now:
+                continue
+            for batch in self._batches(key[0], rows):
+                if not self._send_batch(key, batch):
+                    break   # keep order: later rows wait for the failed one
+
+    def _batches(self, platform: str, rows: List[dict]):
+        """Split rows into deliverable messages: [(payload, [rows])]."""
+        if platform == 'telegram':
+            text, members = "", []
+            for row in rows:
+                if members and len(text) + len(row['payload']) + 2 > TELEGRAM_MAX_CHARS:
+                    yield text, members
+                    text, members = "", []
+                text = f"{text}\n\n{row['payload']}" if text else row['payload']
+                members.append(row)
+            if members:
+                yield text, members
+            return
+
+        if platform == 'custom':
+            for row in rows:
+                yield json.loads(row['payload']), [row]
+            return
+
+        embeds, members, chars = [], [], 0
+        for row in rows:
+            payload = json.loads(row['payload'])
+            row_embeds = payload.get('embeds')
+            if not row_embeds or payload.get('content'):
+                if members:
+                    yield {'embeds': embeds}, members
+                    embeds, members, chars = [], [], 0
+                yield payload, [row]
+                continue
+            size = len(json.dumps(row_embeds, ensure_ascii=False))
+            if members and (len(embeds) + len(row_embeds) > DISCORD_MAX_EMBEDS
+                            or chars + size > DISCORD_MAX_EMBED_CHARS):
+                yield {'embeds': embeds}, members
+                embeds, members, chars = [], [], 0
+            embeds.extend(row_embeds)
+            members.append(row)
+            chars += size
+        if members:
+            yield {'embeds': embeds}, members
+
+    def _send_batch(self, key: tuple, batch) -> bool:
+        payload, rows = batch
+        ids = [r['id'] for r in rows]
+        platform, channel = key
+        try:
+            status, retry_after = self._post(platform, channel, payload)
+        except Exception as e:
+            logger.error(f"[Notifier] {platform} send failed: {e}")
+            status, retry_after = 'error', None
+
+        now = time.time()
+        if status == 'ok':
+            self.store.delete_notifications(ids)
+            self.batches += 1
+            self.delivered += len(rows)
+            self._latency_ms.extend((now - r['created_at']) * 1000 for r in rows)
+            return True
+        if status == 'unconfigured':
+            # Platform disabled since the message was queued
+            self.store.delete_notifications(ids)
+            self.dropped += len(rows)
+            return True
+        if status == 'rate_limited':
+            self.rate_limited += 1
+            self._paused_until[key] = now + retry_after
+            logger.warning(f"[Notifier] {platform}/{channel} rate limited — retrying in {retry_after:.1f}s")
+            return False
+
+        attempts = max(r['attempts'] for r in rows) + 1
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            logger.error(f"[Notifier] {platform}/{channel}: dropping {len(rows)} message(s) after {attempts} attempts")
+            self.store.delete_notifications(ids)
+            self.dropped += len(rows)
+            return True
+        self.store.reschedule_notifications(ids, now + min(OUTBOX_MAX_BACKOFF_SEC, 5 * 2 ** attempts))
+        return False
+
+    def _post(self, platform: str, channel: str, payload):
+        """Returns (status, retry_after_sec): ok / rate_limited / error / unconfigured."""
+        n = self.notifier
+        if platform == 'discord':
+            url = n._get_discord_url(channel)
+            if not url:
+                return 'unconfigured', None
+            resp = self.session.post(url, json=payload, timeout=10)
+        elif platform == 'telegram':
+            tg = n.notif_config.get('telegram', {})
+            if not (tg.get('enabled', False) and tg.get('bot_token') and tg.get('chat_id')):
+                return 'unconfigured', None
+            resp = self.session.post(f"https://api.telegram.org/bot{tg['bot_token']}/sendMessage", json={
+                'chat_id': tg['chat_id'],
+                'text': payload,
+                'parse_mode': 'HTML',
+                'disable_web_page_preview': True,
+            }, timeout=10)
+        else:
+            custom = n.notif_config.get('custom', {})
+            url = custom.get('webhook_url', '')
+            if not custom.get('enabled', False) or not url:
+                return 'unconfigured', None
+            body = payload.get('_raw', payload) if custom.get('format', 'discord') == 'json' else payload
+            resp = self.session.post(url, json=body, timeout=10)
+
+        if resp.status_code in (200, 204):
+            return 'ok', None
+        if resp.status_code == 429:
+            return 'rate_limited', self._retry_after(resp)
+        logger.error(f"[Notifier] {platform} error {resp.status_code}: {resp.text[:200]}")
+        return 'error', None
+
+    @staticmethod
+    def _retry_after(resp) -> float:
+        """Seconds to wait from a 429: Discord `retry_after`, Telegram `parameters.retry_after`, or the header."""
+        try:
+            body = resp.json()
+            value = body.get('retry_after', body.get('parameters', {}).get('retry_after'))
+            if value is not None:
+                return max(0.1, float(value))
+        except Exception:
+            pass
+        try:
+            return max(0.1, float(resp.headers.get('Retry-After', 1)))
+        except (TypeError, ValueError):
+            return 1.0
+
+    # ── Metrics ─────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, oldest pending age and delivery latency (ms) for the dashboard."""
+        outbox = self.store.get_notification_outbox_stats()
+        latencies = sorted(self._latency_ms)
+        pick = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 1) if latencies else None
+        return {
+            'queue_depth': outbox['depth'],
+            'oldest_pending_sec': round(time.time() - outbox['oldest'], 1) if outbox['oldest'] else 0,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'rate_limited': self.rate_limited,
+            'latency_ms': {'p50': pick(0.50), 'p95': pick(0.95), 'max': round(latencies[-1], 1) if latencies else None},
+        }
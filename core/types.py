@@ -1,7 +1,9 @@
+import math
+import numpy as np
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Sequence, Union
 
 class Side(Enum):
     BUY = "BUY"
@@ -48,6 +50,88 @@ class Candle:
     def dt(self) -> datetime:
         return datetime.fromtimestamp(self.timestamp / 1000)
 
+class CandleBlock:
+    """
+    OHLCV bars as contiguous column arrays (int64 timestamps in ms, float64 prices).
+
+    Drop-in for List[Candle] where callers only use len(), truthiness,
+    iteration or indexing: block[-1].close still works (one Candle is built on
+    demand), while slices stay zero-copy views. to_frame() hands the columns
+    straight to pandas instead of building a dict per bar.
+    """
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    @classmethod
+    def empty(cls) -> 'CandleBlock':
+        return cls(*([] for _ in cls.COLUMNS))
+
+    @classmethod
+    def from_ohlcv(cls, rows: Sequence[Sequence]) -> 'CandleBlock':
+        """From ccxt-style [ts, o, h, l, c, v] rows. Missing values become 0.0."""
+        if len(rows) == 0:
+            return cls.empty()
+        arr = np.array(rows, dtype=np.float64)
+        np.nan_to_num(arr, copy=False, nan=0.0)
+        # Column slices of a C-ordered 2-D array are strided; copy each once
+        return cls(arr[:, 0], *(np.ascontiguousarray(arr[:, i]) for i in range(1, 6)))
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candle]) -> 'CandleBlock':
+        if isinstance(candles, CandleBlock):
+            return candles
+        return cls.from_ohlcv([(c.timestamp, c.open, c.high, c.low, c.close, c.volume)
+                               for c in candles])
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Candle, 'CandleBlock']:
+        if isinstance(index, slice):
+            return CandleBlock(*(getattr(self, col)[index] for col in self.COLUMNS))
+        return Candle(int(self.timestamp[index]), float(self.open[index]), float(self.high[index]),
+                      float(self.low[index]), float(self.close[index]), float(self.volume[index]))
+
+    def __iter__(self) -> Iterator[Candle]:
+        for row in zip(*(getattr(self, col).tolist() for col in self.COLUMNS)):
+            yield Candle(*row)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return 'CandleBlock(0 bars)'
+        return f"CandleBlock({len(self)} bars, {self.timestamp[0]}..{self.timestamp[-1]})"
+
+    def append(self, other: Union['CandleBlock', Sequence[Candle]]) -> 'CandleBlock':
+        """
+        New block with `other` appended. Bars of self at or after other's first
+        timestamp are replaced, so re-fetched (previously forming) bars win.
+        """
+        other = CandleBlock.from_candles(other)
+        if not len(other):
+            return self
+        keep = int(np.searchsorted(self.timestamp, other.timestamp[0], side='left'))
+        return CandleBlock(*(np.concatenate((getattr(self, col)[:keep], getattr(other, col)))
+                             for col in self.COLUMNS))
+
+    def to_list(self) -> List[Candle]:
+        return list(self)
+
+    def to_frame(self):
+        """DataFrame indexed by datetime, sharing the price/volume arrays (no per-bar copy)."""
+        import pandas as pd
+        index = pd.to_datetime(self.timestamp, unit='ms')
+        index.name = 'timestamp'
+        return pd.DataFrame({col: getattr(self, col) for col in self.COLUMNS[1:]},
+                            index=index, copy=False)
+
 @dataclass
 class StrategyParams:
     rsi_period: int
@@ -138,3 +222,33 @@ class ScanResult:
     regime: str         # MarketRegime value
     scanned_at: int     # timestamp ms
     breakout_detected: bool = False
+
+@dataclass(frozen=True, slots=True)
+class MarketInfo:
+    """Flattened exchange trading rules for one symbol. 0 = no constraint / unknown."""
+    symbol: str
+    exchange_id: str
+    tick_size: float = 0.0
+    step_size: float = 0.0
+    min_qty: float = 0.0
+    min_notional: float = 0.0
+    max_qty: float = 0.0
+
+    def round_qty(self, qty: float) -> float:
+        """Floor a quantity to the exchange step size."""
+        if self.step_size <= 0:
+            return qty
+        steps = math.floor(qty / self.step_size + 1e-9)
+        return round(steps * self.step_size, _step_decimals(self.step_size))
+
+    def round_price(self, price: float) -> float:
+        """Round a price to the nearest tick."""
+        if self.tick_size <= 0:
+            return price
+        ticks = round(price / self.tick_size)
+        return round(ticks * self.tick_size, _step_decimals(self.tick_size))
+
+
+def _step_decimals(step: float) -> int:
+    """Decimal places to round to after stepping — clears float noise like 0.30000000000000004."""
+    return max(0, -math.floor(math.log10(step))) + 2 if step < 1 else 0
@@ -282,6 +282,12 @@ def create_app(store=None, state=None, config: dict = None):
                 'momentum_signals_today': 0,
                 'last_momentum': '—',
             }),
+            'candle_cache': snapshot.get('candle_cache', {}),
+            'exchange_routing': snapshot.get('exchange_routing', {}),
+            'kline_stream': snapshot.get('kline_stream', {}),
+            'momentum_executor': snapshot.get('momentum_executor', {}),
+            'notifications': snapshot.get('notifications', {}),
+            'ticker_hub': snapshot.get('ticker_hub', {}),
         })
 
     @app.route("/api/positions")
@@ -996,9 +1002,9 @@ def create_app(store=None, state=None, config: dict = None):
             symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT']
 
         try:
-            import ccxt
-            exchange = ccxt.mexc({'enableRateLimit': True})
-            tickers = exchange.fetch_tickers(symbols)
+            from data.ticker_hub import ticker_hub
+            all_tickers = ticker_hub.get('mexc', subscribe=True)
+            tickers = {symbol: all_tickers.get(symbol) for symbol in symbols}
 
             prices = {}
             for symbol, t in tickers.items():
@@ -1326,8 +1332,7 @@ def create_app(store=None, state=None, config: dict = None):
         try:
             if store is not None:
                 # get recent closed trades
-                import sqlite3
-                conn = sqlite3.connect(cfg.get('db_path', 'swingbot.db'))
+                conn = store.get_connection()
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pnl, pnl_percent FROM positions
@@ -1696,10 +1701,9 @@ def create_app(store=None, state=None, config: dict = None):
         to_ms = int(to_dt.timestamp() * 1000)
 
         try:
-            import sqlite3
+            from storage.connection_pool import get_pool
             cfg = _load_config()
-            conn = sqlite3.connect(cfg.get('db_path', 'swingbot.db'))
-            conn.row_factory = sqlite3.Row
+            conn = get_pool(cfg.get('db_path', 'swingbot.db')).connection()
             cur = conn.cursor()
             cur.execute("""
                 SELECT id, symbol, side, entry_price, exit_price, amount,
@@ -1807,7 +1811,8 @@ def create_app(store=None, state=None, config: dict = None):
 
         results = []
         try:
-            tickers = market.exchange.fetch_tickers()
+            from data.ticker_hub import ticker_hub
+            tickers = ticker_hub.get(market.exchange_id, client=market.exchange, subscribe=True)
             for sym in symbols:
                 t = tickers.get(sym, {})
                 if not t:
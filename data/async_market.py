@@ -0,0 +1,255 @@
+"""
+data/async_market.py — asyncio market-data backend (ccxt.async_support).
+
+Same multi-exchange fallback as MarketData, but every request is a coroutine,
+so hundreds of OHLCV / ticker / funding requests can be in flight at once
+instead of one at a time on the trading thread.
+
+The event loop lives in a dedicated daemon thread. Each `*_async` coroutine
+has a blocking sync-facade twin with the MarketData signature, so run.py can
+move call sites over one at a time:
+
+    amd = AsyncMarketData('bybit')
+    candles = amd.fetch_ohlcv('BTC/USDT', '1h', limit=200)          # sync facade
+    for sym, candles in amd.fetch_ohlcv_many(symbols, '1h', 200):    # as completed
+        ...
+
+The SQLite candle cache stays on MarketData; this backend always fetches.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.types import CandleBlock
+from data.market import (
+    DEFAULT_EXCHANGES, DEFAULT_RATE_LIMIT, EXCHANGE_RATE_LIMITS, candles_from_ohlcv,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ccxt.async_support as ccxt_async
+    ASYNC_AVAILABLE = True
+except ImportError:
+    ccxt_async = None
+    ASYNC_AVAILABLE = False
+
+# Upper bound on concurrent requests across all exchanges
+MAX_IN_FLIGHT = 200
+
+
+class AsyncTokenBucket:
+    """Token bucket for coroutines on a single event loop (no locking needed)."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class AsyncMarketData:
+    """
+    Multi-exchange market data on ccxt.async_support, driven by an event loop
+    in its own thread. All public endpoints — no API keys required.
+    """
+
+    def __init__(self, exchange_id: str = 'bybit',
+                 exchanges: Optional[Dict[str, Any]] = None,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_in_flight: int = MAX_IN_FLIGHT):
+        """
+        Args:
+            exchanges: Pre-built async clients keyed by exchange id (stand-ins
+                for benchmarks); by default public ccxt async clients are created.
+            rate_limits: Overrides EXCHANGE_RATE_LIMITS per exchange id.
+            max_in_flight: Concurrent request cap across all exchanges.
+        """
+        if exchanges is None and not ASYNC_AVAILABLE:
+            raise RuntimeError("ccxt.async_support unavailable — pip install ccxt aiohttp")
+
+        self.exchange_id = exchange_id
+        self._exchanges: Dict[str, Any] = {}
+        self._exchange_symbols: Dict[str, set] = {}
+        limits = {**EXCHANGE_RATE_LIMITS, **(rate_limits or {})}
+        self._rate_limits = {
+            eid: limits.get(eid, DEFAULT_RATE_LIMIT)
+            for eid in set(DEFAULT_EXCHANGES) | {exchange_id}
+        }
+        self._max_in_flight = max_in_flight
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True,
+                                        name='async-market-data')
+        self._thread.start()
+
+        # Loop-bound objects must be created on the loop thread
+        self.run(self._setup(exchanges))
+
+    # --- Event loop -------------------------------------------------------
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the market-data loop and block for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _setup(self, exchanges: Optional[Dict[str, Any]]) -> None:
+        self._semaphore = asyncio.Semaphore(self._max_in_flight)
+        self._limiters = {eid: AsyncTokenBucket(*lim) for eid, lim in self._rate_limits.items()}
+
+        if exchanges is not None:
+            self._exchanges = dict(exchanges)
+        else:
+            for eid in DEFAULT_EXCHANGES:
+                try:
+                    self._exchanges[eid] = getattr(ccxt_async, eid)({'enableRateLimit': True})
+                except Exception as e:
+                    logger.warning(f"[AsyncMarket] {eid} init failed: {e}")
+        self.exchange = self._exchanges.get(self.exchange_id)
+
+        await self._load_all_markets()
+
+    async def _load_all_markets(self) -> None:
+        """Load available symbols from all exchanges concurrently."""
+        async def _load(eid, ex):
+            try:
+                markets = await ex.load_markets()
+                self._exchange_symbols[eid] = {s for s in markets.keys() if '/USDT' in s}
+                logger.info(f"[AsyncMarket] {eid}: {len(self._exchange_symbols[eid])} USDT symbols loaded")
+            except Exception as e:
+                logger.warning(f"[AsyncMarket] {eid} market load failed: {e}")
+                self._exchange_symbols[eid] = set()
+
+        await asyncio.gather(*(_load(eid, ex) for eid, ex in self._exchanges.items()))
+
+    async def _call(self, eid: str, method: str, *args, **kwargs):
+        """One rate-limited, concurrency-capped request to an exchange."""
+        async with self._semaphore:
+            await self._limiters[eid].acquire()
+            return await getattr(self._exchanges[eid], method)(*args, **kwargs)
+
+    def _exchanges_for(self, symbol: str) -> List[str]:
+        """Exchanges listing the symbol, in priority order (primary if none do)."""
+        eids = [eid for eid in DEFAULT_EXCHANGES
+                if eid in self._exchanges and symbol in self._exchange_symbols.get(eid, set())]
+        return eids or [self.exchange_id]
+
+    # --- Coroutines -------------------------------------------------------
+
+    async def fetch_ohlcv_async(self, symbol: str, timeframe: str,
+                                limit: int = 500) -> CandleBlock:
+        """Fetch OHLCV from the first exchange (in priority order) that has the symbol."""
+        last_error = None
+        for eid in self._exchanges_for(symbol):
+            try:
+                ohlcv = await self._call(eid, 'fetch_ohlcv', symbol, timeframe, limit=limit)
+                return candles_from_ohlcv(ohlcv)
+            except Exception as e:
+                last_error = e
+                logger.debug(f"[{eid}] async OHLCV failed for {symbol}: {e}")
+
+        logger.error(f"[AsyncMarket] OHLCV failed on all exchanges for {symbol}: {last_error}")
+        raise last_error or Exception(f"No exchange has {symbol}")
+
+    async def fetch_ohlcv_many_async(self, symbols: Iterable[str], timeframe: str,
+                                     limit: int = 500) -> Dict[str, CandleBlock]:
+        """Fetch OHLCV for all symbols concurrently. Failed symbols map to an empty block."""
+        symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(
+            *(self.fetch_ohlcv_async(sym, timeframe, limit) for sym in symbols),
+            return_exceptions=True,
+        )
+        return {sym: (CandleBlock.empty() if isinstance(res, Exception) else res)
+                for sym, res in zip(symbols, results)}
+
+    async def fetch_tickers_async(self, exchange_id: Optional[str] = None) -> Dict[str, dict]:
+        """Full ticker list from one exchange (primary by default)."""
+        return await self._call(exchange_id or self.exchange_id, 'fetch_tickers')
+
+    async def fetch_funding_rate_async(self, symbol: str) -> Optional[float]:
+        """Current perpetual funding rate; None for spot symbols or on failure."""
+        if ':' not in symbol:
+            return None
+        for eid in self._exchanges_for(symbol):
+            try:
+                data = await self._call(eid, 'fetch_funding_rate', symbol)
+                rate = data.get('fundingRate') or data.get('funding_rate')
+                return float(rate) if rate is not None else None
+            except Exception:
+                continue
+        return None
+
+    async def fetch_funding_rates_async(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        symbols = list(dict.fromkeys(symbols))
+        rates = await asyncio.gather(*(self.fetch_funding_rate_async(s) for s in symbols))
+        return dict(zip(symbols, rates))
+
+    # --- Sync facade (MarketData-compatible) ------------------------------
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> CandleBlock:
+        return self.run(self.fetch_ohlcv_async(symbol, timeframe, limit))
+
+    def fetch_ohlcv_many(self, symbols: Iterable[str], timeframe: str,
+                         limit: int = 500) -> Iterator[Tuple[str, CandleBlock]]:
+        """Yields (symbol, candles) in completion order, like MarketData.fetch_ohlcv_many."""
+        futures = {self.submit(self.fetch_ohlcv_async(sym, timeframe, limit)): sym
+                   for sym in dict.fromkeys(symbols)}
+        for future in as_completed(futures):
+            sym = futures[future]
+            try:
+                yield sym, future.result()
+            except Exception as e:
+                logger.error(f"[AsyncMarket] OHLCV fetch failed for {sym}: {e}")
+                yield sym, CandleBlock.empty()
+
+    def fetch_tickers(self, exchange_id: Optional[str] = None) -> Dict[str, dict]:
+        return self.run(self.fetch_tickers_async(exchange_id))
+
+    def fetch_funding_rate(self, symbol: str) -> Optional[float]:
+        return self.run(self.fetch_funding_rate_async(symbol))
+
+    def fetch_funding_rates(self, symbols: Iterable[str]) -> Dict[str, Optional[float]]:
+        return self.run(self.fetch_funding_rates_async(symbols))
+
+    def get_available_exchanges(self, symbol: str) -> List[str]:
+        """Return which exchanges have this symbol."""
+        return [eid for eid, syms in self._exchange_symbols.items() if symbol in syms]
+
+    # --- Shutdown ---------------------------------------------------------
+
+    def close(self) -> None:
+        """Close exchange sessions and stop the loop thread."""
+        async def _close_all():
+            for ex in self._exchanges.values():
+                close = getattr(ex, 'close', None)
+                if close:
+                    try:
+                        await close()
+                    except Exception:
+                        pass
+
+        try:
+            self.run(_close_all(), timeout=10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
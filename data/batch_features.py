@@ -0,0 +1,283 @@
+"""
+data/batch_features.py — compute_indicators() for many symbols at once.
+
+FeatureEngine.compute_indicators() goes through pandas/`ta` one symbol at a
+time, paying Series overhead per indicator per symbol, and its Supertrend is
+a pure-Python loop over bars. Here the scan's candles are stacked into
+(symbols × bars) arrays and every indicator runs as NumPy operations along
+the time axis:
+
+  - EMA / Wilder smoothing (EMA, RSI, MACD, ATR, ADX) are linear recurrences,
+    solved in closed form over blocks of bars with a carried state, so the
+    power terms stay well inside float64 range
+  - rolling means and Bollinger std come from cumulative sums; the StochRSI
+    min/max use sliding-window views
+  - the Supertrend ratchet is path-dependent (each band depends on the
+    previous ratcheted band and close), so it steps through bars once with
+    all symbols advanced together per step
+
+Symbols are grouped by bar count; each group is one set of array operations.
+Results come back as one DataFrame per symbol whose columns are views into
+the group's output array. Output matches compute_indicators() to
+floating-point rounding (benchmarks/batch_features.py checks it).
+"""
+import logging
+from typing import Dict, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.types import Candle, CandleBlock
+from data.incremental_features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Bars per closed-form block in _recurrence (a**-64 stays < 1e7 for a >= 0.8)
+RECURRENCE_BLOCK = 64
+
+
+def _recurrence(x: np.ndarray, a: float, b: float, y0: np.ndarray) -> np.ndarray:
+    """
+    y[:, t] = a * y[:, t-1] + b * x[:, t] along the time axis, with y[:, -1] = y0.
+    Within a block: y_t = a^(t+1)·y_prev + b·a^t·cumsum(x_j·a^-j).
+    """
+    out = np.empty_like(x)
+    y_prev = np.asarray(y0, dtype=np.float64)
+    for start in range(0, x.shape[1], RECURRENCE_BLOCK):
+        xb = x[:, start:start + RECURRENCE_BLOCK]
+        k = np.arange(xb.shape[1], dtype=np.float64)
+        pw = a ** k
+        yb = (a * pw) * y_prev[:, None] + b * pw * np.cumsum(xb / pw, axis=1)
+        out[:, start:start + xb.shape[1]] = yb
+        y_prev = yb[:, -1]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """pandas ewm(alpha, adjust=False, min_periods).mean() per row; leading NaNs skipped."""
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+    filled = x.copy()
+    rows = np.nonzero(first < x.shape[1])[0]
+    seed = np.zeros(x.shape[0])
+    seed[rows] = x[rows, first[rows]]
+    # Leading NaNs take the first valid value, so the recurrence is flat there
+    # and equals that value on the first valid bar — pandas' adjust=False seed
+    filled[~valid] = np.broadcast_to(seed[:, None], x.shape)[~valid]
+    y = _recurrence(filled, 1.0 - alpha, alpha, seed)
+    t = np.arange(x.shape[1])
+    y[t[None, :] < (first + min_periods - 1)[:, None]] = np.nan
+    return y
+
+
+def _ema(x: np.ndarray, window: int) -> np.ndarray:
+    return _ewm(x, 2.0 / (window + 1), window)
+
+
+def _rolling(x: np.ndarray, window: int, fn) -> np.ndarray:
+    """fn over trailing windows (NaN until full; a NaN in the window gives NaN)."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = fn(sliding_window_view(x, window, axis=1), axis=-1)
+    return out
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean from cumulative sums — no per-window reduction."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    nan = np.isnan(x)
+    csum = np.cumsum(np.where(nan, 0.0, x), axis=1)
+    cnan = np.cumsum(nan, axis=1)
+    total = csum[:, window - 1:].copy()
+    total[:, 1:] -= csum[:, :-window]
+    nans = cnan[:, window - 1:].copy()
+    nans[:, 1:] -= cnan[:, :-window]
+    out[:, window - 1:] = np.where(nans == 0, total / window, np.nan)
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int, mean: np.ndarray) -> np.ndarray:
+    """Trailing population std (ddof=0) from cumulative sums of squares."""
+    # Centre each row first so the sums of squares don't swamp the variance
+    anchor = np.nanmean(x, axis=1, keepdims=True)
+    sq = _rolling_mean((x - anchor) ** 2, window)
+    var = sq - (mean - anchor) ** 2
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def _rsi(close: np.ndarray, window: int) -> np.ndarray:
+    diff = np.diff(close, axis=1)
+    up = np.concatenate((np.zeros((close.shape[0], 1)), np.where(diff > 0, diff, 0.0)), axis=1)
+    down = np.concatenate((np.zeros((close.shape[0], 1)), np.where(diff < 0, -diff, 0.0)), axis=1)
+    emaup = _ewm(up, 1.0 / window, window)
+    emadn = _ewm(down, 1.0 / window, window)
+    return np.where(emadn == 0, 100.0, 100.0 - 100.0 / (1.0 + emaup / emadn))
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    tr = high - low
+    prev = close[:, :-1]
+    tr[:, 1:] = np.maximum.reduce([tr[:, 1:], np.abs(high[:, 1:] - prev), np.abs(low[:, 1:] - prev)])
+    return tr
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ta AverageTrueRange: 0.0 before `window` bars, seeded with the mean true range."""
+    tr = _true_range(high, low, close)
+    atr = np.zeros_like(tr)
+    if tr.shape[1] < window:
+        return atr
+    atr[:, window - 1] = tr[:, :window].mean(axis=1)
+    atr[:, window:] = _recurrence(tr[:, window:], (window - 1) / window, 1.0 / window,
+                                  atr[:, window - 1])
+    return atr
+
+
+def _adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ta ADXIndicator.adx(): 0.0 before 2*window-1 bars."""
+    n, w = high.shape[1], window
+    adx = np.zeros_like(high)
+    if n < 2 * w:
+        return adx
+
+    ph, pl, pc = high[:, :-1], low[:, :-1], close[:, :-1]
+    tr = np.maximum(high[:, 1:], pc) - np.minimum(low[:, 1:], pc)     # bars 1..n-1
+    up, down = high[:, 1:] - ph, pl - low[:, 1:]
+    pos = np.where((up > down) & (up > 0), up, 0.0)
+    neg = np.where((down > up) & (down > 0), down, 0.0)
+
+    def smooth(x):
+        # Wilder sum: seeded with the sum of bars 1..w, then s - s/w + x
+        s = np.empty((x.shape[0], n - w))
+        s[:, 0] = x[:, :w].sum(axis=1)
+        s[:, 1:] = _recurrence(x[:, w:], 1.0 - 1.0 / w, 1.0, s[:, 0])
+        return s                                                     # bars w..n-1
+
+    trs, dip, din = smooth(tr), smooth(pos), smooth(neg)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+        dx = np.where(di_pos + di_neg != 0,
+                      100 * np.abs((di_pos - di_neg) / (di_pos + di_neg)), 0.0)
+
+    adx[:, 2 * w - 1] = dx[:, :w].mean(axis=1)
+    if n > 2 * w:
+        adx[:, 2 * w:] = _recurrence(dx[:, w:], (w - 1) / w, 1.0 / w, adx[:, 2 * w - 1])
+    return adx
+
+
+def _supertrend(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                length: int = 10, multiplier: float = 3.0):
+    """data.features._compute_supertrend, stepping all symbols together."""
+    atr = _atr(high, low, close, length)
+    hl2 = (high + low) / 2
+    upper = hl2 + (multiplier * atr)
+    lower = hl2 - (multiplier * atr)
+
+    # Time-major copies so each step touches contiguous rows
+    close_t, upper_t, lower_t = close.T.copy(), upper.T.copy(), lower.T.copy()
+    n = close_t.shape[0]
+    line_t = np.zeros_like(close_t)
+    dir_t = np.ones_like(close_t)
+    for i in range(1, n):
+        prev_close, lo_prev, up_prev = close_t[i - 1], lower_t[i - 1], upper_t[i - 1]
+        lo, up, c = lower_t[i], upper_t[i], close_t[i]
+        # Ratchet bands (only tighten, never widen)
+        np.copyto(lo, lo_prev, where=(lo < lo_prev) & (prev_close > lo_prev))
+        np.copyto(up, up_prev, where=(up > up_prev) & (prev_close < up_prev))
+        # Direction flip
+        bull = np.where(dir_t[i - 1] == 1, c >= lo, c > up)
+        dir_t[i] = np.where(bull, 1.0, -1.0)
+        line_t[i] = np.where(bull, lo, up)
+    line, direction = line_t.T, dir_t.T
+    return line, direction
+
+
+def compute_indicator_arrays(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                             close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """
+    Full compute_indicators() feature set for (symbols × bars) float arrays.
+    Returns (symbols × len(FEATURE_COLUMNS) × bars), feature rows contiguous.
+    """
+    s, n = close.shape
+    out = np.empty((s, len(FEATURE_COLUMNS), n))
+    col = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, arr in (('open', open_), ('high', high), ('low', low),
+                          ('close', close), ('volume', volume)):
+            out[:, col[name]] = arr
+
+        out[:, col['ema_fast']] = _ema(close, 20)
+        out[:, col['ema_slow']] = _ema(close, 50)
+        rsi = _rsi(close, 14)
+        out[:, col['rsi']] = rsi
+        out[:, col['rsi_7']] = _rsi(close, 7)
+
+        macd = _ema(close, 12) - _ema(close, 26)
+        macd_signal = _ema(macd, 9)
+        out[:, col['macd']] = macd
+        out[:, col['macd_signal']] = macd_signal
+        out[:, col['macd_hist']] = macd - macd_signal
+
+        atr = _atr(high, low, close, 14)
+        out[:, col['atr']] = atr
+        out[:, col['atr_percent']] = (atr / close) * 100
+
+        bb_mid = _rolling_mean(close, 20)
+        bb_std = _rolling_std(close, 20, bb_mid)
+        out[:, col['bb_upper']] = bb_mid + 2 * bb_std
+        out[:, col['bb_lower']] = bb_mid - 2 * bb_std
+        out[:, col['bb_mid']] = bb_mid
+
+        volume_ma = _rolling_mean(volume, 20)
+        out[:, col['volume_ma']] = volume_ma
+        out[:, col['volume_ratio']] = volume / np.where(volume_ma == 0, 1.0, volume_ma)
+
+        out[:, col['adx']] = _adx(high, low, close, 14)
+
+        line, direction = _supertrend(high, low, close, length=10, multiplier=3.0)
+        out[:, col['supertrend']] = line
+        out[:, col['supertrend_dir']] = direction
+
+        cum_vol = np.cumsum(volume, axis=1)
+        out[:, col['vwap']] = np.cumsum(close * volume, axis=1) / np.where(cum_vol == 0, np.nan, cum_vol)
+
+        rsi_min = _rolling(rsi, 14, np.min)
+        rsi_range = _rolling(rsi, 14, np.max) - rsi_min
+        ratio = (rsi - rsi_min) / np.where(rsi_range == 0, np.nan, rsi_range)
+        stoch_k = _rolling_mean(ratio, 3) * 100
+        out[:, col['stoch_rsi_k']] = stoch_k
+        out[:, col['stoch_rsi_d']] = _rolling_mean(stoch_k, 3)
+    return out
+
+
+def compute_indicators_batch(
+        candles_by_symbol: Mapping[str, Union[CandleBlock, List[Candle]]]) -> Dict[str, pd.DataFrame]:
+    """
+    compute_indicators() for every symbol in one vectorized pass.
+    Symbols with no candles map to an empty DataFrame.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    groups: Dict[int, List[tuple]] = {}
+    for symbol, candles in candles_by_symbol.items():
+        block = CandleBlock.from_candles(candles)
+        if not len(block):
+            frames[symbol] = pd.DataFrame()
+            continue
+        groups.setdefault(len(block), []).append((symbol, block))
+
+    for members in groups.values():
+        stacked = [np.stack([getattr(b, name) for _, b in members])
+                   for name in ('open', 'high', 'low', 'close', 'volume')]
+        out = compute_indicator_arrays(*stacked)
+        for i, (symbol, block) in enumerate(members):
+            index = pd.to_datetime(block.timestamp, unit='ms')
+            index.name = 'timestamp'
+            # out[i].T is a (bars × features) view — one block, no copy
+            frames[symbol] = pd.DataFrame(out[i].T, index=index,
+                                          columns=list(FEATURE_COLUMNS), copy=False)
+    return frames
@@ -0,0 +1,221 @@
+"""
+data/exchange_registry.py — one shared public ccxt client per exchange.
+
+MarketData, DynamicScanner, the dashboard and the brokers used to build their
+own ccxt clients and each call load_markets() over the network at startup.
+The registry hands out a single public client per exchange id and persists
+load_markets() results to a versioned JSON cache on disk:
+
+  - fresh cache (younger than the TTL) → markets set from disk, no request
+  - stale cache → served immediately, refreshed in a background thread
+  - no usable cache → load_markets() over the network, then written to disk
+
+So a restart after a crash comes up from disk even with no network. Listeners
+registered with add_listener() are called after every markets refresh.
+
+Authenticated clients (brokers) can't be shared, but prime() copies the
+cached markets into them so their first order doesn't trigger a download.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes; older files are ignored
+MARKETS_CACHE_VERSION = 1
+MARKETS_CACHE_DIR = os.path.join('cache', 'markets')
+MARKETS_TTL = 12 * 3600          # refresh markets older than this
+REFRESH_CHECK_INTERVAL = 15 * 60  # background thread wake-up
+
+
+class ExchangeRegistry:
+    """Process-wide registry of shared public ccxt clients. Thread-safe."""
+
+    def __init__(self, cache_dir: str = MARKETS_CACHE_DIR, ttl: float = MARKETS_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._clients: Dict[str, ccxt.Exchange] = {}
+        self._init_locks: Dict[str, threading.Lock] = {}
+        self._loaded_at: Dict[str, float] = {}     # exchange id → markets timestamp
+        self._refreshing: set = set()
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._lock = threading.RLock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def configure(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        if cache_dir is not None:
+            self.cache_dir = cache_dir
+        if ttl is not None:
+            self.ttl = ttl
+
+    # --- Clients ----------------------------------------------------------
+
+    def get(self, exchange_id: str) -> ccxt.Exchange:
+        """Shared public client for exchange_id, with markets loaded."""
+        with self._lock:
+            ex = self._clients.get(exchange_id)
+            if ex is not None:
+                return ex
+            init_lock = self._init_locks.setdefault(exchange_id, threading.Lock())
+
+        # Per-exchange lock: concurrent first calls for one venue wait for a
+        # single load, while other venues load in parallel
+        with init_lock:
+            with self._lock:
+                ex = self._clients.get(exchange_id)
+                if ex is not None:
+                    return ex
+
+            ex = getattr(ccxt, exchange_id)({'enableRateLimit': True})
+            if self._load_from_disk(exchange_id, ex):
+                if self.markets_age(exchange_id) > self.ttl:
+                    self.refresh_async(exchange_id)
+            else:
+                try:
+                    ex.load_markets()
+                    self._loaded_at[exchange_id] = time.time()
+                    self._save_to_disk(exchange_id, ex)
+                except Exception as e:
+                    logger.warning(f"[Registry] {exchange_id} market load failed: {e}")
+
+            with self._lock:
+                self._clients[exchange_id] = ex
+
+        self._ensure_refresh_thread()
+        return ex
+
+    def preload(self, exchange_ids: List[str]) -> Dict[str, ccxt.Exchange]:
+        """Create/load several exchanges in parallel (cold start without a disk cache)."""
+        with ThreadPoolExecutor(max_workers=max(1, len(exchange_ids))) as pool:
+            futures = {eid: pool.submit(self.get, eid) for eid in exchange_ids}
+        clients = {}
+        for eid, future in futures.items():
+            try:
+                clients[eid] = future.result()
+            except Exception as e:
+                logger.warning(f"[Registry] {eid} init failed: {e}")
+        return clients
+
+    def prime(self, ex: ccxt.Exchange, exchange_id: str) -> None:
+        """Copy cached markets into a client the registry doesn't own (e.g. a broker's)."""
+        try:
+            shared = self.get(exchange_id)
+            if shared.markets:
+                ex.set_markets(shared.markets, shared.currencies)
+        except Exception as e:
+            logger.debug(f"[Registry] Could not prime {exchange_id} client: {e}")
+
+    def add_listener(self, callback: Callable[[str, dict], None]) -> None:
+        """callback(exchange_id, markets) runs after each background refresh."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def markets_age(self, exchange_id: str) -> Optional[float]:
+        loaded_at = self._loaded_at.get(exchange_id)
+        return time.time() - loaded_at if loaded_at else None
+
+    # --- Background refresh -----------------------------------------------
+
+    def refresh(self, exchange_id: str) -> bool:
+        """Reload markets on a scratch client, then swap them into the shared one."""
+        with self._lock:
+            if exchange_id in self._refreshing:
+                return False
+            self._refreshing.add(exchange_id)
+        try:
+            scratch = getattr(ccxt, exchange_id)({'enableRateLimit': True})
+            markets = scratch.load_markets()
+            shared = self._clients.get(exchange_id)
+            if shared is not None:
+                shared.set_markets(scratch.markets, scratch.currencies)
+            self._loaded_at[exchange_id] = time.time()
+            self._save_to_disk(exchange_id, scratch)
+            logger.info(f"[Registry] {exchange_id}: {len(markets)} markets refreshed")
+        except Exception as e:
+            logger.warning(f"[Registry] {exchange_id} markets refresh failed: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._refreshing.discard(exchange_id)
+
+        for callback in list(self._listeners):
+            try:
+                callback(exchange_id, markets)
+            except Exception as e:
+                logger.error(f"[Registry] Markets listener failed: {e}")
+        return True
+
+    def refresh_async(self, exchange_id: str) -> None:
+        threading.Thread(target=self.refresh, args=(exchange_id,), daemon=True,
+                         name=f'markets-refresh-{exchange_id}').start()
+
+    def _ensure_refresh_thread(self) -> None:
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True,
+                                                    name='markets-refresh')
+            self._refresh_thread.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(REFRESH_CHECK_INTERVAL)
+            for eid in list(self._clients):
+                age = self.markets_age(eid)
+                if age is None or age > self.ttl:
+                    self.refresh(eid)
+
+    # --- Disk cache -------------------------------------------------------
+
+    def _cache_path(self, exchange_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{exchange_id}.json")
+
+    def _load_from_disk(self, exchange_id: str, ex: ccxt.Exchange) -> bool:
+        """Set markets from disk. Stale-but-valid files are used too (refreshed later)."""
+        path = self._cache_path(exchange_id)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if (payload.get('version') != MARKETS_CACHE_VERSION
+                    or payload.get('ccxt_version') != ccxt.__version__):
+                logger.info(f"[Registry] {exchange_id} markets cache is from another version — ignored")
+                return False
+            ex.set_markets(payload['markets'], payload.get('currencies'))
+            self._loaded_at[exchange_id] = payload['saved_at']
+            age_h = (time.time() - payload['saved_at']) / 3600
+            logger.info(f"[Registry] {exchange_id}: {len(ex.markets)} markets from disk ({age_h:.1f}h old)")
+            return True
+        except Exception as e:
+            logger.warning(f"[Registry] {exchange_id} markets cache unreadable: {e}")
+            return False
+
+    def _save_to_disk(self, exchange_id: str, ex: ccxt.Exchange) -> None:
+        """Atomic write so a crash mid-save never leaves a truncated cache."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path(exchange_id)
+            tmp = f"{path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': MARKETS_CACHE_VERSION,
+                    'ccxt_version': ccxt.__version__,
+                    'saved_at': self._loaded_at.get(exchange_id, time.time()),
+                    'markets': ex.markets,
+                    'currencies': ex.currencies,
+                }, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"[Registry] Could not write {exchange_id} markets cache: {e}")
+
+
+# Global singleton
+registry = ExchangeRegistry()
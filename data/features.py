@@ -2,21 +2,19 @@ import pandas as pd
 import numpy as np
 import ta
 import logging
-from typing import List, Dict
-from core.types import Candle
+from typing import List, Dict, Union
+from core.types import Candle, CandleBlock
 
 logger = logging.getLogger(__name__)
 
 
 class FeatureEngine:
     @staticmethod
-    def compute_indicators(candles: List[Candle]) -> pd.DataFrame:
+    def compute_indicators(candles: Union[CandleBlock, List[Candle]]) -> pd.DataFrame:
         if not candles:
             return pd.DataFrame()
 
-        df = pd.DataFrame([vars(c) for c in candles])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
+        df = CandleBlock.from_candles(candles).to_frame()
 
         # ── Trend ────────────────────────────────────────────────────────
         df['ema_fast'] = ta.trend.EMAIndicator(close=df['close'], window=20).ema_indicator()
@@ -78,14 +76,16 @@ class FeatureEngine:
         return df
 
     @staticmethod
-    def compute_dynamic_features(candles: List[Candle], params: Dict[str, int]) -> pd.DataFrame:
+    def compute_dynamic_features(candles: Union[CandleBlock, List[Candle]],
+                                 params: Dict[str, int]) -> pd.DataFrame:
         """
         Compute features based on dynamic params from the bandit arm.
         """
         if not candles:
             return pd.DataFrame()
 
-        df = pd.DataFrame([vars(c) for c in candles])
+        block = CandleBlock.from_candles(candles)
+        df = pd.DataFrame({col: getattr(block, col) for col in CandleBlock.COLUMNS}, copy=False)
 
         df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=params.get('rsi_period', 14)).rsi()
         df['ema_fast'] = ta.trend.EMAIndicator(close=df['close'], window=params.get('ema_fast', 20)).ema_indicator()
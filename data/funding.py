@@ -0,0 +1,99 @@
+"""
+data/funding.py — in-memory funding-rate snapshot, refreshed in bulk.
+
+Funding only settles every 8h, yet the entry loop asked an exchange for each
+candidate's rate one symbol at a time. The snapshot pulls every perp's rate
+from a venue with one fetch_funding_rates() call and serves lookups from a
+dict until the venue's snapshot expires. Venues without a bulk endpoint fall
+back to per-symbol requests, cached with the same TTL. Both go through
+MarketData's rate-limited, health-tracked request path.
+
+The cycle calls prefetch() for its shortlist before the entry loop, so the
+loop's get() calls are served from memory.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from data.market import DEFAULT_EXCHANGES
+
+logger = logging.getLogger(__name__)
+
+FUNDING_TTL_SEC = 900
+# After a failed bulk refresh, don't retry that venue for this long
+FUNDING_RETRY_SEC = 60
+
+
+class FundingRateSnapshot:
+    """Funding rates keyed by exchange, each venue's snapshot expiring after `ttl` seconds."""
+
+    def __init__(self, market, ttl: float = FUNDING_TTL_SEC):
+        self.market = market
+        self.ttl = ttl
+        self._rates: Dict[str, Dict[str, float]] = {}        # exchange → {symbol: rate}
+        self._expires: Dict[str, float] = {}                 # exchange → monotonic deadline
+        self._single: Dict[str, Tuple[Optional[float], float]] = {}  # symbol → (rate, deadline)
+        self._no_bulk = set()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'bulk_refreshes': 0, 'single_fetches': 0}
+
+    def get(self, symbol: str) -> Optional[float]:
+        """Current funding rate for a perp symbol (None for spot or if unavailable)."""
+        if ':' not in symbol:
+            return None
+        listed = set(self.market.get_available_exchanges(symbol))
+        for eid in DEFAULT_EXCHANGES:
+            if eid not in listed or eid in self._no_bulk:
+                continue
+            rates = self._venue_rates(eid)
+            if rates is not None and symbol in rates:
+                self.stats['hits'] += 1
+                return rates[symbol]
+        return self._single_rate(symbol)
+
+    def prefetch(self, symbols: Iterable[str]) -> None:
+        """Refresh whatever these symbols' lookups need (expired snapshots only)."""
+        for symbol in symbols:
+            self.get(symbol)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._expires.clear()
+            self._single.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, 'symbols': sum(len(r) for r in self._rates.values())}
+
+    def _venue_rates(self, exchange_id: str) -> Optional[Dict[str, float]]:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._expires.get(exchange_id, 0.0):
+                return self._rates.get(exchange_id)
+            try:
+                rates = self.market.fetch_funding_rates(exchange_id)
+            except NotImplementedError:
+                self._no_bulk.add(exchange_id)
+                return None
+            except Exception as e:
+                logger.debug(f"[Funding] Bulk refresh failed on {exchange_id}: {e}")
+                self._expires[exchange_id] = now + FUNDING_RETRY_SEC
+                return self._rates.get(exchange_id)   # Stale beats nothing
+            self.stats['bulk_refreshes'] += 1
+            self._rates[exchange_id] = rates
+            self._expires[exchange_id] = now + self.ttl
+            logger.debug(f"[Funding] {exchange_id}: {len(rates)} rates refreshed")
+            return rates
+
+    def _single_rate(self, symbol: str) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._single.get(symbol)
+            if cached and now < cached[1]:
+                self.stats['hits'] += 1
+                return cached[0]
+            self.stats['single_fetches'] += 1
+            rate = self.market.fetch_funding_rate(symbol)
+            self._single[symbol] = (rate, now + self.ttl)
+            return rate
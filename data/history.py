@@ -0,0 +1,321 @@
+"""
+data/history.py — paginated bulk OHLCV downloader + columnar candle archive.
+
+A single fetch_ohlcv call returns at most ~1000 bars, so "90-day" backtests
+on 1h bars silently ran on ~41 days. HistoryDownloader pages through `since`
+cursors until the requested range is covered and stores the result per
+symbol/timeframe as a structured NumPy array:
+
+    cache/history/<timeframe>/<BASE>_<QUOTE>.<n>.npy   ts, open, high, low, close, volume
+    cache/history/<timeframe>/<BASE>_<QUOTE>.json      data file, source exchange, gaps, version
+
+Reads are memory-mapped (np.load(mmap_mode='r')), so multi-year, multi-symbol
+research only touches the pages it slices. Because a mapped file can't be
+replaced on Windows, a save never overwrites the data file: it writes the
+next generation <n> and then switches the sidecar to it. Older generations
+are deleted once nothing maps them any more.
+
+Downloads are resumable: the archive is checkpointed every few pages and
+always stays contiguous — new bars are paged forward from the last stored
+bar, older bars are paged backward from the first — so a rerun after an
+interruption only fetches what is still missing. Bars are de-duplicated on
+timestamp and gaps are reported (exchange outages can't be filled).
+
+A symbol's history always comes from one exchange (volumes differ per venue);
+the next exchange in priority order is only used when the first has nothing.
+
+Usage:
+    python -m data.history --symbols BTC/USDT ETH/USDT --timeframe 1h --days 365
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from typing import List, Optional, Tuple
+
+import ccxt
+import numpy as np
+
+from core.types import CandleBlock
+from data.market import DEFAULT_EXCHANGES, MarketData
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes; older archives are re-downloaded
+HISTORY_VERSION = 1
+HISTORY_DIR = os.path.join('cache', 'history')
+
+CANDLE_DTYPE = np.dtype([
+    ('ts', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+PAGE_LIMIT = 1000        # bars per request (Bybit/Binance/MEXC kline max)
+CHECKPOINT_PAGES = 10    # pages between archive writes
+PAGE_RETRIES = 3         # attempts per page before giving up on the exchange
+
+
+def timeframe_ms(timeframe: str) -> int:
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def rows_to_array(ohlcv: List[list]) -> np.ndarray:
+    """Raw ccxt OHLCV rows → CANDLE_DTYPE array (None volumes become 0)."""
+    arr = np.empty(len(ohlcv), dtype=CANDLE_DTYPE)
+    for i, row in enumerate(ohlcv):
+        arr[i] = (int(row[0]), float(row[1]), float(row[2]), float(row[3]),
+                  float(row[4]), float(row[5] or 0))
+    return arr
+
+
+def merge_bars(*arrays: np.ndarray) -> np.ndarray:
+    """Concatenate, sort by timestamp and drop duplicates (later arrays win)."""
+    arrays = [a for a in arrays if a is not None and len(a)]
+    if not arrays:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    merged = np.concatenate(arrays)
+    # Reverse so np.unique's first occurrence is the newest copy of each bar
+    _, idx = np.unique(merged['ts'][::-1], return_index=True)
+    return merged[::-1][idx]
+
+
+def find_gaps(ts: np.ndarray, tf_ms: int) -> List[Tuple[int, int]]:
+    """(last_bar_before_gap, first_bar_after_gap) pairs where bars are missing."""
+    if len(ts) < 2:
+        return []
+    breaks = np.nonzero(np.diff(ts) > tf_ms)[0]
+    return [(int(ts[i]), int(ts[i + 1])) for i in breaks]
+
+
+def to_candles(arr: np.ndarray) -> CandleBlock:
+    """Archive slice → CandleBlock for FeatureEngine.compute_indicators()."""
+    return CandleBlock(arr['ts'], arr['open'], arr['high'], arr['low'], arr['close'], arr['volume'])
+
+
+class HistoryArchive:
+    """Per-symbol/timeframe .npy files with a JSON sidecar."""
+
+    def __init__(self, root: str = HISTORY_DIR):
+        self.root = root
+
+    def _base(self, symbol: str, timeframe: str) -> str:
+        safe = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.root, timeframe, safe)
+
+    @staticmethod
+    def _data_path(base: str, meta: dict) -> str:
+        # Archives written before generations existed use <base>.npy
+        return os.path.join(os.path.dirname(base), meta.get('file') or os.path.basename(base) + '.npy')
+
+    def read_meta(self, symbol: str, timeframe: str) -> dict:
+        try:
+            with open(self._base(symbol, timeframe) + '.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            return meta if meta.get('version') == HISTORY_VERSION else {}
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, symbol: str, timeframe: str, since: Optional[int] = None,
+             until: Optional[int] = None) -> np.ndarray:
+        """Memory-mapped bars in [since, until]; empty array if nothing stored."""
+        meta = self.read_meta(symbol, timeframe)
+        path = self._data_path(self._base(symbol, timeframe), meta)
+        if not meta or not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        try:
+            arr = np.load(path, mmap_mode='r')
+        except Exception as e:
+            logger.warning(f"[History] {symbol} {timeframe} archive unreadable: {e}")
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        if arr.dtype != CANDLE_DTYPE:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        lo = 0 if since is None else int(np.searchsorted(arr['ts'], since, side='left'))
+        hi = len(arr) if until is None else int(np.searchsorted(arr['ts'], until, side='right'))
+        return arr[lo:hi]
+
+    def save(self, symbol: str, timeframe: str, arr: np.ndarray, meta: dict) -> None:
+        """
+        Write the bars to a new generation file, then atomically switch the
+        sidecar to it. An interrupted save leaves the previous generation in
+        place, and files other readers still have mapped are never touched.
+        """
+        base = self._base(symbol, timeframe)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        generation = int(self.read_meta(symbol, timeframe).get('generation', 0)) + 1
+        name = f"{os.path.basename(base)}.{generation}.npy"
+        np.save(os.path.join(os.path.dirname(base), name), np.ascontiguousarray(arr, dtype=CANDLE_DTYPE))
+        with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump({**meta, 'version': HISTORY_VERSION, 'symbol': symbol, 'timeframe': timeframe,
+                       'bars': int(len(arr)), 'file': name, 'generation': generation}, f)
+        os.replace(base + '.json.tmp', base + '.json')
+        self._remove_old_generations(base, keep=name)
+
+    @staticmethod
+    def _remove_old_generations(base: str, keep: str) -> None:
+        folder, stem = os.path.split(base)
+        pattern = re.compile(re.escape(stem) + r'(\.\d+)?\.npy')
+        for name in os.listdir(folder):
+            if name != keep and pattern.fullmatch(name):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    pass   # Still mapped by a reader (Windows) — removed by a later save
+
+
+class HistoryDownloader:
+    """Pages exchange OHLCV into a HistoryArchive."""
+
+    def __init__(self, market: Optional[MarketData] = None,
+                 archive: Optional[HistoryArchive] = None):
+        self.market = market or MarketData()
+        self.archive = archive or HistoryArchive()
+
+    def download(self, symbol: str, timeframe: str, since: int,
+                 until: Optional[int] = None) -> np.ndarray:
+        """
+        Make sure [since, until] is in the archive and return it (memory-mapped).
+        Only ranges not already stored are fetched.
+        """
+        tf = timeframe_ms(timeframe)
+        until = until if until is not None else int(time.time() * 1000)
+        # The current bar is still forming; the archive only keeps closed bars
+        until = min(until, (int(time.time() * 1000) // tf) * tf - tf)
+
+        meta = self.archive.read_meta(symbol, timeframe)
+        stored = self.archive.load(symbol, timeframe)
+        sources = self._sources(symbol, meta.get('source'))
+
+        for eid in sources:
+            meta = {**meta, 'source': eid}
+            try:
+                if len(stored):
+                    if since < int(stored['ts'][0]) and not meta.get('listing_reached'):
+                        stored = self._page_backward(symbol, timeframe, eid, since, stored, meta)
+                    if until > int(stored['ts'][-1]):
+                        stored = self._page_forward(symbol, timeframe, eid,
+                                                    int(stored['ts'][-1]) + tf, until, stored, meta)
+                else:
+                    stored = self._page_forward(symbol, timeframe, eid, since, until, stored, meta)
+            except Exception as e:
+                logger.warning(f"[History] {symbol} {timeframe} on {eid} stopped: {e}")
+            if len(stored):
+                break
+            meta.pop('source', None)
+
+        if len(stored):
+            gaps = find_gaps(np.asarray(stored['ts']), tf)
+            if gaps:
+                logger.warning(f"[History] {symbol} {timeframe}: {len(gaps)} gap(s) in "
+                               f"{len(stored)} bars (first after {gaps[0][0]})")
+            lo = int(np.searchsorted(stored['ts'], since, side='left'))
+            hi = int(np.searchsorted(stored['ts'], until, side='right'))
+            return stored[lo:hi]
+        return stored
+
+    def load_candles(self, symbol: str, timeframe: str, days: int) -> CandleBlock:
+        """Last `days` of closed bars as Candles, downloading whatever is missing."""
+        since = int(time.time() * 1000) - days * 86_400_000
+        return to_candles(self.download(symbol, timeframe, since))
+
+    # --- Paging -----------------------------------------------------------
+
+    def _sources(self, symbol: str, sticky: Optional[str]) -> List[str]:
+        """Exchanges to try, stored source first; otherwise listing exchanges by priority."""
+        if sticky:
+            return [sticky]
+        listed = set(self.market.get_available_exchanges(symbol))
+        order = [self.market.exchange_id] + [e for e in DEFAULT_EXCHANGES if e != self.market.exchange_id]
+        return [e for e in order if e in listed] or [self.market.exchange_id]
+
+    def _fetch_page(self, symbol: str, timeframe: str, eid: str, since: int) -> np.ndarray:
+        last_error = None
+        for attempt in range(PAGE_RETRIES):
+            try:
+                rows = self.market.fetch_ohlcv_page(symbol, timeframe, since, PAGE_LIMIT, eid)
+                return rows_to_array(rows or [])
+            except Exception as e:
+                last_error = e
+                time.sleep(2 ** attempt)
+        raise last_error
+
+    def _page_forward(self, symbol: str, timeframe: str, eid: str, cursor: int,
+                      until: int, stored: np.ndarray, meta: dict) -> np.ndarray:
+        tf = timeframe_ms(timeframe)
+        pending, pages = [], 0
+        while cursor <= until:
+            page = self._fetch_page(symbol, timeframe, eid, cursor)
+            page = page[(page['ts'] >= cursor) & (page['ts'] <= until)]
+            if not len(page):
+                # Nothing at the cursor yet: either the symbol listed later
+                # (jump ahead one page) or we're at the head of the data.
+                if not len(stored) and not pending and cursor + PAGE_LIMIT * tf <= until:
+                    cursor += PAGE_LIMIT * tf
+                    continue
+                break
+            pending.append(page)
+            cursor = int(page['ts'][-1]) + tf
+            pages += 1
+            if pages % CHECKPOINT_PAGES == 0:
+                stored = self._checkpoint(symbol, timeframe, stored, pending, meta)
+                pending = []
+        return self._checkpoint(symbol, timeframe, stored, pending, meta)
+
+    def _page_backward(self, symbol: str, timeframe: str, eid: str, since: int,
+                       stored: np.ndarray, meta: dict) -> np.ndarray:
+        """Extend history backwards one window at a time, keeping the archive contiguous."""
+        tf = timeframe_ms(timeframe)
+        pending, pages = [], 0
+        end = int(stored['ts'][0])          # exclusive
+        while end > since:
+            start = max(since, end - PAGE_LIMIT * tf)
+            page = self._fetch_page(symbol, timeframe, eid, start)
+            page = page[(page['ts'] >= start) & (page['ts'] < end)]
+            if not len(page):
+                meta['listing_reached'] = True   # nothing older exists
+                break
+            pending.append(page)
+            end = int(page['ts'][0])
+            pages += 1
+            if pages % CHECKPOINT_PAGES == 0:
+                stored = self._checkpoint(symbol, timeframe, stored, pending, meta)
+                pending = []
+        return self._checkpoint(symbol, timeframe, stored, pending, meta)
+
+    def _checkpoint(self, symbol: str, timeframe: str, stored: np.ndarray,
+                    pending: List[np.ndarray], meta: dict) -> np.ndarray:
+        if not pending and not meta.get('listing_reached'):
+            return stored
+        merged = merge_bars(np.asarray(stored), *pending)
+        if len(merged):
+            gaps = find_gaps(merged['ts'], timeframe_ms(timeframe))
+            self.archive.save(symbol, timeframe, merged, {**meta, 'gaps': len(gaps)})
+            logger.info(f"[History] {symbol} {timeframe}: {len(merged)} bars archived")
+        return self.archive.load(symbol, timeframe) if len(merged) else merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download OHLCV history into the local archive')
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT'])
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--exchange', default='bybit', help='Preferred exchange')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    downloader = HistoryDownloader(MarketData(exchange_id=args.exchange))
+    since = int(time.time() * 1000) - args.days * 86_400_000
+    for symbol in args.symbols:
+        bars = downloader.download(symbol, args.timeframe, since)
+        meta = downloader.archive.read_meta(symbol, args.timeframe)
+        print(f"{symbol:<14} {len(bars):>7} bars  source={meta.get('source', '-')}  "
+              f"gaps={meta.get('gaps', 0)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+data/htf.py — higher-timeframe trend derived from base-timeframe bars.
+
+The MTF gate used to download ~220 4h candles per candidate and loop over all
+of them for EMA200. Here each symbol keeps its HTF EMA over *closed* HTF bars;
+the scan's own 1h candles are bucketed into 4h/1d bars and folded into the
+EMA as buckets close. The network is only touched to backfill — the first
+time a symbol is seen, or when the base bars no longer reach back to the
+last folded bucket (bot restarted, symbol dropped out of the scan).
+
+Buckets align to multiples of the HTF period since the epoch, which is how
+exchanges align 4h and 1d klines (00:00 UTC).
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import ccxt
+import numpy as np
+
+from core.types import CandleBlock
+
+logger = logging.getLogger(__name__)
+
+FLAT = {'trend': 'flat', 'ema_value': 0, 'close': 0, 'above_ema': None}
+
+# Same ±0.2% dead band as MarketData.fetch_htf_trend
+TREND_BAND = 0.002
+
+
+@dataclass
+class _HtfState:
+    ema: float            # EMA over closed HTF bars
+    last_bucket: int      # open time of the last closed HTF bar folded in
+    last_close: float     # its close
+
+
+def _tf_ms(timeframe: str) -> int:
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+class HtfTrendService:
+    """Per-symbol HTF EMA kept up to date from base bars; backfills via MarketData."""
+
+    def __init__(self, market):
+        self.market = market
+        self._states: Dict[Tuple[str, str, int], _HtfState] = {}
+        self._lock = threading.Lock()
+        self.stats = {'derived': 0, 'backfills': 0, 'fallbacks': 0}
+
+    def trend(self, symbol: str, base_candles: Optional[CandleBlock], base_timeframe: str,
+              timeframe: str = '4h', ema_period: int = 200) -> Dict:
+        """
+        Same result shape as MarketData.fetch_htf_trend:
+        trend ('up'|'down'|'flat'), ema_value, close, above_ema, prev_close.
+        `base_candles` are the most recent base bars (last one may be forming).
+        """
+        try:
+            base_ms, htf_ms = _tf_ms(base_timeframe), _tf_ms(timeframe)
+        except Exception:
+            base_ms = htf_ms = 0
+        if not base_candles or base_ms <= 0 or htf_ms <= base_ms or htf_ms % base_ms:
+            # Can't aggregate (e.g. base is already 4h) — plain fetch
+            self._count('fallbacks')
+            return self.market.fetch_htf_trend(symbol, timeframe, ema_period)
+
+        key = (symbol, timeframe, ema_period)
+        try:
+            with self._lock:
+                state = self._states.get(key)
+                if state is None or not self._advance(state, base_candles, base_ms, htf_ms, ema_period):
+                    state = self._backfill(symbol, timeframe, ema_period, htf_ms)
+                    if state is None:
+                        self._states.pop(key, None)
+                        return dict(FLAT)
+                    self._states[key] = state
+                    # Backfill may end before the base bars do — fold the rest in
+                    self._advance(state, base_candles, base_ms, htf_ms, ema_period)
+                else:
+                    self._count('derived')
+                return self._result(state, float(base_candles.close[-1]), ema_period)
+        except Exception as e:
+            logger.warning(f"[HTF] Trend derivation failed for {symbol}: {e}")
+            return dict(FLAT)
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == symbol]:
+                    del self._states[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, 'symbols': len(self._states)}
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _count(self, key: str) -> None:
+        self.stats[key] += 1
+
+    @staticmethod
+    def _advance(state: _HtfState, base: CandleBlock, base_ms: int, htf_ms: int,
+                 ema_period: int) -> bool:
+        """
+        Fold HTF buckets that closed since state.last_bucket into the EMA.
+        Returns False when the base bars can't continue the series (gap or
+        not reaching back far enough) and a backfill is needed.
+        """
+        ts = base.timestamp
+        latest_bucket = int(ts[-1]) - int(ts[-1]) % htf_ms
+        if latest_bucket <= state.last_bucket + htf_ms:
+            return True  # Still inside the bucket after the last folded one
+
+        # Buckets state.last_bucket+H .. latest_bucket-H are closed; each
+        # needs its final base bar (open at bucket + H - base) to be present.
+        wanted = np.arange(state.last_bucket + 2 * htf_ms - base_ms, latest_bucket, htf_ms,
+                           dtype=np.int64)
+        idx = np.searchsorted(ts, wanted)
+        if (idx >= len(ts)).any() or (ts[np.minimum(idx, len(ts) - 1)] != wanted).any():
+            return False
+
+        k = 2.0 / (ema_period + 1)
+        ema = state.ema
+        for price in base.close[idx]:
+            ema = float(price) * k + ema * (1 - k)
+        state.ema = ema
+        state.last_bucket = int(wanted[-1]) + base_ms - htf_ms
+        state.last_close = float(base.close[idx[-1]])
+        return True
+
+    def _backfill(self, symbol: str, timeframe: str, ema_period: int,
+                  htf_ms: int) -> Optional[_HtfState]:
+        """Seed the EMA from downloaded HTF bars, exactly as fetch_htf_trend does."""
+        self._count('backfills')
+        candles = self.market.fetch_ohlcv(symbol, timeframe, limit=max(ema_period + 10, 220))
+        now_ms = int(time.time() * 1000)
+        closed = candles[:-1] if len(candles) and int(candles.timestamp[-1]) + htf_ms > now_ms else candles
+        if len(closed) < ema_period - 1:
+            return None
+
+        closes = closed.close
+        k = 2.0 / (ema_period + 1)
+        ema = float(closes[0])
+        for price in closes[1:]:
+            ema = float(price) * k + ema * (1 - k)
+        return _HtfState(ema=ema, last_bucket=int(closed.timestamp[-1]),
+                         last_close=float(closes[-1]))
+
+    @staticmethod
+    def _result(state: _HtfState, price: float, ema_period: int) -> Dict:
+        # The forming HTF bar trades at the latest base close
+        k = 2.0 / (ema_period + 1)
+        ema = price * k + state.ema * (1 - k)
+        if price > ema * (1 + TREND_BAND):
+            trend = 'up'
+        elif price < ema * (1 - TREND_BAND):
+            trend = 'down'
+        else:
+            trend = 'flat'
+        return {
+            'trend': trend,
+            'ema_value': round(ema, 6),
+            'close': price,
+            'above_ema': price > ema,
+            'prev_close': state.last_close,
+        }
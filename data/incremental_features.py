@@ -0,0 +1,467 @@
+"""
+data/incremental_features.py — streaming version of FeatureEngine.compute_indicators.
+
+compute_indicators() recomputes every indicator over the whole window for
+every symbol, every cycle. IncrementalFeatureEngine keeps the recursive state
+per (symbol, timeframe) instead — EMA / Wilder accumulators, short rolling
+windows for Bollinger, volume MA and StochRSI, and the Supertrend ratchet —
+so each new bar costs O(1):
+
+  - a bar that has CLOSED is committed to the state
+  - the still-forming last bar is evaluated on a throwaway copy of the state,
+    so the next tick (or the final close) starts from the committed state again
+
+The formulas follow the `ta` implementations FeatureEngine uses, including
+their warm-up conventions (ATR/ADX are 0.0 before they have enough bars, the
+others NaN). Fed the same bars from the same first bar, the output matches
+compute_indicators() to floating-point rounding — see benchmarks/feature_parity.py.
+Once a series has run past the fetch window the recursive values (EMAs,
+Wilder averages) keep their full history, where compute_indicators() would
+re-seed them at the start of each window; the difference decays
+geometrically. VWAP does not decay, so it is never cumulative here: a
+frame's VWAP is anchored at the frame's first bar, as compute_indicators()
+anchors it, and a streamed bar's VWAP covers the last fetch window of bars.
+"""
+import logging
+import math
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.types import Candle, CandleBlock
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+# Output columns, in compute_indicators() order
+FEATURE_COLUMNS = (
+    'open', 'high', 'low', 'close', 'volume',
+    'ema_fast', 'ema_slow', 'rsi', 'rsi_7',
+    'macd', 'macd_signal', 'macd_hist',
+    'atr', 'atr_percent', 'bb_upper', 'bb_lower', 'bb_mid',
+    'volume_ma', 'volume_ratio', 'adx',
+    'supertrend', 'supertrend_dir', 'vwap', 'stoch_rsi_k', 'stoch_rsi_d',
+)
+
+# Committed rows kept per series (the frame never needs more than the fetch window)
+MAX_ROWS = 500
+
+
+class _Indicator:
+    """Base: clone() copies the state so the forming bar can be evaluated without committing."""
+    __slots__ = ()
+
+    def clone(self):
+        new = object.__new__(type(self))
+        for name in type(self).__slots__:
+            value = getattr(self, name)
+            setattr(new, name, value.copy() if isinstance(value, deque) else value)
+        return new
+
+
+class _Ewm(_Indicator):
+    """pandas ewm(alpha, adjust=False, min_periods=window).mean(); leading NaNs skipped."""
+    __slots__ = ('alpha', 'min_periods', 'value', 'count')
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if x != x:
+            return NAN
+        if self.count == 0:
+            self.value = x
+        else:
+            self.value = ((1.0 - self.alpha) * self.value + self.alpha * x) / ((1.0 - self.alpha) + self.alpha)
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+def _ema(window: int) -> _Ewm:
+    return _Ewm(2.0 / (window + 1), window)
+
+
+class _Rsi(_Indicator):
+    """ta RSIIndicator: Wilder-smoothed up/down moves, 100 when there are no down moves."""
+    __slots__ = ('up', 'down', 'prev_close')
+
+    def __init__(self, window: int):
+        self.up = _Ewm(1.0 / window, window)
+        self.down = _Ewm(1.0 / window, window)
+        self.prev_close = NAN
+
+    def clone(self):
+        new = _Indicator.clone(self)
+        new.up, new.down = self.up.clone(), self.down.clone()
+        return new
+
+    def update(self, close: float) -> float:
+        diff = close - self.prev_close          # NaN on the first bar → 0 up / 0 down
+        self.prev_close = close
+        up = self.up.update(diff if diff > 0 else 0.0)
+        down = self.down.update(-diff if diff < 0 else 0.0)
+        if down != down:
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+
+class _Atr(_Indicator):
+    """ta AverageTrueRange: 0.0 until `window` bars, then Wilder smoothing of the true range."""
+    __slots__ = ('window', 'count', 'tr_sum', 'value', 'prev_close')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.tr_sum = 0.0
+        self.value = 0.0
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        pc = self.prev_close
+        self.prev_close = close
+        tr = high - low if pc != pc else max(high - low, abs(high - pc), abs(low - pc))
+        self.count += 1
+        if self.count < self.window:
+            self.tr_sum += tr
+            return 0.0
+        if self.count == self.window:
+            self.value = (self.tr_sum + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        return self.value
+
+
+class _Adx(_Indicator):
+    """ta ADXIndicator.adx(): 0.0 until 2*window-1 bars."""
+    __slots__ = ('window', 't', 'trs', 'dip', 'din', 'dx_sum', 'adx',
+                 'prev_high', 'prev_low', 'prev_close')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.t = 0
+        self.trs = self.dip = self.din = 0.0
+        self.dx_sum = 0.0
+        self.adx = 0.0
+        self.prev_high = self.prev_low = self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        t, w = self.t, self.window
+        self.t += 1
+        ph, pl, pc = self.prev_high, self.prev_low, self.prev_close
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        if t == 0:
+            return 0.0
+
+        tr = max(high, pc) - min(low, pc)
+        up, down = high - ph, pl - low
+        pos = up if (up > down and up > 0) else 0.0
+        neg = down if (down > up and down > 0) else 0.0
+        if t <= w:
+            self.trs += tr
+            self.dip += pos
+            self.din += neg
+        else:
+            self.trs = self.trs - self.trs / float(w) + tr
+            self.dip = self.dip - self.dip / float(w) + pos
+            self.din = self.din - self.din / float(w) + neg
+        if t < w:
+            return 0.0
+
+        di_pos = 100 * (self.dip / self.trs) if self.trs != 0 else 0.0
+        di_neg = 100 * (self.din / self.trs) if self.trs != 0 else 0.0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0.0
+
+        if t < 2 * w - 1:
+            self.dx_sum += dx
+            return 0.0
+        if t == 2 * w - 1:
+            self.adx = (self.dx_sum + dx) / w
+        else:
+            self.adx = ((self.adx * (w - 1)) + dx) / float(w)
+        return self.adx
+
+
+class _Rolling(_Indicator):
+    """Fixed-size window; NaN until full or while it holds a NaN (pandas min_periods=window)."""
+    __slots__ = ('values', 'nans')
+
+    def __init__(self, window: int):
+        self.values = deque(maxlen=window)
+        self.nans = 0
+
+    def push(self, x: float) -> bool:
+        if len(self.values) == self.values.maxlen and self.values[0] != self.values[0]:
+            self.nans -= 1
+        self.values.append(x)
+        if x != x:
+            self.nans += 1
+        return len(self.values) == self.values.maxlen and self.nans == 0
+
+    def mean(self, x: float) -> float:
+        return math.fsum(self.values) / len(self.values) if self.push(x) else NAN
+
+    def mean_std(self, x: float) -> Tuple[float, float]:
+        """Mean and population std (ddof=0)."""
+        if not self.push(x):
+            return NAN, NAN
+        n = len(self.values)
+        mean = math.fsum(self.values) / n
+        return mean, math.sqrt(math.fsum((v - mean) ** 2 for v in self.values) / n)
+
+    def min_max(self, x: float) -> Tuple[float, float]:
+        if not self.push(x):
+            return NAN, NAN
+        return min(self.values), max(self.values)
+
+
+class _Vwap(_Indicator):
+    """Volume-weighted close over the last `window` bars (ring buffers of volume and close×volume)."""
+    __slots__ = ('volumes', 'values')
+
+    def __init__(self, window: int):
+        self.volumes = deque(maxlen=window)
+        self.values = deque(maxlen=window)
+
+    def resize(self, window: int) -> None:
+        if window != self.volumes.maxlen:
+            self.volumes = deque(self.volumes, maxlen=window)
+            self.values = deque(self.values, maxlen=window)
+
+    def update(self, close: float, volume: float) -> float:
+        self.volumes.append(volume)
+        self.values.append(close * volume)
+        total = math.fsum(self.volumes)
+        return math.fsum(self.values) / total if total != 0 else NAN
+
+
+class _Supertrend(_Indicator):
+    """data.features._compute_supertrend: ATR bands that only tighten, flip on a close through them."""
+    __slots__ = ('atr', 'multiplier', 'upper', 'lower', 'prev_close', 'direction', 'started')
+
+    def __init__(self, length: int, multiplier: float):
+        self.atr = _Atr(length)
+        self.multiplier = multiplier
+        self.upper = self.lower = self.prev_close = NAN
+        self.direction = 1.0
+        self.started = False
+
+    def clone(self):
+        new = _Indicator.clone(self)
+        new.atr = self.atr.clone()
+        return new
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        atr = self.atr.update(high, low, close)
+        hl2 = (high + low) / 2
+        upper = hl2 + (self.multiplier * atr)
+        lower = hl2 - (self.multiplier * atr)
+
+        if not self.started:
+            # First bar: no previous bands to ratchet against
+            self.started = True
+            self.upper, self.lower, self.prev_close = upper, lower, close
+            return 0.0, 1.0
+
+        if lower < self.lower and self.prev_close > self.lower:
+            lower = self.lower
+        if upper > self.upper and self.prev_close < self.upper:
+            upper = self.upper
+
+        if self.direction == 1:
+            if close < lower:
+                self.direction, line = -1.0, upper
+            else:
+                line = lower
+        else:
+            if close > upper:
+                self.direction, line = 1.0, lower
+            else:
+                line = upper
+
+        self.upper, self.lower, self.prev_close = upper, lower, close
+        return line, self.direction
+
+
+class _SeriesState:
+    """All indicator state for one (symbol, timeframe)."""
+
+    INDICATORS = ('ema_fast', 'ema_slow', 'rsi', 'rsi_7', 'macd_fast', 'macd_slow',
+                  'macd_signal', 'atr', 'bb', 'volume_ma', 'adx', 'supertrend',
+                  'vwap', 'stoch_window', 'stoch_k', 'stoch_d')
+
+    def __init__(self, max_rows: int = MAX_ROWS, _empty: bool = False):
+        self.rows: deque = deque(maxlen=max_rows)
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        if _empty:
+            return
+        self.ema_fast, self.ema_slow = _ema(20), _ema(50)
+        self.rsi, self.rsi_7 = _Rsi(14), _Rsi(7)
+        self.macd_fast, self.macd_slow, self.macd_signal = _ema(12), _ema(26), _ema(9)
+        self.atr = _Atr(14)
+        self.bb = _Rolling(20)
+        self.volume_ma = _Rolling(20)
+        self.adx = _Adx(14)
+        self.supertrend = _Supertrend(10, 3.0)
+        self.vwap = _Vwap(max_rows)          # resized to the fetch window by compute()
+        self.stoch_window = _Rolling(14)
+        self.stoch_k = _Rolling(3)
+        self.stoch_d = _Rolling(3)
+
+    def clone_indicators(self) -> '_SeriesState':
+        """Copy of the indicator state (not the committed rows) for evaluating a forming bar."""
+        new = _SeriesState(max_rows=1, _empty=True)
+        new.last_ts = self.last_ts
+        for name in self.INDICATORS:
+            setattr(new, name, getattr(self, name).clone())
+        return new
+
+    def step(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> tuple:
+        """Advance every indicator by one bar; returns (ts, *FEATURE_COLUMNS values)."""
+        ema_fast = self.ema_fast.update(c)
+        ema_slow = self.ema_slow.update(c)
+        rsi = self.rsi.update(c)
+        rsi_7 = self.rsi_7.update(c)
+
+        fast, slow = self.macd_fast.update(c), self.macd_slow.update(c)
+        macd = fast - slow
+        macd_signal = self.macd_signal.update(macd)
+        macd_hist = macd - macd_signal
+
+        atr = self.atr.update(h, l, c)
+        atr_percent = (atr / c) * 100 if c else NAN
+
+        bb_mid, std = self.bb.mean_std(c)
+        bb_upper, bb_lower = bb_mid + 2 * std, bb_mid - 2 * std
+
+        volume_ma = self.volume_ma.mean(v)
+        volume_ratio = v / (volume_ma if volume_ma != 0 else 1)
+
+        adx = self.adx.update(h, l, c)
+        supertrend, supertrend_dir = self.supertrend.update(h, l, c)
+
+        vwap = self.vwap.update(c, v)
+
+        rsi_min, rsi_max = self.stoch_window.min_max(rsi)
+        rsi_range = rsi_max - rsi_min
+        ratio = (rsi - rsi_min) / rsi_range if rsi_range != 0 else NAN
+        stoch_k = self.stoch_k.mean(ratio) * 100
+        stoch_d = self.stoch_d.mean(stoch_k)
+
+        self.last_ts = ts
+        return (ts, o, h, l, c, v, ema_fast, ema_slow, rsi, rsi_7, macd, macd_signal, macd_hist,
+                atr, atr_percent, bb_upper, bb_lower, bb_mid, volume_ma, volume_ratio, adx,
+                supertrend, supertrend_dir, vwap, stoch_k, stoch_d)
+
+    def commit(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> tuple:
+        if self.first_ts is None:
+            self.first_ts = ts
+        row = self.step(ts, o, h, l, c, v)
+        self.rows.append(row)
+        return row
+
+    def peek(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> tuple:
+        return self.clone_indicators().step(ts, o, h, l, c, v)
+
+
+_VWAP = 1 + FEATURE_COLUMNS.index('vwap')
+_CLOSE, _VOLUME = 1 + FEATURE_COLUMNS.index('close'), 1 + FEATURE_COLUMNS.index('volume')
+
+
+def _frame(rows: List[tuple]) -> pd.DataFrame:
+    arr = np.array(rows, dtype=np.float64)
+    # compute_indicators() anchors VWAP at the frame's first bar
+    cum_vol = np.cumsum(arr[:, _VOLUME])
+    cum_vp = np.cumsum(arr[:, _CLOSE] * arr[:, _VOLUME])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        arr[:, _VWAP] = np.where(cum_vol != 0, cum_vp / cum_vol, np.nan)
+    index = pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms')
+    index.name = 'timestamp'
+    return pd.DataFrame(arr[:, 1:], index=index, columns=list(FEATURE_COLUMNS))
+
+
+class IncrementalFeatureEngine:
+    """
+    Per-(symbol, timeframe) streaming indicators. Thread-safe.
+
+        engine = IncrementalFeatureEngine()
+        df = engine.compute(sym, '1h', candles)   # drop-in for FeatureEngine.compute_indicators
+        row = engine.update(sym, '1h', candle, closed=False)   # one tick of the forming bar
+    """
+
+    def __init__(self, max_rows: int = MAX_ROWS):
+        self.max_rows = max_rows
+        self._states: Dict[Tuple[str, str], _SeriesState] = {}
+        self._lock = threading.Lock()
+
+    def compute(self, symbol: str, timeframe: str,
+                candles: Union[CandleBlock, List[Candle]]) -> pd.DataFrame:
+        """
+        Indicator frame for `candles` (last bar treated as forming), same rows and
+        columns as compute_indicators(). Only bars closed since the previous call
+        are stepped; the series is re-seeded if the bars don't continue it or
+        reach further back than its first bar.
+        """
+        block = CandleBlock.from_candles(candles)
+        n = len(block)
+        if n == 0:
+            return pd.DataFrame()
+
+        ts = block.timestamp
+        cols = [getattr(block, col).tolist() for col in CandleBlock.COLUMNS]
+        key = (symbol, timeframe)
+        with self._lock:
+            state = self._states.get(key)
+            start = 0
+            if state is not None and state.last_ts is not None:
+                start = int(np.searchsorted(ts, state.last_ts, side='right'))
+                continues = 0 < start < n and int(ts[start - 1]) == state.last_ts
+                # A longer window than the one the series was seeded with: re-seed
+                # so early rows aren't missing their warm-up
+                if not continues or int(ts[0]) < state.first_ts:
+                    state = None
+            if state is None:
+                state, start = _SeriesState(self.max_rows), 0
+                self._states[key] = state
+            # Streamed bars (update()) report VWAP over the same number of bars
+            state.vwap.resize(n)
+
+            for i in range(start, n - 1):
+                state.commit(*(col[i] for col in cols))
+            forming = state.peek(*(col[n - 1] for col in cols))
+            rows = list(state.rows)[-(n - 1):] if n > 1 else []
+
+        return _frame(rows + [forming])
+
+    def update(self, symbol: str, timeframe: str, candle: Candle,
+               closed: bool = True) -> Optional[Dict[str, float]]:
+        """
+        Feed one bar. A closed bar is committed; a forming bar is evaluated
+        without changing the state. Returns the indicator row, or None if the
+        series hasn't been seeded with compute() yet or the bar doesn't follow it.
+        """
+        key = (symbol, timeframe)
+        bar = (int(candle.timestamp), candle.open, candle.high, candle.low, candle.close, candle.volume)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.last_ts is None or bar[0] <= state.last_ts:
+                return None
+            row = state.commit(*bar) if closed else state.peek(*bar)
+        return dict(zip(('timestamp',) + FEATURE_COLUMNS, row))
+
+    def reset(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                for key in [k for k in self._states if k[0] == symbol]:
+                    del self._states[key]
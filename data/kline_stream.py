@@ -0,0 +1,359 @@
+"""
+data/kline_stream.py — live candles for the scanned universe via kline streams.
+
+Subscribes to public kline streams on the venue each symbol's candles already
+come from (MarketData's sticky source), so cached history and streamed bars
+never mix venues. Closed bars are written to the candle cache as they close
+and the forming bar is kept in MarketData's memory; while a symbol is live,
+fetch_ohlcv serves it with no REST call at all.
+
+The symbol set changes on the live socket: each scan's additions and
+removals are sent as subscribe/unsubscribe requests, so symbols that stay in
+the universe keep streaming. A newly added symbol is reconciled once over
+REST — the incremental fetch fills history up to the stream — before it is
+marked live; after a (re)connect every symbol is, since any of them may have
+missed bars while the stream was down.
+
+Supported venues: Binance and Bybit spot. Symbols sourced elsewhere (MEXC,
+perps) keep using REST.
+"""
+
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.types import CandleBlock
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websocket
+    WS_AVAILABLE = True
+except ImportError:
+    WS_AVAILABLE = False
+
+
+# Parsed update: (venue symbol, bar open time ms, o, h, l, c, v, closed)
+KlineUpdate = Tuple[str, int, float, float, float, float, float, bool]
+
+
+class _BinanceKlines:
+    """wss://stream.binance.com — <symbol>@kline_<interval>, interval as in ccxt."""
+
+    name = 'binance'
+    url = "wss://stream.binance.com:9443/ws"
+    heartbeat = None   # Server pings; websocket-client answers
+
+    @staticmethod
+    def venue_symbol(symbol: str) -> str:
+        return symbol.replace('/', '').lower()
+
+    @staticmethod
+    def topic(venue_symbol: str, timeframe: str) -> str:
+        return f"{venue_symbol}@kline_{timeframe}"
+
+    @staticmethod
+    def subscribe(topics: List[str], unsubscribe: bool = False) -> List[str]:
+        return [json.dumps({"method": "UNSUBSCRIBE" if unsubscribe else "SUBSCRIBE",
+                            "params": topics[i:i + 200], "id": i + 1})
+                for i in range(0, len(topics), 200)]
+
+    @staticmethod
+    def parse(data: dict) -> List[KlineUpdate]:
+        # {"e":"kline","s":"BTCUSDT","k":{"t":..,"o":"..","h":"..","l":"..","c":"..","v":"..","x":false}}
+        if data.get('e') != 'kline':
+            return []
+        k = data['k']
+        return [(k['s'].lower(), int(k['t']), float(k['o']), float(k['h']), float(k['l']),
+                 float(k['c']), float(k['v']), bool(k['x']))]
+
+
+class _BybitKlines:
+    """wss://stream.bybit.com/v5/public/spot — kline.<interval>.<SYMBOL>."""
+
+    name = 'bybit'
+    url = "wss://stream.bybit.com/v5/public/spot"
+    heartbeat = json.dumps({"op": "ping"})   # Bybit drops idle connections without it
+    INTERVALS = {'1m': '1', '3m': '3', '5m': '5', '15m': '15', '30m': '30', '1h': '60',
+                 '2h': '120', '4h': '240', '6h': '360', '12h': '720', '1d': 'D', '1w': 'W'}
+
+    @staticmethod
+    def venue_symbol(symbol: str) -> str:
+        return symbol.replace('/', '').upper()
+
+    @classmethod
+    def topic(cls, venue_symbol: str, timeframe: str) -> str:
+        return f"kline.{cls.INTERVALS[timeframe]}.{venue_symbol}"
+
+    @staticmethod
+    def subscribe(topics: List[str], unsubscribe: bool = False) -> List[str]:
+        # Spot accepts at most 10 args per request
+        return [json.dumps({"op": "unsubscribe" if unsubscribe else "subscribe", "args": topics[i:i + 10]})
+                for i in range(0, len(topics), 10)]
+
+    @staticmethod
+    def parse(data: dict) -> List[KlineUpdate]:
+        # {"topic":"kline.60.BTCUSDT","data":[{"start":..,"open":"..",...,"confirm":false}]}
+        topic = data.get('topic', '')
+        if not topic.startswith('kline.'):
+            return []
+        venue_symbol = topic.rsplit('.', 1)[-1]
+        return [(venue_symbol, int(k['start']), float(k['open']), float(k['high']), float(k['low']),
+                 float(k['close']), float(k['volume']), bool(k['confirm']))
+                for k in data.get('data', [])]
+
+
+VENUES = {'binance': _BinanceKlines, 'bybit': _BybitKlines}
+
+
+class _VenueConnection:
+    """
+    One websocket to one venue, reconnecting until stopped. Subscriptions are
+    changed on the live socket with add()/remove(); on (re)connect the whole
+    current set is subscribed again.
+    """
+
+    RECONNECT_DELAY = 5     # seconds before reconnect attempt
+    HEARTBEAT_SEC = 20
+
+    def __init__(self, stream: 'KlineStream', venue):
+        self.stream = stream
+        self.venue = venue
+        self.symbols: Dict[str, str] = {}     # venue symbol → unified symbol
+        self.ws = None
+        self.connected = False
+        self.reconnects = 0
+        self._running = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run_forever, daemon=True,
+                                        name=f"kline-{self.venue.name}")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        self._close()
+
+    def add(self, symbols: Dict[str, str]) -> None:
+        """Subscribe these (venue symbol → symbol) and reconcile just them."""
+        with self._lock:
+            new = {vs: sym for vs, sym in symbols.items() if vs not in self.symbols}
+            self.symbols.update(new)
+        if new and self._send(list(new)):
+            self._start_reconcile(list(new.values()))
+
+    def remove(self, venue_symbols: Iterable[str]) -> None:
+        """Unsubscribe these venue symbols; they fall back to REST."""
+        with self._lock:
+            gone = {vs: self.symbols.pop(vs) for vs in venue_symbols if vs in self.symbols}
+        for symbol in gone.values():
+            self.stream.market.set_stream_live(symbol, self.stream.timeframe, False)
+        self._send(list(gone), unsubscribe=True)
+
+    def _send(self, venue_symbols: List[str], unsubscribe: bool = False) -> bool:
+        """Change subscriptions on the live socket. False while disconnected (on_open will)."""
+        ws = self.ws
+        if not venue_symbols or not self.connected or ws is None:
+            return False
+        topics = [self.venue.topic(vs, self.stream.timeframe) for vs in sorted(venue_symbols)]
+        try:
+            for message in self.venue.subscribe(topics, unsubscribe=unsubscribe):
+                ws.send(message)
+        except Exception as e:
+            # The reconnect re-subscribes (and reconciles) the full set
+            logger.debug(f"[KLINE] {self.venue.name} subscription change failed: {e}")
+            return False
+        return True
+
+    def _start_reconcile(self, symbols: List[str]) -> None:
+        threading.Thread(target=self.stream._reconcile, args=(symbols,),
+                         daemon=True, name=f"kline-{self.venue.name}-reconcile").start()
+
+    def _close(self) -> None:
+        if self.ws:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+
+    def _run_forever(self) -> None:
+        while self._running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    self.venue.url,
+                    on_open=self._on_open,
+                    on_message=self._on_message,
+                    on_error=lambda ws, e: logger.error(f"[KLINE] {self.venue.name} error: {e}"),
+                    on_close=self._on_close,
+                )
+                self.ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                logger.error(f"[KLINE] {self.venue.name} connection error: {e}")
+            self._mark_down()
+            if self._running:
+                self.reconnects += 1
+                logger.warning(f"[KLINE] {self.venue.name} reconnecting in {self.RECONNECT_DELAY}s...")
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _on_open(self, ws) -> None:
+        # Mark connected first: a concurrent add() then subscribes on its own
+        # (a duplicate subscribe is harmless, a missed one is not)
+        self.connected = True
+        with self._lock:
+            symbols = dict(self.symbols)
+        logger.warning(f"[KLINE] {self.venue.name} connected — {len(symbols)} symbols")
+        for message in self.venue.subscribe([self.venue.topic(vs, self.stream.timeframe) for vs in symbols]):
+            ws.send(message)
+        if self.venue.heartbeat:
+            threading.Thread(target=self._heartbeat, args=(ws,), daemon=True,
+                             name=f"kline-{self.venue.name}-ping").start()
+        # Fill whatever closed while we were away, then serve from the stream
+        self._start_reconcile(list(symbols.values()))
+
+    def _heartbeat(self, ws) -> None:
+        while self._running and self.ws is ws and self.connected:
+            time.sleep(self.HEARTBEAT_SEC)
+            try:
+                ws.send(self.venue.heartbeat)
+            except Exception:
+                return
+
+    def _on_message(self, ws, message: str) -> None:
+        try:
+            updates = self.venue.parse(json.loads(message))
+        except Exception as e:
+            logger.debug(f"[KLINE] {self.venue.name} message parse error: {e}")
+            return
+        for venue_symbol, ts, o, h, l, c, v, closed in updates:
+            symbol = self.symbols.get(venue_symbol)
+            if symbol:
+                self.stream._on_bar(symbol, CandleBlock.from_ohlcv([(ts, o, h, l, c, v)]), closed)
+
+    def _on_close(self, ws, close_status, close_msg) -> None:
+        self._mark_down()
+        logger.warning(f"[KLINE] {self.venue.name} connection closed: {close_status}")
+
+    def _mark_down(self) -> None:
+        self.connected = False
+        for symbol in list(self.symbols.values()):
+            self.stream.market.set_stream_live(symbol, self.stream.timeframe, False)
+
+
+class KlineStream:
+    """
+    Keeps live candles for a set of symbols in MarketData's candle cache.
+    Calls on_bar_close(symbol, timeframe, candle) whenever a bar closes and
+    on_bar_update(symbol, timeframe, candle, closed) on every update.
+    """
+
+    def __init__(self, market, timeframe: str,
+                 on_bar_close: Optional[Callable] = None, reconcile_limit: int = 500,
+                 on_bar_update: Optional[Callable] = None):
+        self.market = market
+        self.timeframe = timeframe
+        self.on_bar_close = on_bar_close
+        self.on_bar_update = on_bar_update
+        self.reconcile_limit = reconcile_limit
+        self._connections: Dict[str, _VenueConnection] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self.bars_closed = 0
+        self.updates = 0
+        self._last_update = 0.0
+
+    def start(self) -> None:
+        if not WS_AVAILABLE:
+            logger.warning("[KLINE] Cannot start — websocket-client not installed")
+            return
+        self._running = True
+        logger.warning(f"[KLINE] Kline streams started ({self.timeframe})")
+
+    def stop(self) -> None:
+        self._running = False
+        with self._lock:
+            for conn in self._connections.values():
+                conn.stop()
+            self._connections.clear()
+        logger.warning("[KLINE] Kline streams stopped")
+
+    def update_symbols(self, symbols: Iterable[str]) -> None:
+        """
+        Stream exactly these symbols (called after each scan). Only the
+        difference is sent on each venue's live socket; symbols that stay
+        keep streaming and only new ones are reconciled over REST.
+        """
+        if not self._running:
+            return
+        wanted: Dict[str, Dict[str, str]] = {name: {} for name in VENUES}
+        for symbol in dict.fromkeys(symbols):
+            if ':' in symbol:
+                continue   # Perps stream from other endpoints — REST
+            venue = VENUES.get(self.market.get_ohlcv_source(symbol) or self.market.exchange_id)
+            if venue is None or (venue is _BybitKlines and self.timeframe not in venue.INTERVALS):
+                continue
+            wanted[venue.name][venue.venue_symbol(symbol)] = symbol
+
+        with self._lock:
+            for name, symbols_map in wanted.items():
+                conn = self._connections.get(name)
+                if conn is None:
+                    if symbols_map:
+                        conn = self._connections[name] = _VenueConnection(self, VENUES[name])
+                        conn.symbols = dict(symbols_map)
+                        conn.start()
+                    continue
+                # A symbol whose source venue changed is removed here and added there
+                removed = [vs for vs, sym in conn.symbols.items() if symbols_map.get(vs) != sym]
+                added = {vs: sym for vs, sym in symbols_map.items() if conn.symbols.get(vs) != sym}
+                if removed:
+                    conn.remove(removed)
+                if not symbols_map:
+                    conn.stop()
+                    del self._connections[name]
+                    continue
+                if added:
+                    conn.add(added)
+                if removed or added:
+                    logger.debug(f"[KLINE] {name} subscriptions: +{len(added)} -{len(removed)}")
+
+    def _reconcile(self, symbols: List[str]) -> None:
+        ok = sum(self.market.reconcile_stream(symbol, self.timeframe, self.reconcile_limit)
+                 for symbol in symbols)
+        if symbols:
+            logger.info(f"[KLINE] Reconciled {ok}/{len(symbols)} symbols over REST")
+
+    def _on_bar(self, symbol: str, bar: CandleBlock, closed: bool) -> None:
+        self.updates += 1
+        self._last_update = time.time()
+        self.market.on_stream_bar(symbol, self.timeframe, bar, closed)
+        if self.on_bar_update:
+            try:
+                self.on_bar_update(symbol, self.timeframe, bar[-1], closed)
+            except Exception as e:
+                logger.error(f"[KLINE] Bar-update callback error: {e}")
+        if closed:
+            self.bars_closed += 1
+            if self.on_bar_close:
+                try:
+                    self.on_bar_close(symbol, self.timeframe, bar[-1])
+                except Exception as e:
+                    logger.error(f"[KLINE] Bar-close callback error: {e}")
+
+    def get_status(self) -> dict:
+        """Return stream status for dashboard."""
+        with self._lock:
+            venues = {name: {'connected': conn.connected, 'symbols': len(conn.symbols),
+                             'reconnects': conn.reconnects}
+                      for name, conn in self._connections.items()}
+        return {
+            'venues': venues,
+            'symbols_streamed': sum(v['symbols'] for v in venues.values()),
+            'bars_closed': self.bars_closed,
+            'updates': self.updates,
+            'last_update_age_sec': round(time.time() - self._last_update, 1) if self._last_update else None,
+        }
@@ -4,21 +4,82 @@ from Bybit, Binance, and MEXC with automatic fallback.
 
 All public APIs — no API keys needed for market data.
 
+Exchange clients are shared through data.exchange_registry, so markets are
+loaded once per process (and usually from disk).
+
 Priority order for OHLCV: Bybit → Binance → MEXC
 If a symbol doesn't exist on one exchange, tries the next automatically.
+
+When constructed with a SQLiteStore, OHLCV reads go through a candle cache
+backed by the `candles` table: stored history is served from disk and only
+the bars after the last cached timestamp are fetched from the exchange.
 """
 import ccxt
 import time
 import logging
-from typing import List, Optional, Dict
-from core.types import Candle
-from core.utils import safe_float
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Dict, Iterable, Iterator, Tuple
+from core.types import CandleBlock
+from data.exchange_registry import registry
+from data.market_index import MarketStructureIndex
+from data.routing import ExchangeRouter
+from data.ticker_hub import ticker_hub
+from core.types import MarketInfo
 
 logger = logging.getLogger(__name__)
 
 # Default exchange priority for data fetching
 DEFAULT_EXCHANGES = ['bybit', 'binance', 'mexc']
 
+# Candle cache: bars kept per (symbol, timeframe) in the candles table
+CANDLE_CACHE_MAX_BARS = 1000
+
+# Per-exchange request budget: (requests/sec, burst). Published public limits
+# are per IP — Bybit 600 req/5s, Binance 6000 weight/min (klines = 2),
+# MEXC 500 req/10s per endpoint — and are shared with tickers, the dashboard
+# and the brokers, so we only spend a fraction of each.
+EXCHANGE_RATE_LIMITS = {
+    'bybit':   (20.0, 40),
+    'binance': (15.0, 30),
+    'mexc':    (10.0, 20),
+}
+DEFAULT_RATE_LIMIT = (5.0, 10)
+
+# Worker threads for fetch_ohlcv_many
+OHLCV_MAX_WORKERS = 8
+
+
+def candles_from_ohlcv(ohlcv: List[list]) -> CandleBlock:
+    """Convert raw ccxt OHLCV rows into a CandleBlock (column arrays, no per-bar objects)."""
+    return CandleBlock.from_ohlcv(ohlcv)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Refills at `rate` tokens/sec up to `capacity`;
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
 
 class MarketData:
     """
@@ -27,25 +88,58 @@ class MarketData:
     All public endpoints — no API keys required.
     """
 
-    def __init__(self, exchange_id: str = 'bybit', sandbox: bool = False):
+    def __init__(self, exchange_id: str = 'bybit', sandbox: bool = False,
+                 store=None, exchanges: Optional[Dict[str, ccxt.Exchange]] = None,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        """
+        Args:
+            store: Optional SQLiteStore — enables the candle cache.
+            exchanges: Pre-built clients keyed by exchange id (stand-ins for
+                benchmarks); by default public ccxt clients are created.
+            rate_limits: Overrides EXCHANGE_RATE_LIMITS per exchange id.
+        """
         self.exchange_id = exchange_id
-        self.exchange = getattr(ccxt, exchange_id)({
-            'enableRateLimit': True,
-        })
-        if sandbox:
-            self.exchange.set_sandbox_mode(True)
-        self.last_fetch_ts = 0
+        self.store = store
+        self.cache_stats = {'hits': 0, 'misses': 0, 'stream_hits': 0}
+        self._stats_lock = threading.Lock()
+
+        # One request budget per venue, shared by every thread using this instance
+        limits = {**EXCHANGE_RATE_LIMITS, **(rate_limits or {})}
+        self._limiters: Dict[str, TokenBucket] = {
+            eid: TokenBucket(*limits.get(eid, DEFAULT_RATE_LIMIT))
+            for eid in set(DEFAULT_EXCHANGES) | {exchange_id}
+        }
+        # Latency/error stats + circuit breaker per venue; orders fallbacks
+        self.router = ExchangeRouter(list(DEFAULT_EXCHANGES) + [exchange_id])
+        # symbol → exchange its candles come from. Sticky, so cached history
+        # and newly appended bars never mix venues (volumes differ per venue).
+        self._ohlcv_source: Dict[str, str] = {}
+
+        # Kline streams (data/kline_stream.py): forming bar per cache key, and
+        # the keys whose cache the stream is currently keeping complete
+        self._stream_bars: Dict[str, CandleBlock] = {}
+        self._stream_live: set = set()
+        self._stream_lock = threading.Lock()
 
         # Initialize all 3 exchanges for fallback
         self._exchanges: Dict[str, ccxt.Exchange] = {}
         self._exchange_symbols: Dict[str, set] = {}  # exchange → set of symbols
+        self._market_index = MarketStructureIndex()
 
-        for eid in DEFAULT_EXCHANGES:
-            try:
-                ex = getattr(ccxt, eid)({'enableRateLimit': True})
-                self._exchanges[eid] = ex
-            except Exception as e:
-                logger.warning(f"[Market] {eid} init failed: {e}")
+        if exchanges is not None:
+            self._exchanges = dict(exchanges)
+            self.exchange = self._exchanges[exchange_id]
+        else:
+            # Shared process-wide clients; markets come from the on-disk cache
+            self._exchanges = registry.preload(list(DEFAULT_EXCHANGES))
+            if sandbox:
+                self.exchange = getattr(ccxt, exchange_id)({
+                    'enableRateLimit': True,
+                })
+                self.exchange.set_sandbox_mode(True)
+            else:
+                self.exchange = self._exchanges.get(exchange_id) or registry.get(exchange_id)
+            registry.add_listener(self._on_markets_refreshed)
 
         # Load markets for all exchanges (know which symbols exist where)
         self._load_all_markets()
@@ -61,6 +155,18 @@ class MarketData:
             except Exception as e:
                 logger.warning(f"[Market] {eid} market load failed: {e}")
                 self._exchange_symbols[eid] = set()
+        self._rebuild_market_index()
+
+    def _on_markets_refreshed(self, exchange_id: str, markets: dict) -> None:
+        """Registry callback: pick up newly listed / delisted symbols."""
+        if exchange_id in self._exchanges:
+            self._exchange_symbols[exchange_id] = {s for s in markets.keys() if '/USDT' in s}
+            self._rebuild_market_index()
+
+    def _rebuild_market_index(self) -> None:
+        """Build a fresh index and swap it in; readers never see a half-built one."""
+        priority = [self.exchange_id] + list(DEFAULT_EXCHANGES)
+        self._market_index = MarketStructureIndex.build(self._exchanges, priority)
 
     def _get_exchange_for_symbol(self, symbol: str) -> Optional[ccxt.Exchange]:
         """Find the best exchange that has this symbol, in priority order."""
@@ -78,43 +184,136 @@ class MarketData:
         # Last resort: return primary and let it fail naturally
         return self.exchange
 
-    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> List[Candle]:
+    def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> CandleBlock:
         """
         Fetch OHLCV candles. Tries all exchanges in priority order.
         Returns candles from the first exchange that has the symbol.
+
+        With a store attached, cached bars are reused and only the bars since
+        the last cached timestamp are downloaded (the last cached bar is
+        re-fetched too, since it may have been stored while still forming).
         """
-        now = time.time()
-        if now - self.last_fetch_ts < 0.3:
-            time.sleep(0.3)
+        if self.store is None:
+            return self._fetch_ohlcv_remote(symbol, timeframe, limit)
 
-        # Build list of exchanges to try
-        exchanges_to_try = []
-        for eid in DEFAULT_EXCHANGES:
-            ex = self._exchanges.get(eid)
-            if ex and symbol in self._exchange_symbols.get(eid, set()):
-                exchanges_to_try.append((eid, ex))
+        key = self._candle_cache_key(symbol, timeframe)
+        try:
+            cached = self.store.get_latest_candles(key, limit=limit)
+        except Exception as e:
+            logger.debug(f"[Market] Candle cache read failed for {key}: {e}")
+            cached = CandleBlock.empty()
+
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        now_ms = int(time.time() * 1000)
+
+        streamed = self._streamed_window(key, cached, tf_ms, now_ms, limit)
+        if streamed is not None:
+            self._count_cache('stream_hits')
+            return streamed
+
+        missing = (now_ms - int(cached.timestamp[-1])) // tf_ms if len(cached) else limit
+
+        if len(cached) < limit or missing >= limit:
+            # Not enough history on disk, or it's older than the window — full download
+            self._count_cache('misses')
+            fresh = self._fetch_ohlcv_remote(symbol, timeframe, limit)
+            self._write_candle_cache(key, fresh)
+            return fresh
+
+        self._count_cache('hits')
+        fresh = self._fetch_ohlcv_remote(symbol, timeframe, int(missing) + 2,
+                                         since=int(cached.timestamp[-1]))
+        self._write_candle_cache(key, fresh)
+        return cached.append(fresh)[-limit:]
+
+    def _streamed_window(self, key: str, cached: CandleBlock, tf_ms: int, now_ms: int,
+                         limit: int) -> Optional[CandleBlock]:
+        """
+        Cached closed bars + the streamed forming bar, if together they form a
+        complete, gap-free window ending at the current bar. None otherwise
+        (stream not live for this key, bar not seen yet, or a hole to fill).
+        """
+        with self._stream_lock:
+            if key not in self._stream_live:
+                return None
+            forming = self._stream_bars.get(key)
+        if forming is None or int(forming.timestamp[-1]) != now_ms - now_ms % tf_ms:
+            return None
+        window = cached.append(forming)[-limit:]
+        if len(window) < limit or int(window.timestamp[-1] - window.timestamp[0]) != (limit - 1) * tf_ms:
+            return None
+        return window
+
+    def on_stream_bar(self, symbol: str, timeframe: str, bar: CandleBlock, closed: bool) -> None:
+        """
+        Kline stream update for one bar. Closed bars go straight to the candle
+        cache; the forming bar is kept in memory (it changes every second or
+        two) and overlaid on cached bars by fetch_ohlcv.
+        """
+        key = self._candle_cache_key(symbol, timeframe)
+        if closed:
+            if self.store is not None:
+                self._write_candle_cache(key, bar)
+            with self._stream_lock:
+                forming = self._stream_bars.get(key)
+                if forming is not None and int(forming.timestamp[-1]) <= int(bar.timestamp[-1]):
+                    del self._stream_bars[key]
+        else:
+            with self._stream_lock:
+                self._stream_bars[key] = bar
+
+    def set_stream_live(self, symbol: str, timeframe: str, live: bool) -> None:
+        """
+        Mark whether the stream keeps this key's cache complete. Streams clear
+        it on disconnect and set it again once REST has filled the gap.
+        """
+        key = self._candle_cache_key(symbol, timeframe)
+        with self._stream_lock:
+            if live:
+                self._stream_live.add(key)
+            else:
+                self._stream_live.discard(key)
+                self._stream_bars.pop(key, None)
+
+    def reconcile_stream(self, symbol: str, timeframe: str, limit: int = 500) -> bool:
+        """
+        Fill whatever the stream missed over REST (fetch_ohlcv's incremental
+        path), then mark the key live. Returns False if the fetch failed.
+        """
+        self.set_stream_live(symbol, timeframe, False)
+        try:
+            candles = self.fetch_ohlcv(symbol, timeframe, limit=limit)
+        except Exception as e:
+            logger.debug(f"[Market] Stream reconcile failed for {symbol} {timeframe}: {e}")
+            return False
+        if not candles:
+            return False
+        self.set_stream_live(symbol, timeframe, True)
+        return True
+
+    def get_ohlcv_source(self, symbol: str) -> Optional[str]:
+        """Exchange this symbol's candles come from (None until first fetched/assigned)."""
+        return self._ohlcv_source.get(symbol)
+
+    def _fetch_ohlcv_remote(self, symbol: str, timeframe: str, limit: int,
+                            since: Optional[int] = None) -> CandleBlock:
+        """Download OHLCV, trying the symbol's sticky source first."""
+        # Venues listing the symbol, fastest healthy first (sticky source leads)
+        listed = [eid for eid in DEFAULT_EXCHANGES
+                  if self._exchanges.get(eid) and symbol in self._exchange_symbols.get(eid, set())]
 
         # If no exchange claims to have it, try primary anyway
-        if not exchanges_to_try:
-            exchanges_to_try = [(self.exchange_id, self.exchange)]
+        if not listed:
+            listed = [self.exchange_id]
 
         last_error = None
-        for eid, ex in exchanges_to_try:
+        for eid in self.router.order(listed, preferred=self._ohlcv_source.get(symbol)):
+            ex = self._exchanges.get(eid, self.exchange)
             try:
-                ohlcv = ex.fetch_ohlcv(symbol, timeframe, limit=limit)
-                self.last_fetch_ts = time.time()
-
-                candles = []
-                for row in ohlcv:
-                    candles.append(Candle(
-                        timestamp=int(row[0]),
-                        open=safe_float(row[1]),
-                        high=safe_float(row[2]),
-                        low=safe_float(row[3]),
-                        close=safe_float(row[4]),
-                        volume=safe_float(row[5])
-                    ))
-                return candles
+                ohlcv = self._timed(eid, lambda: ex.fetch_ohlcv(symbol, timeframe, since=since, limit=limit))
+                self._ohlcv_source.setdefault(symbol, eid)
+
+                return candles_from_ohlcv(ohlcv)
             except Exception as e:
                 last_error = e
                 logger.debug(f"[{eid}] OHLCV failed for {symbol}: {e}")
@@ -124,6 +323,109 @@ class MarketData:
         logger.error(f"[Market] OHLCV failed on all exchanges for {symbol}: {last_error}")
         raise last_error or Exception(f"No exchange has {symbol}")
 
+    def fetch_ohlcv_page(self, symbol: str, timeframe: str, since: Optional[int],
+                         limit: int, exchange_id: str) -> List[list]:
+        """One rate-limited raw OHLCV request to a specific exchange (no cache, no fallback)."""
+        ex = self._exchanges.get(exchange_id)
+        if ex is None:
+            raise ValueError(f"Exchange {exchange_id} not available")
+        return self._timed(exchange_id, lambda: ex.fetch_ohlcv(symbol, timeframe, since=since, limit=limit))
+
+    def _timed(self, exchange_id: str, request):
+        """
+        Run one rate-limited request against a venue, recording latency and outcome.
+
+        Only availability failures (ccxt.NetworkError: timeouts, venue down,
+        DDoS protection) count toward the breaker. A venue that answers with a
+        request error (BadSymbol, BadRequest, ...) is healthy — that round trip
+        is recorded as a success and the error re-raised.
+        """
+        self._limiters.setdefault(exchange_id, TokenBucket(*DEFAULT_RATE_LIMIT)).acquire()
+        started = time.perf_counter()
+        try:
+            result = request()
+        except ccxt.NetworkError:
+            self.router.record(exchange_id, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        except Exception:
+            self.router.record(exchange_id, (time.perf_counter() - started) * 1000, ok=True)
+            raise
+        self.router.record(exchange_id, (time.perf_counter() - started) * 1000, ok=True)
+        return result
+
+    def get_routing_stats(self) -> Dict[str, Dict]:
+        """Per-exchange latency (EWMA, p95), error rate and breaker state for the dashboard."""
+        return self.router.get_stats()
+
+    def fetch_ohlcv_many(self, symbols: Iterable[str], timeframe: str, limit: int = 500,
+                         max_workers: int = OHLCV_MAX_WORKERS) -> Iterator[Tuple[str, CandleBlock]]:
+        """
+        Fetch OHLCV for many symbols on a bounded worker pool.
+
+        Symbols without a source yet are spread over the venues that list them
+        (by budget), so all three exchanges are fetched from in parallel. Each
+        venue is throttled by its own token bucket. Yields (symbol, candles) in
+        completion order; a symbol that fails everywhere yields an empty block.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        self._assign_ohlcv_sources(symbols)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ohlcv') as pool:
+            futures = {pool.submit(self.fetch_ohlcv, sym, timeframe, limit): sym
+                       for sym in symbols}
+            for future in as_completed(futures):
+                sym = futures[future]
+                try:
+                    yield sym, future.result()
+                except Exception as e:
+                    logger.error(f"[Market] OHLCV fetch failed for {sym}: {e}")
+                    yield sym, CandleBlock.empty()
+
+    def _assign_ohlcv_sources(self, symbols: List[str]) -> None:
+        """Give unassigned symbols the least-loaded venue (relative to its budget) that lists them."""
+        load: Dict[str, int] = {eid: 0 for eid in DEFAULT_EXCHANGES}
+        for sym in symbols:
+            eid = self._ohlcv_source.get(sym)
+            if eid in load:
+                load[eid] += 1
+
+        for sym in symbols:
+            if sym in self._ohlcv_source:
+                continue
+            venues = [eid for eid in DEFAULT_EXCHANGES
+                      if eid in self._exchanges and sym in self._exchange_symbols.get(eid, set())]
+            # Don't pin new symbols to a venue whose breaker is open
+            venues = [eid for eid in venues if self.router.is_available(eid)] or venues
+            if not venues:
+                continue
+            eid = min(venues, key=lambda v: (load[v] + 1) / self._limiters[v].rate)
+            self._ohlcv_source[sym] = eid
+            load[eid] += 1
+
+    def _count_cache(self, key: str) -> None:
+        with self._stats_lock:
+            self.cache_stats[key] += 1
+
+    @staticmethod
+    def _candle_cache_key(symbol: str, timeframe: str) -> str:
+        """The candles table has no timeframe column, so it's folded into the key."""
+        return f"{symbol}|{timeframe}"
+
+    def _write_candle_cache(self, key: str, candles: CandleBlock) -> None:
+        """Persist fetched bars and trim the per-key history. Never raises."""
+        if not candles:
+            return
+        try:
+            self.store.save_candles(candles, key)
+            self.store.prune_candles(key, keep=CANDLE_CACHE_MAX_BARS)
+        except Exception as e:
+            logger.debug(f"[Market] Candle cache write failed for {key}: {e}")
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Candle cache counters for the dashboard."""
+        with self._stats_lock:
+            return dict(self.cache_stats)
+
     def fetch_htf_trend(self, symbol: str, timeframe: str = '4h',
                         ema_period: int = 200) -> Dict:
         """
@@ -135,7 +437,7 @@ class MarketData:
             if len(candles) < ema_period:
                 return {'trend': 'flat', 'ema_value': 0, 'close': 0, 'above_ema': None}
 
-            closes = [c.close for c in candles]
+            closes = candles.close.tolist()
 
             # EMA calculation
             k = 2.0 / (ema_period + 1)
@@ -168,36 +470,46 @@ class MarketData:
         """
         Fetch the current perpetual funding rate for a symbol.
         Only works on perpetual futures symbols (e.g. BTC/USDT:USDT).
+        One rate-limited request per venue tried, healthiest listing venue first.
         """
-        try:
-            if ':' not in symbol:
-                return None
-
-            # Try primary exchange first, then others
-            for eid in DEFAULT_EXCHANGES:
-                ex = self._exchanges.get(eid)
-                if not ex:
-                    continue
-                if symbol not in self._exchange_symbols.get(eid, set()):
-                    continue
-                try:
-                    data = ex.fetch_funding_rate(symbol)
-                    rate = data.get('fundingRate') or data.get('funding_rate')
-                    return float(rate) if rate is not None else None
-                except Exception:
-                    continue
-            return None
-        except Exception as e:
-            logger.debug(f"[Market] Funding rate unavailable for {symbol}: {e}")
+        if ':' not in symbol:
             return None
+        listed = [eid for eid in DEFAULT_EXCHANGES
+                  if self._exchanges.get(eid) and symbol in self._exchange_symbols.get(eid, set())]
+        for eid in self.router.order(listed):
+            ex = self._exchanges[eid]
+            try:
+                data = self._timed(eid, lambda: ex.fetch_funding_rate(symbol))
+                rate = (data or {}).get('fundingRate') or (data or {}).get('funding_rate')
+                return float(rate) if rate is not None else None
+            except Exception as e:
+                logger.debug(f"[Market] Funding rate unavailable for {symbol} on {eid}: {e}")
+        return None
+
+    def fetch_funding_rates(self, exchange_id: str) -> Dict[str, float]:
+        """
+        One rate-limited bulk funding-rate request to an exchange.
+        Returns {symbol: rate}; raises if the venue has no bulk endpoint.
+        """
+        ex = self._exchanges.get(exchange_id)
+        if ex is None:
+            raise ValueError(f"Exchange {exchange_id} not available")
+        if not ex.has.get('fetchFundingRates'):
+            raise NotImplementedError(f"{exchange_id} has no bulk funding endpoint")
+        rates = {}
+        for symbol, data in (self._timed(exchange_id, ex.fetch_funding_rates) or {}).items():
+            rate = (data or {}).get('fundingRate')
+            if rate is not None:
+                rates[symbol] = float(rate)
+        return rates
 
     def fetch_tickers_for_universe(self, min_volume_usdt: float = 10_000_000,
                                    banned: Optional[List[str]] = None) -> List[str]:
-        """Fetch top USDT pairs by volume from primary exchange."""
+        """Top USDT pairs by volume on the primary exchange (shared TickerHub snapshot)."""
         if banned is None:
             banned = ['USDC', 'BUSD', 'DAI', 'TUSD', 'UST', 'FDUSD']
         try:
-            tickers = self.exchange.fetch_tickers()
+            tickers = ticker_hub.get(self.exchange_id, client=self.exchange)
             candidates = []
             for symbol, data in tickers.items():
                 if '/USDT' not in symbol:
@@ -215,12 +527,18 @@ class MarketData:
             logger.error(f"[Market] Ticker fetch failed: {e}")
             return []
 
+    def get_market_info(self, symbol: str, exchange_id: Optional[str] = None) -> Optional[MarketInfo]:
+        """
+        Precision and order limits for a symbol from the market index (O(1)).
+        Without exchange_id, the first exchange in priority order that lists it.
+        """
+        return self._market_index.get(symbol, exchange_id)
+
     def get_market_structure(self, symbol: str) -> dict:
-        """Get market structure (min qty, tick size, etc) for a symbol."""
+        """Raw ccxt market dict for a symbol. Prefer get_market_info() for limits."""
         ex = self._get_exchange_for_symbol(symbol)
         try:
-            markets = ex.load_markets()
-            return markets.get(symbol, {})
+            return (ex.markets or {}).get(symbol, {})
         except Exception as e:
             logger.error(f"[Market] Market structure fetch failed for {symbol}: {e}")
             return {}
@@ -0,0 +1,111 @@
+"""
+data/market_index.py — O(1) lookup of exchange trading rules per symbol.
+
+ccxt keeps tick size, step size and order limits in nested market dicts whose
+precision fields mean different things per exchange (decimal places vs tick
+size). The index flattens every USDT market into a slotted MarketInfo once
+per markets refresh, so the risk engine and brokers never walk ccxt dicts or
+call load_markets() on the hot path.
+"""
+import logging
+from typing import Dict, List, Optional, Union
+
+from core.types import MarketInfo
+
+logger = logging.getLogger(__name__)
+
+# ccxt precisionMode values (ccxt.base.decimal_to_precision)
+DECIMAL_PLACES = 2
+SIGNIFICANT_DIGITS = 3
+TICK_SIZE = 4
+
+
+def _precision_to_step(value, precision_mode: Optional[int]) -> float:
+    """Normalise a ccxt precision value to a step size (0.0 if unknown)."""
+    if value is None:
+        return 0.0
+    try:
+        if precision_mode == SIGNIFICANT_DIGITS:
+            return 0.0  # Not expressible as a fixed step
+        if precision_mode == DECIMAL_PLACES or (precision_mode is None and isinstance(value, int)):
+            return 10.0 ** -int(value)
+        step = float(value)
+        return step if step > 0 else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _limit(limits: dict, key: str, bound: str) -> float:
+    try:
+        return float((limits.get(key) or {}).get(bound) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def market_info_from_ccxt(market: dict, exchange_id: str = '',
+                          precision_mode: Optional[int] = None) -> MarketInfo:
+    """Build a MarketInfo from one ccxt market dict."""
+    precision = market.get('precision') or {}
+    limits = market.get('limits') or {}
+    return MarketInfo(
+        symbol=market.get('symbol', ''),
+        exchange_id=exchange_id,
+        tick_size=_precision_to_step(precision.get('price'), precision_mode),
+        step_size=_precision_to_step(precision.get('amount'), precision_mode),
+        min_qty=_limit(limits, 'amount', 'min'),
+        min_notional=_limit(limits, 'cost', 'min'),
+        max_qty=_limit(limits, 'amount', 'max'),
+    )
+
+
+def as_market_info(market_structure: Union[MarketInfo, dict, None]) -> Optional[MarketInfo]:
+    """Accept either a MarketInfo or a raw ccxt market dict (legacy callers)."""
+    if not market_structure:
+        return None
+    if isinstance(market_structure, MarketInfo):
+        return market_structure
+    return market_info_from_ccxt(market_structure)
+
+
+class MarketStructureIndex:
+    """
+    Immutable symbol → MarketInfo index over several exchanges.
+    `owner` is the first exchange in priority order that lists the symbol.
+    """
+
+    __slots__ = ('_by_exchange', '_owner')
+
+    def __init__(self, by_exchange: Optional[Dict[str, Dict[str, MarketInfo]]] = None,
+                 owner: Optional[Dict[str, MarketInfo]] = None):
+        self._by_exchange = by_exchange or {}
+        self._owner = owner or {}
+
+    @classmethod
+    def build(cls, exchanges: Dict[str, object], priority: List[str]) -> 'MarketStructureIndex':
+        by_exchange: Dict[str, Dict[str, MarketInfo]] = {}
+        for eid, ex in exchanges.items():
+            markets = getattr(ex, 'markets', None) or {}
+            mode = getattr(ex, 'precisionMode', None)
+            entries = {}
+            for symbol, market in markets.items():
+                if '/USDT' not in symbol:
+                    continue
+                try:
+                    entries[symbol] = market_info_from_ccxt(market, eid, mode)
+                except Exception as e:
+                    logger.debug(f"[MarketIndex] {eid} {symbol} skipped: {e}")
+            by_exchange[eid] = entries
+
+        owner: Dict[str, MarketInfo] = {}
+        for eid in list(dict.fromkeys(priority)) + list(by_exchange):
+            for symbol, info in by_exchange.get(eid, {}).items():
+                owner.setdefault(symbol, info)
+        return cls(by_exchange, owner)
+
+    def get(self, symbol: str, exchange_id: Optional[str] = None) -> Optional[MarketInfo]:
+        if exchange_id is None:
+            return self._owner.get(symbol)
+        return self._by_exchange.get(exchange_id, {}).get(symbol)
+
+    def __len__(self) -> int:
+        return len(self._owner)
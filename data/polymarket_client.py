@@ -1,15 +1,36 @@
 import requests
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Optional, List, Dict
 
+from strategy.macro_filter import compute_macro_risk_scale
+
 logger = logging.getLogger(__name__)
 
+MAX_WORKERS = 8
+REFRESH_CHECK_INTERVAL = 60   # seconds between "is a refresh due?" checks
+FAILURE_RETRY_SEC = 600       # after a refresh where every market failed
+
 class PolymarketClient:
     BASE_URL = "https://gamma-api.polymarket.com/markets"
 
     def __init__(self, timeout: int = 10, retries: int = 2):
         self.timeout = timeout
         self.retries = retries
+        # One keep-alive pool for every market lookup
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+
+    def get_probabilities(self, market_ids: List[str]) -> Dict[str, Optional[float]]:
+        """Fetch several markets concurrently. Returns {market_id: probability or None}."""
+        if not market_ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(market_ids)),
+                                thread_name_prefix='polymarket') as pool:
+            return dict(zip(market_ids, pool.map(self.get_probability, market_ids)))
 
     def get_probability(self, market_id: str) -> Optional[float]:
         """
@@ -27,7 +48,7 @@ class PolymarketClient:
         
         for attempt in range(self.retries + 1):
             try:
-                response = requests.get(url, timeout=self.timeout)
+                response = self.session.get(url, timeout=self.timeout)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -73,3 +94,64 @@ class PolymarketClient:
                 return None
         
         return None
+
+
+class PolymarketRefresher:
+    """
+    Background refresh of the macro risk snapshot.
+
+    Every `update_hours` (config polymarket section, re-read on each check)
+    all configured markets are fetched concurrently and one row is written to
+    polymarket_snapshots. The trading cycle only reads the latest snapshot.
+    """
+
+    def __init__(self, client: PolymarketClient, store, config: dict):
+        self.client = client
+        self.store = store
+        self.config = config   # live CONFIG dict — job() reloads it in place
+        self.last_refresh_sec: Optional[float] = None
+        self._retry_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Refresh once if due (so the first cycle has a snapshot), then keep refreshing in the background."""
+        self.refresh_if_due()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name='polymarket-refresh')
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.wait(REFRESH_CHECK_INTERVAL):
+            try:
+                self.refresh_if_due()
+            except Exception as e:
+                logger.warning(f"Polymarket refresh failed: {e}")
+
+    def refresh_if_due(self) -> bool:
+        """Write a new snapshot if the latest is older than update_hours. Returns True if written."""
+        pm_conf = self.config.get('polymarket', {})
+        update_interval = pm_conf.get('update_hours', 6) * 3600
+        last_snap = self.store.get_latest_polymarket_snapshot()
+        if last_snap and (time.time() - last_snap['timestamp']) < update_interval:
+            return False
+        if time.time() < self._retry_at:
+            return False
+
+        started = time.time()
+        results = self.client.get_probabilities(pm_conf.get('markets', []))
+        self.last_refresh_sec = time.time() - started
+        probs = [p for p in results.values() if p is not None]
+        if not probs:
+            # Keep serving the previous snapshot (or the configured default)
+            self._retry_at = time.time() + FAILURE_RETRY_SEC
+            return False
+
+        risk_scale = compute_macro_risk_scale(probs)
+        macro_prob = sum(probs) / len(probs)
+        self.store.save_polymarket_snapshot(int(time.time()), "multi", macro_prob, risk_scale)
+        logger.info(f"Polymarket: {len(probs)}/{len(results)} markets in {self.last_refresh_sec:.1f}s "
+                    f"-> p={macro_prob:.2f} scale={risk_scale}")
+        return True
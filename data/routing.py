@@ -0,0 +1,139 @@
+"""
+data/routing.py — per-exchange health tracking for market-data requests.
+
+Every request MarketData makes is timed and recorded here. Each venue keeps
+an EWMA and a rolling p95 of latency, an EWMA error rate, and a circuit
+breaker: after BREAKER_FAILURES consecutive failures the venue is skipped
+for a cooldown that doubles on every failed half-open trial (capped), so a
+degraded exchange costs one timeout per cooldown instead of one per symbol.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+LATENCY_ALPHA = 0.2           # EWMA weight of the newest sample
+LATENCY_WINDOW = 200          # samples kept for the p95
+BREAKER_FAILURES = 3          # consecutive failures that open the breaker
+BREAKER_COOLDOWN_SEC = 30.0
+BREAKER_MAX_COOLDOWN_SEC = 300.0
+
+
+class ExchangeHealth:
+    """Rolling latency/error statistics and circuit-breaker state for one venue."""
+
+    __slots__ = ('ewma_ms', 'error_rate', 'requests', 'failures',
+                 'consecutive_failures', 'open_until', 'cooldown', 'trips', '_latencies')
+
+    def __init__(self):
+        self.ewma_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = BREAKER_COOLDOWN_SEC
+        self.trips = 0
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency_ms: float, ok: bool, now: float) -> None:
+        self.requests += 1
+        self.error_rate += LATENCY_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            # Failures often end in a timeout; only successful round trips
+            # describe how fast the venue answers.
+            self._latencies.append(latency_ms)
+            self.ewma_ms = (latency_ms if self.ewma_ms is None
+                            else self.ewma_ms + LATENCY_ALPHA * (latency_ms - self.ewma_ms))
+            self.consecutive_failures = 0
+            self.cooldown = BREAKER_COOLDOWN_SEC
+            self.open_until = 0.0
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.open_until:
+            # Half-open trial failed — back off harder
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN_SEC)
+        if self.consecutive_failures >= BREAKER_FAILURES:
+            self.open_until = now + self.cooldown
+            self.trips += 1
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+    def p95_ms(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def snapshot(self, now: float) -> Dict:
+        p95 = self.p95_ms()
+        if self.is_open(now):
+            state = 'open'
+        elif self.open_until:
+            state = 'half-open'
+        else:
+            state = 'closed'
+        return {
+            'ewma_ms': round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            'p95_ms': round(p95, 1) if p95 is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'failures': self.failures,
+            'breaker': state,
+            'breaker_trips': self.trips,
+            'retry_in_sec': round(max(0.0, self.open_until - now), 1),
+        }
+
+
+class ExchangeRouter:
+    """
+    Orders candidate venues by health: closed breakers first, then fastest EWMA.
+
+    `clock` drives breaker cooldowns (monotonic seconds); tests pass a manual
+    clock so a breaker stays open exactly as long as they need.
+    """
+
+    def __init__(self, exchange_ids: Iterable[str], clock: Callable[[], float] = time.monotonic):
+        self._health: Dict[str, ExchangeHealth] = {eid: ExchangeHealth() for eid in exchange_ids}
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _get(self, exchange_id: str) -> ExchangeHealth:
+        health = self._health.get(exchange_id)
+        if health is None:
+            health = self._health[exchange_id] = ExchangeHealth()
+        return health
+
+    def record(self, exchange_id: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self._get(exchange_id).record(latency_ms, ok, self._clock())
+
+    def is_available(self, exchange_id: str) -> bool:
+        """False while the venue's breaker is open."""
+        with self._lock:
+            return not self._get(exchange_id).is_open(self._clock())
+
+    def order(self, exchange_ids: List[str], preferred: Optional[str] = None) -> List[str]:
+        """
+        Healthy venues before tripped ones. Among healthy venues `preferred`
+        (the symbol's sticky source) leads, then lowest EWMA latency; venues
+        with no samples yet sort first so they get measured, ties keep the
+        given priority order. Tripped venues stay at the end as a last resort
+        rather than being dropped.
+        """
+        now = self._clock()
+        with self._lock:
+            def rank(item):
+                pos, eid = item
+                health = self._get(eid)
+                ewma = health.ewma_ms if health.ewma_ms is not None else 0.0
+                return (health.is_open(now), eid != preferred, ewma, pos)
+            return [eid for _, eid in sorted(enumerate(exchange_ids), key=rank)]
+
+    def get_stats(self) -> Dict[str, Dict]:
+        now = self._clock()
+        with self._lock:
+            return {eid: h.snapshot(now) for eid, h in self._health.items()}
@@ -7,6 +7,10 @@ Sources:
   3. Santiment social volume — every 15 min
   4. LunarCrush galaxy score — every 15 min
 
+Sources are fetched concurrently over one pooled HTTP session. Results are
+cached per source and symbol; a stale value is served immediately while a
+background refresh runs (stale-while-revalidate).
+
 Each source returns a sub-score. Combined total determines:
   >= +2  → BULLISH  (full size)
    0..+1 → NEUTRAL  (half size)
@@ -15,11 +19,14 @@ Each source returns a sub-score. Combined total determines:
 If any source fails or has no API key → skip gracefully, score = 0.
 """
 import logging
+import threading
 import time
-from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Dict, Any, Optional, Tuple, Callable
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -29,26 +36,97 @@ NEWS_CACHE_TTL = 900       # 15 minutes
 SOCIAL_CACHE_TTL = 900     # 15 minutes
 LUNAR_CACHE_TTL = 900      # 15 minutes
 
+REQUEST_TIMEOUT = 10
+PREFETCH_TIMEOUT = 20      # upper bound on prefetch(); slower sources finish in the background
+LOOKUP_TIMEOUT = 3         # per-source wait in get_combined_sentiment(); a late source scores 0
+FETCH_WORKERS = 8
+LOOKUP_WORKERS = 4         # one per source, separate from the prefetch/refresh pool
+
+
+class _SourceCache:
+    """
+    Per-key TTL cache with stale-while-revalidate.
+
+    Fresh values are returned as-is. A stale value is returned immediately
+    and one background refresh is started for its key. Only a key that has
+    never been fetched makes the caller wait, and then only one caller
+    fetches it: concurrent callers wait on the same in-flight Future. A
+    failed fetch (None) keeps the previous value.
+    """
+
+    def __init__(self, ttl: float, pool: ThreadPoolExecutor):
+        self.ttl = ttl
+        self._pool = pool
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._refreshing: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: Any, fetched_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() if fetched_at is None else fetched_at)
+
+    def get(self, key: str, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[1] >= self.ttl and key not in self._refreshing:
+                    self._refreshing[key] = self._pool.submit(self._refresh, key, fetch)
+                return entry[0]
+            in_flight = self._refreshing.get(key)
+            if in_flight is None:
+                in_flight = self._refreshing[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return in_flight.result()
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            in_flight.set_result(value)
+            return value
+        except BaseException as e:
+            in_flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> Any:
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
 
 class SentimentEngine:
     """
     Multi-source sentiment engine.
-    Fetches from 4 APIs, caches results, produces a combined sentiment decision.
+    Fetches from 4 APIs concurrently over one pooled session, caches results
+    per source and symbol, produces a combined sentiment decision.
     """
 
     def __init__(self, config: dict = None):
         self.config = config or {}
         self.fng_url = "https://api.alternative.me/fng/?limit=1"
 
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS)
+        self._session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='sentiment')
+        # Interactive lookups get their own workers so they never queue behind a prefetch batch
+        self._lookup_pool = ThreadPoolExecutor(max_workers=LOOKUP_WORKERS, thread_name_prefix='sentiment-lookup')
+
         # Cached values (in-memory, fast)
-        self._fng_cache: Dict = {}
-        self._fng_time: float = 0
-        self._news_cache: Dict = {}
-        self._news_time: float = 0
-        self._social_cache: Dict = {}
-        self._social_time: float = 0
-        self._lunar_cache: Dict = {}
-        self._lunar_time: float = 0
+        self._fng = _SourceCache(FNG_CACHE_TTL, self._pool)
+        self._news = _SourceCache(NEWS_CACHE_TTL, self._pool)
+        self._social = _SourceCache(SOCIAL_CACHE_TTL, self._pool)
+        self._lunar = _SourceCache(LUNAR_CACHE_TTL, self._pool)
 
         # Disk cache — survives restarts (optional, graceful if not installed)
         self._disk_cache = None
@@ -60,8 +138,8 @@ class SentimentEngine:
             # Restore last values from disk on startup
             cached_fng = self._disk_cache.get('fng')
             if cached_fng:
-                self._fng_cache = cached_fng
-                self._fng_time = time.time() - FNG_CACHE_TTL + 300  # Treat as 5 min old
+                # Treat as 5 min old
+                self._fng.put('fng', cached_fng, fetched_at=time.time() - FNG_CACHE_TTL + 300)
                 logger.info(f"[SENTIMENT] Restored F&G from disk cache: {cached_fng.get('value')}")
         except ImportError:
             logger.info("[SENTIMENT] diskcache not installed — using memory-only cache")
@@ -69,16 +147,14 @@ class SentimentEngine:
     # ── Source 1: Fear & Greed Index ────────────────────────────────────
 
     def get_fear_and_greed(self) -> Dict[str, Any]:
-        """Fetch Fear & Greed Index. Cached for 1 hour."""
-        now = time.time()
-        if self._fng_cache and (now - self._fng_time) < FNG_CACHE_TTL:
-            return self._fng_cache
+        """Fear & Greed Index. Cached for 1 hour."""
+        return self._fng.get('fng', self._fetch_fear_and_greed) or {}
 
+    def _fetch_fear_and_greed(self) -> Optional[Dict[str, Any]]:
         if not self.config.get('fear_greed_enabled', True):
-            return {}
-
+            return None
         try:
-            resp = requests.get(self.fng_url, timeout=10)
+            resp = self._session.get(self.fng_url, timeout=REQUEST_TIMEOUT)
             resp.raise_for_status()
             data = resp.json()
             if 'data' in data and len(data['data']) > 0:
@@ -88,14 +164,12 @@ class SentimentEngine:
                     'classification': item['value_classification'],
                     'timestamp': int(item['timestamp']),
                 }
-                self._fng_cache = result
-                self._fng_time = now
                 if self._disk_cache:
                     self._disk_cache.set('fng', result)
                 return result
         except Exception as e:
             logger.warning(f"[SENTIMENT] Fear&Greed unavailable: {e}")
-        return self._fng_cache if self._fng_cache else {}
+        return None
 
     def _score_fear_greed(self) -> Tuple[int, str]:
         """
@@ -125,16 +199,14 @@ class SentimentEngine:
     # ── Source 2: CryptoPanic News ──────────────────────────────────────
 
     def _score_cryptopanic(self, symbol: str = "") -> Tuple[int, str]:
-        """Fetch important news from CryptoPanic. Cached 15 min."""
+        """Important news from CryptoPanic. Cached 15 min per symbol."""
         token = self.config.get('cryptopanic_token', '')
         if not token:
             return 0, "no token"
+        result = self._news.get(symbol or "general", lambda: self._fetch_cryptopanic(token, symbol))
+        return result or (0, "error")
 
-        now = time.time()
-        cache_key = symbol or "general"
-        if self._news_cache.get(cache_key) and (now - self._news_time) < NEWS_CACHE_TTL:
-            return self._news_cache[cache_key]
-
+    def _fetch_cryptopanic(self, token: str, symbol: str) -> Optional[Tuple[int, str]]:
         try:
             # Extract base currency from symbol (BTC/USDT → BTC)
             currencies = ""
@@ -146,7 +218,7 @@ class SentimentEngine:
                 f"https://cryptopanic.com/api/v1/posts/"
                 f"?auth_token={token}&filter=important&public=true{currencies}"
             )
-            resp = requests.get(url, timeout=10)
+            resp = self._session.get(url, timeout=REQUEST_TIMEOUT)
             resp.raise_for_status()
             data = resp.json()
 
@@ -162,28 +234,23 @@ class SentimentEngine:
 
             # Cap between -3 and +3
             score = max(-3, min(3, score))
-            result = (score, f"{score:+d}")
-            self._news_cache[cache_key] = result
-            self._news_time = now
-            return result
+            return score, f"{score:+d}"
 
         except Exception as e:
             logger.warning(f"[SENTIMENT] CryptoPanic unavailable: {e}")
-            return 0, "error"
+            return None
 
     # ── Source 3: Santiment Social Volume ────────────────────────────────
 
     def _score_santiment(self, symbol: str = "") -> Tuple[int, str]:
-        """Fetch social volume from Santiment. Cached 15 min."""
+        """Social volume from Santiment. Cached 15 min per symbol."""
         token = self.config.get('santiment_token', '')
         if not token:
             return 0, "no token"
+        result = self._social.get(symbol, lambda: self._fetch_santiment(token, symbol))
+        return result or (0, "error")
 
-        now = time.time()
-        if self._social_cache and (now - self._social_time) < SOCIAL_CACHE_TTL:
-            cached = self._social_cache.get(symbol, (0, "cached"))
-            return cached
-
+    def _fetch_santiment(self, token: str, symbol: str) -> Optional[Tuple[int, str]]:
         try:
             base = symbol.split('/')[0].split(':')[0].lower() if symbol else "bitcoin"
             slug = base if base != "btc" else "bitcoin"
@@ -203,11 +270,11 @@ class SentimentEngine:
             }
             ''' % slug
 
-            resp = requests.post(
+            resp = self._session.post(
                 "https://api.santiment.net/graphql",
                 json={"query": query},
                 headers={"Authorization": f"Apikey {token}"},
-                timeout=10,
+                timeout=REQUEST_TIMEOUT,
             )
             data = resp.json()
             ts = data.get('data', {}).get('getMetric', {}).get('timeseriesData', [])
@@ -215,67 +282,82 @@ class SentimentEngine:
                 vol = ts[-1].get('value', 0)
                 # Simple heuristic: social volume > 100 is notable
                 score = 1 if vol > 100 else 0
-                result = (score, f"vol={vol:.0f}")
-            else:
-                result = (0, "no data")
-
-            self._social_cache[symbol] = result
-            self._social_time = now
-            return result
+                return score, f"vol={vol:.0f}"
+            return 0, "no data"
 
         except Exception as e:
             logger.warning(f"[SENTIMENT] Santiment unavailable: {e}")
-            return 0, "error"
+            return None
 
     # ── Source 4: LunarCrush Galaxy Score ────────────────────────────────
 
     def _score_lunarcrush(self, symbol: str = "") -> Tuple[int, str]:
-        """Fetch galaxy score from LunarCrush. Cached 15 min."""
+        """Galaxy score from LunarCrush. The coin list is fetched once per 15 min for all symbols."""
         token = self.config.get('lunarcrush_token', '')
         if not token:
             return 0, "no token"
+        scores = self._lunar.get('coins', lambda: self._fetch_lunarcrush(token))
+        if scores is None:
+            return 0, "error"
 
-        now = time.time()
-        if self._lunar_cache.get(symbol) and (now - self._lunar_time) < LUNAR_CACHE_TTL:
-            return self._lunar_cache[symbol]
+        base = symbol.split('/')[0].split(':')[0] if symbol else "BTC"
+        galaxy_score = scores.get(base.upper(), 0)
 
-        try:
-            base = symbol.split('/')[0].split(':')[0] if symbol else "BTC"
+        if galaxy_score > 70:
+            score = 2
+        elif galaxy_score >= 50:
+            score = 1
+        else:
+            score = -1 if galaxy_score > 0 else 0
+        return score, f"gs={galaxy_score:.0f}"
 
-            resp = requests.get(
+    def _fetch_lunarcrush(self, token: str) -> Optional[Dict[str, float]]:
+        """Galaxy score per coin symbol (upper-case)."""
+        try:
+            resp = self._session.get(
                 "https://lunarcrush.com/api4/public/coins/list/v2",
                 headers={"Authorization": f"Bearer {token}"},
-                timeout=10,
+                timeout=REQUEST_TIMEOUT,
             )
             data = resp.json()
-
-            galaxy_score = 0
+            scores = {}
             for coin in data.get('data', []):
-                if coin.get('symbol', '').upper() == base.upper():
-                    galaxy_score = coin.get('galaxy_score', 0) or 0
-                    break
-
-            if galaxy_score > 70:
-                score = 2
-            elif galaxy_score >= 50:
-                score = 1
-            else:
-                score = -1 if galaxy_score > 0 else 0
-
-            result = (score, f"gs={galaxy_score:.0f}")
-            self._lunar_cache[symbol] = result
-            self._lunar_time = now
-            return result
+                coin_symbol = coin.get('symbol', '').upper()
+                if coin_symbol and coin_symbol not in scores:
+                    scores[coin_symbol] = coin.get('galaxy_score', 0) or 0
+            return scores
 
         except Exception as e:
             logger.warning(f"[SENTIMENT] LunarCrush unavailable: {e}")
-            return 0, "error"
+            return None
+
+    # ── Batch prefetch ──────────────────────────────────────────────────
+
+    def prefetch(self, symbols) -> None:
+        """
+        Warm every source for a shortlist in one concurrent batch, so the
+        per-candidate get_combined_sentiment() calls are served from cache.
+        """
+        jobs = [self._pool.submit(self._score_fear_greed)]
+        for sym in symbols:
+            jobs += [self._pool.submit(score, sym) for score in
+                     (self._score_cryptopanic, self._score_santiment, self._score_lunarcrush)]
+        done, pending = wait(jobs, timeout=PREFETCH_TIMEOUT)
+        if pending:
+            logger.warning(f"[SENTIMENT] Prefetch: {len(pending)} lookups still running after {PREFETCH_TIMEOUT}s")
 
     # ── Combined Sentiment Score ────────────────────────────────────────
 
+    @staticmethod
+    def _lookup_result(future: Future, deadline: float) -> Tuple[int, str]:
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            return 0, "timeout"
+
     def get_combined_sentiment(self, symbol: str = "") -> Dict[str, Any]:
         """
-        Fetch all 4 sources and produce combined sentiment decision.
+        Look up all 4 sources (concurrently) and produce combined sentiment decision.
 
         Returns:
             {
@@ -288,10 +370,17 @@ class SentimentEngine:
                 'lunarcrush': (score, detail),
             }
         """
-        fng_score, fng_detail = self._score_fear_greed()
-        cp_score, cp_detail = self._score_cryptopanic(symbol)
-        sant_score, sant_detail = self._score_santiment(symbol)
-        lc_score, lc_detail = self._score_lunarcrush(symbol)
+        # The four sources are independent — look them up concurrently, and
+        # score a source that is still fetching after LOOKUP_TIMEOUT as 0
+        fng = self._lookup_pool.submit(self._score_fear_greed)
+        cp = self._lookup_pool.submit(self._score_cryptopanic, symbol)
+        sant = self._lookup_pool.submit(self._score_santiment, symbol)
+        lc = self._lookup_pool.submit(self._score_lunarcrush, symbol)
+        deadline = time.monotonic() + LOOKUP_TIMEOUT
+        fng_score, fng_detail = self._lookup_result(fng, deadline)
+        cp_score, cp_detail = self._lookup_result(cp, deadline)
+        sant_score, sant_detail = self._lookup_result(sant, deadline)
+        lc_score, lc_detail = self._lookup_result(lc, deadline)
 
         total = fng_score + cp_score + sant_score + lc_score
 
@@ -0,0 +1,151 @@
+"""
+data/tick_recorder.py — record raw WebSocket frames for offline replay.
+
+Frames are appended to gzip-compressed segment files as length-prefixed
+records:
+
+    <f8 received_at (unix seconds)> <u4 length> <length bytes of UTF-8 frame>
+
+A background thread does the compression and I/O, so the socket threads
+only pay for a queue put. Segments rotate by size or age; a segment cut
+short by a crash reads back up to its last complete record.
+
+    recorder = TickRecorder("recordings/ticks")
+    monitor = WebSocketMonitor(symbols, on_momentum, recorder=recorder)
+
+    for received_at, frame in read_frames(sorted(glob("recordings/ticks/*.seg.gz"))):
+        ...
+"""
+import gzip
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct('<dI')
+SEGMENT_SUFFIX = '.seg.gz'
+
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024   # uncompressed
+SEGMENT_MAX_SEC = 3600
+QUEUE_SIZE = 100_000
+
+
+class TickRecorder:
+    """Appends (received_at, frame) records to rotating compressed segments."""
+
+    def __init__(self, directory: str, segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 segment_max_sec: float = SEGMENT_MAX_SEC):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_sec = segment_max_sec
+        os.makedirs(directory, exist_ok=True)
+
+        self.records = 0
+        self.dropped = 0
+        self.segments = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._file = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_forever, daemon=True, name="tick-recorder")
+        self._thread.start()
+
+    def record(self, frame: str, received_at: Optional[float] = None) -> None:
+        """Queue one frame. Never blocks — drops (and counts) if the writer is behind."""
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait((time.time() if received_at is None else received_at, frame))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush queued frames and close the current segment."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def get_status(self) -> dict:
+        return {'records': self.records, 'dropped': self.dropped, 'segments': self.segments,
+                'queued': self._queue.qsize()}
+
+    def _write_forever(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"[REC] Write failed: {e}")
+        self._close_segment()
+
+    def _write(self, received_at: float, frame: str) -> None:
+        data = frame.encode('utf-8')
+        now = time.time()
+        if (self._file is None or self._segment_bytes >= self.segment_max_bytes
+                or now - self._segment_opened >= self.segment_max_sec):
+            self._open_segment(now)
+        self._file.write(RECORD_HEADER.pack(received_at, len(data)))
+        self._file.write(data)
+        self._segment_bytes += RECORD_HEADER.size + len(data)
+        self.records += 1
+
+    def _open_segment(self, now: float) -> None:
+        self._close_segment()
+        stamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"ticks-{stamp}-{self.segments:04d}{SEGMENT_SUFFIX}")
+        self._file = gzip.open(path, 'wb', compresslevel=6)
+        self._segment_bytes = 0
+        self._segment_opened = now
+        self.segments += 1
+        logger.info(f"[REC] Recording to {path}")
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                logger.debug(f"[REC] Segment close failed: {e}")
+            self._file = None
+
+
+def write_segment(path: str, frames: Iterable[Tuple[float, str]]) -> int:
+    """Write (received_at, frame) pairs to one segment file synchronously. Returns the count."""
+    count = 0
+    with gzip.open(path, 'wb') as f:
+        for received_at, frame in frames:
+            data = frame.encode('utf-8')
+            f.write(RECORD_HEADER.pack(received_at, len(data)))
+            f.write(data)
+            count += 1
+    return count
+
+
+def read_frames(paths: Iterable[str]) -> Iterator[Tuple[float, str]]:
+    """Yield (received_at, frame) from segment files in the order given."""
+    for path in paths:
+        try:
+            with gzip.open(path, 'rb') as f:
+                while True:
+                    header = f.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    received_at, length = RECORD_HEADER.unpack(header)
+                    data = f.read(length)
+                    if len(data) < length:
+                        break
+                    yield received_at, data.decode('utf-8')
+        except (EOFError, zlib.error, OSError) as e:
+            # Segment cut short (crash / still being written) — keep what was complete
+            logger.warning(f"[REC] {path}: truncated segment ({e})")
@@ -0,0 +1,326 @@
+"""
+data/ticker_hub.py — one shared, in-memory ticker snapshot per exchange.
+
+The scanner, the symbol selector, MarketData and the dashboard each used to
+download the full fetch_tickers() list on their own schedule (the dashboard
+once per viewer every 5s). The hub keeps one immutable snapshot per exchange
+and serves every caller from memory:
+
+  - a snapshot younger than max_age is returned as-is
+  - otherwise one caller refreshes it over REST while concurrent callers for
+    the same exchange wait for that single request (stale data is served if
+    the refresh fails)
+  - only exchanges with a live subscriber (a dashboard viewer polling with
+    subscribe=True) are refreshed in the background every refresh_sec, and
+    only until the subscriber has been quiet for SUBSCRIBER_IDLE_SEC; the
+    trading loop, selector and scanner just refresh on demand by max_age
+  - where a WebSocket ticker stream exists (Binance !miniTicker@arr) it
+    pushes price/volume updates into a subscribed snapshot between REST
+    refreshes
+
+Snapshots are read-only mappings, replaced wholesale (copy-on-write) — hold
+on to one for as long as needed.
+
+    tickers = ticker_hub.get('bybit')                  # Mapping[symbol, ccxt ticker]
+    tickers = ticker_hub.get('bybit', subscribe=True)  # dashboard: keep it warm while viewed
+"""
+import json
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional
+
+from data.exchange_registry import registry
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websocket
+    WS_AVAILABLE = True
+except ImportError:
+    WS_AVAILABLE = False
+
+REFRESH_SEC = 10          # background REST refresh for subscribed exchanges
+WS_REST_REFRESH_SEC = 300 # with a live stream, REST only tops up bid/ask etc.
+MAX_AGE_SEC = 30          # get() refreshes synchronously beyond this
+SUBSCRIBER_IDLE_SEC = 60  # stop background refresh this long after the last subscribed read
+
+
+class _Snapshot(NamedTuple):
+    tickers: Mapping[str, dict]
+    fetched_at: float      # last REST refresh
+    updated_at: float      # last change (REST or stream)
+
+
+class _BinanceMiniTickers:
+    """wss://stream.binance.com — !miniTicker@arr: every changed spot ticker, once per second."""
+
+    url = "wss://stream.binance.com:9443/ws/!miniTicker@arr"
+    RECONNECT_DELAY = 5
+
+    def __init__(self, hub: 'TickerHub', exchange_id: str):
+        self.hub = hub
+        self.exchange_id = exchange_id
+        self.ids: Dict[str, str] = {}   # venue id (BTCUSDT) → unified symbol
+        self.ws = None
+        self.connected = False
+        self.updates = 0
+        self._running = False
+
+    def start(self) -> None:
+        self._running = True
+        threading.Thread(target=self._run_forever, daemon=True,
+                         name=f"tickers-{self.exchange_id}").start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self.ws:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+
+    def _run_forever(self) -> None:
+        while self._running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    self.url,
+                    on_open=self._on_open,
+                    on_message=self._on_message,
+                    on_error=lambda ws, e: logger.error(f"[TICKERS] {self.exchange_id} error: {e}"),
+                    on_close=lambda ws, code, msg: setattr(self, 'connected', False),
+                )
+                self.ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                logger.error(f"[TICKERS] {self.exchange_id} connection error: {e}")
+            self.connected = False
+            if self._running:
+                time.sleep(self.RECONNECT_DELAY)
+
+    def _on_open(self, ws) -> None:
+        self.connected = True
+        logger.info(f"[TICKERS] {self.exchange_id} ticker stream connected")
+
+    def _on_message(self, ws, message: str) -> None:
+        try:
+            items = json.loads(message)
+        except Exception as e:
+            logger.debug(f"[TICKERS] {self.exchange_id} message parse error: {e}")
+            return
+        updates = {}
+        for t in items if isinstance(items, list) else []:
+            symbol = self.ids.get(t.get('s'))
+            if symbol is None:
+                continue
+            close, open_ = float(t['c']), float(t['o'])
+            updates[symbol] = {
+                'timestamp': t.get('E'),
+                'last': close, 'close': close, 'open': open_,
+                'high': float(t['h']), 'low': float(t['l']),
+                'baseVolume': float(t['v']), 'quoteVolume': float(t['q']),
+                'change': close - open_,
+                'percentage': (close - open_) / open_ * 100 if open_ else None,
+            }
+        if updates:
+            self.updates += len(updates)
+            self.hub._apply_stream(self.exchange_id, updates)
+
+
+STREAMS = {'binance': _BinanceMiniTickers}
+
+
+class TickerHub:
+    """Process-wide ticker snapshots, one per exchange id. Thread-safe."""
+
+    def __init__(self, refresh_sec: float = REFRESH_SEC, max_age_sec: float = MAX_AGE_SEC,
+                 use_websocket: bool = True):
+        self.refresh_sec = refresh_sec
+        self.max_age_sec = max_age_sec
+        self.use_websocket = use_websocket
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._clients: Dict[str, object] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._subscribed_at: Dict[str, float] = {}   # exchange → last subscribe=True read
+        self._streams: Dict[str, _BinanceMiniTickers] = {}
+        self.stats = {'hits': 0, 'rest_fetches': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, refresh_sec: Optional[float] = None, max_age_sec: Optional[float] = None,
+                  use_websocket: Optional[bool] = None) -> None:
+        if refresh_sec is not None:
+            self.refresh_sec = refresh_sec
+        if max_age_sec is not None:
+            self.max_age_sec = max_age_sec
+        if use_websocket is not None:
+            self.use_websocket = use_websocket
+
+    # --- Reads ------------------------------------------------------------
+
+    def get(self, exchange_id: str, client=None, max_age: Optional[float] = None,
+            subscribe: bool = False) -> Mapping[str, dict]:
+        """
+        All tickers for exchange_id (read-only). `client` is the ccxt client to
+        use if the hub has none for this id yet (default: the registry's).
+        subscribe=True (polling viewers such as the dashboard) also keeps the
+        snapshot refreshed in the background while those reads continue.
+        Raises only when there is no snapshot at all and the fetch fails.
+        """
+        max_age = self.max_age_sec if max_age is None else max_age
+        with self._lock:
+            if subscribe:
+                self._subscribed_at[exchange_id] = time.time()
+            if client is not None:
+                self._clients.setdefault(exchange_id, client)
+            fetch_lock = self._fetch_locks.setdefault(exchange_id, threading.Lock())
+        if subscribe:
+            self._ensure_thread()
+
+        snap = self._snapshots.get(exchange_id)
+        if snap is not None and time.time() - snap.updated_at <= max_age:
+            self._count('hits')
+            return snap.tickers
+
+        # Single flight: concurrent callers wait for one request
+        with fetch_lock:
+            snap = self._snapshots.get(exchange_id)
+            if snap is not None and time.time() - snap.updated_at <= max_age:
+                self._count('hits')
+                return snap.tickers
+            try:
+                return self._refresh(exchange_id).tickers
+            except Exception as e:
+                if snap is None:
+                    raise
+                logger.warning(f"[TICKERS] {exchange_id} refresh failed, serving "
+                               f"{time.time() - snap.updated_at:.0f}s old snapshot: {e}")
+                return snap.tickers
+
+    def ticker(self, exchange_id: str, symbol: str, client=None) -> Optional[dict]:
+        return self.get(exchange_id, client=client).get(symbol)
+
+    # --- Refresh ----------------------------------------------------------
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _client(self, exchange_id: str):
+        client = self._clients.get(exchange_id)
+        if client is None:
+            client = self._clients.setdefault(exchange_id, registry.get(exchange_id))
+        return client
+
+    def _refresh(self, exchange_id: str) -> _Snapshot:
+        try:
+            tickers = self._client(exchange_id).fetch_tickers() or {}
+        except Exception:
+            self._count('errors')
+            raise
+        now = time.time()
+        snap = _Snapshot(MappingProxyType(dict(tickers)), now, now)
+        with self._lock:
+            self.stats['rest_fetches'] += 1
+            self._snapshots[exchange_id] = snap
+            stream = self._streams.get(exchange_id)
+        if stream is not None:
+            stream.ids = self._venue_ids(snap.tickers)
+        return snap
+
+    @staticmethod
+    def _venue_ids(tickers: Mapping[str, dict]) -> Dict[str, str]:
+        """Exchange-native id (from the raw ticker) → unified symbol."""
+        return {t['info']['symbol']: symbol for symbol, t in tickers.items()
+                if isinstance(t.get('info'), dict) and 'symbol' in t['info']}
+
+    def _apply_stream(self, exchange_id: str, updates: Dict[str, dict]) -> None:
+        """Copy-on-write merge of streamed fields into the current snapshot."""
+        with self._lock:
+            snap = self._snapshots.get(exchange_id)
+            if snap is None:
+                return
+            merged = dict(snap.tickers)
+            for symbol, fields in updates.items():
+                ticker = merged.get(symbol)
+                if ticker is not None:
+                    merged[symbol] = {**ticker, **fields}
+            self._snapshots[exchange_id] = snap._replace(tickers=MappingProxyType(merged),
+                                                         updated_at=time.time())
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run_loop, daemon=True, name='ticker-hub')
+            self._thread.start()
+
+    def _run_loop(self) -> None:
+        while True:
+            time.sleep(max(1.0, self.refresh_sec / 2))
+            now = time.time()
+            with self._lock:
+                active = [eid for eid, t in self._subscribed_at.items() if now - t <= SUBSCRIBER_IDLE_SEC]
+                idle = [eid for eid in self._streams if eid not in active]
+                for eid in [eid for eid in self._subscribed_at if eid not in active]:
+                    del self._subscribed_at[eid]
+                if not active and not idle:
+                    # Nobody subscribed: exit; the next subscribed read starts a new thread
+                    self._thread = None
+                    return
+            for eid in idle:
+                self._stop_stream(eid)
+            for eid in active:
+                try:
+                    self._maintain(eid, now)
+                except Exception as e:
+                    logger.debug(f"[TICKERS] {eid} background refresh failed: {e}")
+
+    def _maintain(self, exchange_id: str, now: float) -> None:
+        if self.use_websocket and WS_AVAILABLE and exchange_id in STREAMS:
+            with self._lock:
+                if exchange_id not in self._streams:
+                    stream = self._streams[exchange_id] = STREAMS[exchange_id](self, exchange_id)
+                    snap = self._snapshots.get(exchange_id)
+                    if snap is not None:
+                        stream.ids = self._venue_ids(snap.tickers)
+                    stream.start()
+        stream = self._streams.get(exchange_id)
+        interval = WS_REST_REFRESH_SEC if stream is not None and stream.connected else self.refresh_sec
+        snap = self._snapshots.get(exchange_id)
+        if snap is None or now - snap.fetched_at >= interval:
+            with self._fetch_locks[exchange_id]:
+                self._refresh(exchange_id)
+
+    def _stop_stream(self, exchange_id: str) -> None:
+        with self._lock:
+            stream = self._streams.pop(exchange_id, None)
+        if stream is not None:
+            stream.stop()
+
+    # --- Status -----------------------------------------------------------
+
+    def get_status(self) -> dict:
+        """Per-exchange snapshot size/age and stream state for the dashboard."""
+        now = time.time()
+        with self._lock:
+            snapshots = dict(self._snapshots)
+            streams = dict(self._streams)
+            subscribed = set(self._subscribed_at)
+            stats = dict(self.stats)
+        exchanges = {}
+        for eid, snap in snapshots.items():
+            stream = streams.get(eid)
+            exchanges[eid] = {
+                'symbols': len(snap.tickers),
+                'age_sec': round(now - snap.updated_at, 1),
+                'rest_age_sec': round(now - snap.fetched_at, 1),
+                'stream': ('live' if stream.connected else 'down') if stream else None,
+                'stream_updates': stream.updates if stream else 0,
+                'subscribed': eid in subscribed,
+            }
+        return {'exchanges': exchanges, **stats}
+
+
+# Process-wide hub (like data.exchange_registry.registry)
+ticker_hub = TickerHub()
@@ -11,11 +11,10 @@ Trading still happens on MEXC via the broker.
 
 import json
 import time
+import queue
 import logging
 import threading
 from typing import Callable, Optional
-from dataclasses import dataclass
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -27,13 +26,226 @@ except ImportError:
     logger.warning("[WS] websocket-client not installed — WebSocket disabled. pip install websocket-client")
 
 
-@dataclass
-class PriceTick:
-    """Single price tick from WebSocket stream."""
-    symbol:    str
-    price:     float
-    volume:    float
-    timestamp: float   # Unix timestamp in seconds
+class TickWindow:
+    """
+    The last `capacity` ticks of one symbol in a fixed ring, with running
+    volume sums for the momentum window and for everything older (the
+    baseline). Appending a tick and reading the window stats are O(1):
+    ticks leave the window from its old end as time moves on, and leave the
+    ring when overwritten. Sums are rebuilt from the ring once per
+    `capacity` appends so floating-point drift never accumulates.
+    """
+
+    __slots__ = ('capacity', 'window_sec', 'ts', 'price', 'volume', 'head', 'count',
+                 'win_count', 'win_volume', 'total_volume', '_since_rebuild')
+
+    def __init__(self, capacity: int, window_sec: float):
+        self.capacity = capacity
+        self.window_sec = window_sec
+        self.ts = [0.0] * capacity
+        self.price = [0.0] * capacity
+        self.volume = [0.0] * capacity
+        self.head = 0              # next slot to write
+        self.count = 0             # ticks in the ring
+        self.win_count = 0         # newest ticks within window_sec of the latest one
+        self.win_volume = 0.0
+        self.total_volume = 0.0
+        self._since_rebuild = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, price: float, volume: float, timestamp: float) -> None:
+        cap = self.capacity
+        head = self.head
+        if self.count == cap:
+            # Overwriting the oldest tick (slot `head`)
+            old_volume = self.volume[head]
+            self.total_volume -= old_volume
+            if self.win_count == cap:
+                self.win_count -= 1
+                self.win_volume -= old_volume
+            self.count -= 1
+
+        self.ts[head] = timestamp
+        self.price[head] = price
+        self.volume[head] = volume
+        self.head = (head + 1) % cap
+        self.count += 1
+        self.total_volume += volume
+        self.win_count += 1
+        self.win_volume += volume
+
+        # Expire ticks that fell out of the window
+        while self.win_count and timestamp - self.ts[(self.head - self.win_count) % cap] > self.window_sec:
+            self.win_volume -= self.volume[(self.head - self.win_count) % cap]
+            self.win_count -= 1
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= cap:
+            self._rebuild_sums()
+
+    def _rebuild_sums(self) -> None:
+        cap, head = self.capacity, self.head
+        self.total_volume = sum(self.volume[(head - i) % cap] for i in range(1, self.count + 1))
+        self.win_volume = sum(self.volume[(head - i) % cap] for i in range(1, self.win_count + 1))
+        self._since_rebuild = 0
+
+    @property
+    def window_first_price(self) -> float:
+        """Price of the oldest tick still inside the window."""
+        return self.price[(self.head - self.win_count) % self.capacity]
+
+    @property
+    def last_price(self) -> Optional[float]:
+        return self.price[(self.head - 1) % self.capacity] if self.count else None
+
+
+class _StreamConnection:
+    """
+    One Binance socket carrying a shard of the monitored symbols.
+
+    The socket thread only receives: frames go onto a queue drained by this
+    connection's own parser thread, so a hot shard can't stall another
+    shard's reads (or its pings). Subscriptions are changed on the live
+    socket with SUBSCRIBE/UNSUBSCRIBE; on (re)connect the whole current set
+    is subscribed again.
+    """
+
+    PARAMS_PER_REQUEST = 200   # streams per SUBSCRIBE message
+    QUEUE_SIZE = 50_000        # frames; oldest dropped beyond this
+
+    def __init__(self, monitor: 'WebSocketMonitor', index: int):
+        self.monitor = monitor
+        self.index = index
+        self.symbols: set = set()
+        self.ws = None
+        self.connected = False
+        self.dropped = 0
+        self._running = False
+        self._request_id = 0
+        self._lock = threading.Lock()
+        self._frames: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._threads: list = []
+
+    def start(self, connect: bool = True) -> None:
+        """Start the parser thread and, unless connect=False (replays feed()), the socket."""
+        self._running = True
+        targets = [(self._parse_forever, 'parse')]
+        if connect:
+            targets.append((self._run_forever, 'recv'))
+        for target, name in targets:
+            t = threading.Thread(target=target, daemon=True, name=f"websocket-monitor-{self.index}-{name}")
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        self._running = False
+        self.connected = False
+        if self.ws:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+        try:
+            self._frames.put_nowait(None)   # Wake the parser
+        except queue.Full:
+            pass
+
+    def is_alive(self) -> bool:
+        return self._running and self.connected and all(t.is_alive() for t in self._threads)
+
+    def add(self, symbols: set) -> None:
+        with self._lock:
+            new = symbols - self.symbols
+            self.symbols |= new
+        self._send('SUBSCRIBE', new)
+
+    def remove(self, symbols: set) -> None:
+        with self._lock:
+            gone = symbols & self.symbols
+            self.symbols -= gone
+        self._send('UNSUBSCRIBE', gone)
+
+    def _send(self, method: str, symbols) -> None:
+        """Change subscriptions on the live socket (no-op while disconnected)."""
+        if not symbols or not self.connected or self.ws is None:
+            return
+        params = [f"{symbol}@aggTrade" for symbol in sorted(symbols)]
+        try:
+            for i in range(0, len(params), self.PARAMS_PER_REQUEST):
+                self._request_id += 1
+                self.ws.send(json.dumps({"method": method,
+                                         "params": params[i:i + self.PARAMS_PER_REQUEST],
+                                         "id": self._request_id}))
+        except Exception as e:
+            # The reconnect re-subscribes the full set
+            logger.debug(f"[WS] {method} failed on connection {self.index}: {e}")
+
+    def _run_forever(self) -> None:
+        """Keep WebSocket alive — reconnect on disconnect."""
+        while self._running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    self.monitor.BINANCE_WS_URL,
+                    on_open=self._on_open,
+                    on_message=self._enqueue,
+                    on_error=self.monitor._on_error,
+                    on_close=self._on_close,
+                )
+                self.ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                logger.error(f"[WS] Connection error: {e}")
+            self.connected = False
+            if self._running:
+                logger.warning(f"[WS] Reconnecting in {self.monitor.RECONNECT_DELAY}s...")
+                time.sleep(self.monitor.RECONNECT_DELAY)
+
+    def _on_open(self, ws) -> None:
+        """Subscribe to aggTrade streams for this shard's symbols."""
+        # Mark connected first: a concurrent add() then subscribes on its own
+        # (a duplicate SUBSCRIBE is harmless, a missed one is not)
+        self.connected = True
+        with self._lock:
+            symbols = set(self.symbols)
+        logger.warning(f"[WS] Connected to Binance — subscribing to {len(symbols)} symbols "
+                       f"(connection {self.index})")
+        self._send('SUBSCRIBE', symbols)
+
+    def _on_close(self, ws, close_status, close_msg) -> None:
+        self.connected = False
+        logger.warning(f"[WS] Connection {self.index} closed: {close_status}")
+
+    def _enqueue(self, ws, message: str) -> None:
+        # Stamped on receipt: the tick clock, and what the recorder stores
+        self.feed(message, time.time())
+
+    def feed(self, message: str, received_at: float, block: bool = False) -> None:
+        """Hand one frame to the parser thread (replays pass block=True to never shed)."""
+        recorder = self.monitor.recorder
+        if recorder is not None:
+            recorder.record(message, received_at)
+        frame = (received_at, message)
+        if block:
+            self._frames.put(frame)
+            return
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            # Parser can't keep up — shed the oldest frame, keep the newest
+            self.dropped += 1
+            try:
+                self._frames.get_nowait()
+                self._frames.put_nowait(frame)
+            except (queue.Empty, queue.Full):
+                pass
+
+    def _parse_forever(self) -> None:
+        while self._running:
+            frame = self._frames.get()
+            if frame is None:
+                continue
+            self.monitor._on_message(self.ws, frame[1], received_at=frame[0])
 
 
 class WebSocketMonitor:
@@ -45,14 +257,18 @@ class WebSocketMonitor:
 
     BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
     RECONNECT_DELAY = 5    # seconds before reconnect attempt
+    MAX_STREAMS_PER_CONNECTION = 200   # Binance allows 1024; smaller shards spread parsing load
     HISTORY_SIZE    = 120  # keep last 120 ticks per symbol
+    WINDOW_SEC      = 30   # momentum window; older ticks in the history are the volume baseline
 
     def __init__(
         self,
         symbols: list,
         on_momentum: Callable,
         momentum_threshold: float = 0.003,   # 0.3% move = momentum signal
-        volume_multiplier: float = 2.0       # Volume must be 2x average
+        volume_multiplier: float = 2.0,      # Volume must be 2x average
+        max_streams_per_connection: Optional[int] = None,
+        recorder=None                        # Optional TickRecorder: raw frames to disk
     ):
         # Binance uses lowercase: btcusdt
         self.symbols            = [s.replace('/', '').lower() for s in symbols]
@@ -61,84 +277,62 @@ class WebSocketMonitor:
         self.on_momentum        = on_momentum
         self.momentum_threshold = momentum_threshold
         self.volume_multiplier  = volume_multiplier
+        self.recorder           = recorder
 
-        # Price history per symbol: deque of PriceTick
-        self.price_history: dict = {
-            s: deque(maxlen=self.HISTORY_SIZE) for s in self.symbols
-        }
+        # Tick history per symbol: ring buffer with running window sums
+        self.price_history: dict = {s: self._new_window() for s in self.symbols}
 
-        self.ws = None
-        self._thread: Optional[threading.Thread] = None
+        self.max_streams_per_connection = max_streams_per_connection or self.MAX_STREAMS_PER_CONNECTION
+        self._connections: list = []          # _StreamConnection shards
+        self._conn_lock = threading.Lock()
         self._running = False
         self._momentum_signals_today = 0
         self._last_momentum_info = ""
-        self._connected = False
 
     def start(self) -> None:
-        """Start WebSocket in background thread."""
+        """Start WebSocket connections (one per shard) in background threads."""
         if not WS_AVAILABLE:
             logger.warning("[WS] Cannot start — websocket-client not installed")
             return
 
         self._running = True
-        self._thread = threading.Thread(
-            target=self._run_forever,
-            daemon=True,
-            name="websocket-monitor"
-        )
-        self._thread.start()
-        logger.warning("[WS] WebSocket monitor started")
+        self._place(set(self.symbols))
+        logger.warning(f"[WS] WebSocket monitor started ({len(self._connections)} connection(s))")
 
     def stop(self) -> None:
         """Stop WebSocket monitor."""
         self._running = False
-        if self.ws:
-            try:
-                self.ws.close()
-            except Exception:
-                pass
-        self._connected = False
+        with self._conn_lock:
+            for conn in self._connections:
+                conn.stop()
+            self._connections = []
+        if self.recorder is not None:
+            self.recorder.close()
         logger.warning("[WS] WebSocket monitor stopped")
 
-    def _run_forever(self) -> None:
-        """Keep WebSocket alive — reconnect on disconnect."""
-        while self._running:
-            try:
-                self._connect()
-            except Exception as e:
-                logger.error(f"[WS] Connection error: {e}")
-            self._connected = False
-            if self._running:
-                logger.warning(f"[WS] Reconnecting in {self.RECONNECT_DELAY}s...")
-                time.sleep(self.RECONNECT_DELAY)
-
-    def _connect(self) -> None:
-        """Create and run WebSocket connection."""
-        self.ws = websocket.WebSocketApp(
-            self.BINANCE_WS_URL,
-            on_open=self._on_open,
-            on_message=self._on_message,
-            on_error=self._on_error,
-            on_close=self._on_close,
-        )
-        self.ws.run_forever(ping_interval=20, ping_timeout=10)
-
-    def _on_open(self, ws) -> None:
-        """Subscribe to aggTrade streams for all monitored symbols."""
-        logger.warning(f"[WS] Connected to Binance — subscribing to {len(self.symbols)} symbols")
-        self._connected = True
-
-        # Binance: subscribe to aggregated trades for each symbol
-        params = [f"{symbol}@aggTrade" for symbol in self.symbols]
-        subscribe_msg = {
-            "method": "SUBSCRIBE",
-            "params": params,
-            "id": 1
-        }
-        ws.send(json.dumps(subscribe_msg))
-
-    def _on_message(self, ws, message: str) -> None:
-        """Process incoming aggregated trade from Binance."""
+    def _place(self, symbols: set) -> None:
+        """Subscribe new symbols on shards with spare capacity, opening shards as needed."""
+        cap = self.max_streams_per_connection
+        with self._conn_lock:
+            pending = sorted(symbols)
+            for conn in self._connections:
+                room = cap - len(conn.symbols)
+                if room > 0 and pending:
+                    conn.add(set(pending[:room]))
+                    pending = pending[room:]
+            while pending:
+                conn = _StreamConnection(self, len(self._connections))
+                conn.symbols = set(pending[:cap])
+                pending = pending[cap:]
+                self._connections.append(conn)
+                if self._running:
+                    conn.start()
+
+    def _on_message(self, ws, message: str, received_at: Optional[float] = None) -> None:
+        """
+        Process incoming aggregated trade from Binance. `received_at` is when
+        the frame arrived (replays pass the recorded time); defaults to now.
+        """
         try:
             data = json.loads(message)
 
@@ -159,29 +353,29 @@ class WebSocketMonitor:
             if price <= 0 or not symbol:
                 return
 
-            tick = PriceTick(
-                symbol=symbol,
-                price=price,
-                volume=volume,
-                timestamp=time.time(),
-            )
-
-            # Store in history
-            history = self.price_history.get(symbol)
-            if history is not None:
-                history.append(tick)
-                # Check for momentum after we have enough history
-                if len(history) >= 10:
-                    self._check_momentum(symbol, tick, history)
+            self._on_tick(symbol, price, volume, received_at if received_at is not None else time.time())
 
         except Exception as e:
             logger.debug(f"[WS] Message parse error: {e}")
 
+    def _new_window(self) -> TickWindow:
+        return TickWindow(self.HISTORY_SIZE, self.WINDOW_SEC)
+
+    def _on_tick(self, symbol: str, price: float, volume: float, timestamp: float) -> None:
+        """Record one trade and check for momentum — constant time per tick."""
+        history = self.price_history.get(symbol)
+        if history is not None:
+            history.append(price, volume, timestamp)
+            # Check for momentum after we have enough history
+            if len(history) >= 10:
+                self._check_momentum(symbol, price, timestamp, history)
+
     def _check_momentum(
         self,
         symbol: str,
-        current: PriceTick,
-        history: deque
+        current_price: float,
+        now: float,
+        history: TickWindow
     ) -> None:
         """
         Detect momentum spike — the core signal.
@@ -190,16 +384,12 @@ class WebSocketMonitor:
         1. Price moved > momentum_threshold in last 30 seconds
         2. Volume is above average (surge confirmation)
         """
-        ticks = list(history)
-
-        # Get price 30 seconds ago
-        now = current.timestamp
-        ticks_30s = [t for t in ticks if now - t.timestamp <= 30]
-        if len(ticks_30s) < 5:
+        count_30s = history.win_count
+        if count_30s < 5:
             return
 
-        price_30s_ago = ticks_30s[0].price
-        current_price = current.price
+        # Price 30 seconds ago
+        price_30s_ago = history.window_first_price
 
         if price_30s_ago <= 0:
             return
@@ -207,11 +397,11 @@ class WebSocketMonitor:
         # Price change in last 30 seconds
         price_change = (current_price - price_30s_ago) / price_30s_ago
 
-        # Volume: sum volume over last 30s vs average
-        vol_30s = sum(t.volume for t in ticks_30s)
-        older_ticks = [t for t in ticks if now - t.timestamp > 30]
-        if len(older_ticks) >= 5:
-            avg_vol_30s = sum(t.volume for t in older_ticks) / len(older_ticks) * len(ticks_30s)
+        # Volume: sum volume over last 30s vs average of the older ticks
+        vol_30s = history.win_volume
+        older_count = history.count - count_30s
+        if older_count >= 5:
+            avg_vol_30s = (history.total_volume - vol_30s) / older_count * count_30s
             volume_ratio = vol_30s / avg_vol_30s if avg_vol_30s > 0 else 1.0
         else:
             volume_ratio = 1.0
@@ -250,37 +440,62 @@ class WebSocketMonitor:
     def _on_error(self, ws, error) -> None:
         logger.error(f"[WS] Error: {error}")
 
-    def _on_close(self, ws, close_status, close_msg) -> None:
-        self._connected = False
-        logger.warning(f"[WS] Connection closed: {close_status}")
-
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """Get most recent price for a symbol."""
         symbol_key = symbol.replace('/', '').lower()
         history = self.price_history.get(symbol_key)
-        if history and len(history) > 0:
-            return list(history)[-1].price
-        return None
+        return history.last_price if history is not None else None
 
     def is_connected(self) -> bool:
-        """Check if WebSocket is currently connected."""
-        return self._running and self._connected and self._thread is not None and self._thread.is_alive()
+        """Check if WebSocket is currently connected (every shard up)."""
+        with self._conn_lock:
+            conns = list(self._connections)
+        return self._running and bool(conns) and all(c.is_alive() for c in conns)
 
     def get_status(self) -> dict:
         """Return WebSocket status for dashboard."""
+        with self._conn_lock:
+            conns = list(self._connections)
         return {
             'connected': self.is_connected(),
             'symbols_monitored': len(self.symbols),
+            'connections': len(conns),
+            'connections_up': sum(1 for c in conns if c.connected),
+            'frames_dropped': sum(c.dropped for c in conns),
             'momentum_signals_today': self._momentum_signals_today,
             'last_momentum': self._last_momentum_info or "—",
+            'recorder': self.recorder.get_status() if self.recorder is not None else None,
         }
 
     def update_symbols(self, new_symbols: list) -> None:
-        """Update monitored symbols list (called after scan)."""
-        new_keys = [s.replace('/', '').lower() for s in new_symbols]
+        """
+        Update monitored symbols (called after scan). Only the difference is
+        sent: dropped symbols are unsubscribed from their shard, new ones
+        subscribed where there is room — existing streams are never torn down.
+        """
+        new_keys = list(dict.fromkeys(s.replace('/', '').lower() for s in new_symbols))
         for key in new_keys:
             if key not in self.price_history:
-                self.price_history[key] = deque(maxlen=self.HISTORY_SIZE)
+                self.price_history[key] = self._new_window()
         for s in new_symbols:
             self.symbol_map[s.replace('/', '').lower()] = s
+
+        wanted, current = set(new_keys), set(self.symbols)
         self.symbols = new_keys
+        if not self._running:
+            return
+
+        removed = current - wanted
+        if removed:
+            with self._conn_lock:
+                for conn in self._connections:
+                    conn.remove(removed)
+                # Close shards left empty
+                for conn in [c for c in self._connections if not c.symbols]:
+                    conn.stop()
+                self._connections = [c for c in self._connections if c.symbols]
+        if wanted - current:
+            self._place(wanted - current)
+        if removed or wanted - current:
+            logger.debug(f"[WS] Subscriptions: +{len(wanted - current)} -{len(removed)} "
+                         f"across {len(self._connections)} connection(s)")
@@ -388,13 +388,25 @@ class BinanceBroker(Broker):
 
     # --- Precision helpers -----------------------------------------------------
 
+    def _market_info(self, symbol: str):
+        try:
+            return self.market.get_market_info(symbol, 'binance')
+        except Exception:
+            return None
+
     def _amount_to_precision(self, symbol: str, amount: float) -> float:
+        info = self._market_info(symbol)
+        if info is not None and info.step_size:
+            return info.round_qty(amount)
         try:
             return float(self.exchange.amount_to_precision(symbol, amount))
         except Exception:
             return float(amount)
 
     def _price_to_precision(self, symbol: str, price: float) -> float:
+        info = self._market_info(symbol)
+        if info is not None and info.tick_size:
+            return info.round_price(price)
         try:
             return float(self.exchange.price_to_precision(symbol, price))
         except Exception:
@@ -8,6 +8,7 @@ import logging
 import ccxt
 from typing import List, Optional
 from core.types import Signal, Order, Position, Side, OrderType, OrderStatus
+from data.exchange_registry import registry
 from execution.broker_base import Broker
 from storage.sqlite_store import SQLiteStore
 
@@ -28,6 +29,8 @@ class MexcBroker(Broker):
                 'defaultType': 'spot',
             }
         })
+        # Authenticated client can't be shared, but markets can
+        registry.prime(self.exchange, 'mexc')
 
     def get_balance(self) -> float:
         """Returns available USDT balance."""
@@ -60,6 +63,7 @@ class MexcBroker(Broker):
         """Place a market order on MEXC."""
         try:
             side = 'buy' if signal.side == Side.BUY else 'sell'
+            size = self._amount_to_precision(signal.symbol, size)
             order = self.exchange.create_order(
                 symbol=signal.symbol,
                 type='market',
@@ -88,6 +92,14 @@ class MexcBroker(Broker):
             logger.error(f"[MEXC] Order failed: {e}")
             return None
 
+    def _amount_to_precision(self, symbol: str, amount: float) -> float:
+        """Floor to the venue's lot step via the market index (no ccxt dict walk)."""
+        try:
+            info = self.market.get_market_info(symbol, 'mexc')
+        except Exception:
+            info = None
+        return info.round_qty(amount) if info is not None else float(amount)
+
     def get_open_position(self) -> Optional[Position]:
         """Backward compat: returns first open position."""
         positions = self.store.get_open_positions()
@@ -0,0 +1,195 @@
+"""
+execution/momentum_executor.py — act on WebSocket momentum events as they arrive.
+
+Momentum events used to wait in momentum_queue for the next job() cycle
+(up to scan_interval_minutes) and then paid a candle fetch plus a full
+indicator pass just to read ATR. The executor drains the queue on its own
+thread the moment an event lands, and reads ATR / volume ratio from a
+per-symbol snapshot. The scan and exit phases seed it from full indicator
+frames; kline stream updates then advance it bar by bar, so for streamed
+symbols the volume ratio reflects the forming bar as of the last update.
+
+Latency is measured from the frame's receive time (the event timestamp)
+to the decision and, for executed events, to the order being accepted.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 500
+FEATURE_MAX_AGE_SEC = 60     # older snapshots are recomputed before use
+ATR_WINDOW = 14              # must match FeatureEngine.compute_indicators
+VOLUME_WINDOW = 20
+
+
+class SymbolFeatureCache:
+    """
+    Latest indicator row per symbol (atr, atr_percent, volume_ratio + the
+    frame for ML feature extraction), seeded whenever a phase computes a
+    frame on the trading timeframe and advanced by update_bar() on every
+    kline stream update. Frames are shared — treat as read-only.
+    """
+
+    def __init__(self, max_age_sec: float = FEATURE_MAX_AGE_SEC):
+        self.max_age_sec = max_age_sec
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stream_updates': 0}
+
+    def update(self, symbol: str, df) -> None:
+        if df is None or df.empty:
+            return
+        last = df.iloc[-1]
+        entry = {
+            'atr': float(last.get('atr', 0.0)),
+            'atr_percent': float(last.get('atr_percent', 1.0)),
+            'volume_ratio': float(last.get('volume_ratio', 1.0)),
+            'df': df,
+            'updated': time.time(),
+        }
+        if len(df) > VOLUME_WINDOW and 'atr' in df:
+            # What update_bar() needs to roll the last row forward
+            stamps = df.index.as_unit('ms').asi8
+            entry['bar'] = {
+                'timestamp': int(stamps[-1]),
+                'bar_ms': int(stamps[-1] - stamps[-2]),
+                'volume': float(df['volume'].iat[-1]),
+                'close': float(df['close'].iat[-1]),
+                'prev_close': float(df['close'].iat[-2]),
+                'prev_atr': float(df['atr'].iat[-2]),
+                'prev_volumes': deque(df['volume'].iloc[-VOLUME_WINDOW:-1].tolist(),
+                                      maxlen=VOLUME_WINDOW - 1),
+            }
+        with self._lock:
+            self._entries[symbol] = entry
+
+    def update_bar(self, symbol: str, timestamp: int, high: float, low: float,
+                   close: float, volume: float) -> None:
+        """
+        Advance symbol's snapshot with one streamed bar (forming or closed):
+        the same ATR (Wilder, 14) and volume-ratio (vs 20-bar mean) the full
+        indicator pass would give for that row. Ignored when there is no
+        seeded snapshot or the stream skipped a bar — the entry then ages
+        out and is recomputed from candles.
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            state = entry.get('bar') if entry is not None else None
+            if state is None or timestamp < state['timestamp']:
+                return
+            if timestamp > state['timestamp']:
+                if timestamp - state['timestamp'] != state['bar_ms']:
+                    return
+                # Previous bar closed: it joins the baselines
+                state = dict(state, timestamp=timestamp, prev_close=state['close'],
+                             prev_atr=entry['atr'], prev_volumes=deque(state['prev_volumes'],
+                                                                        maxlen=VOLUME_WINDOW - 1))
+                state['prev_volumes'].append(entry['bar']['volume'])
+            true_range = max(high - low, abs(high - state['prev_close']), abs(low - state['prev_close']))
+            atr = (state['prev_atr'] * (ATR_WINDOW - 1) + true_range) / ATR_WINDOW
+            volume_mean = (sum(state['prev_volumes']) + volume) / VOLUME_WINDOW
+            self._entries[symbol] = dict(
+                entry,
+                atr=atr,
+                atr_percent=atr / close * 100 if close else entry['atr_percent'],
+                volume_ratio=volume / (volume_mean or 1),
+                updated=time.time(),
+                bar=dict(state, volume=volume, close=close),
+            )
+            self.stats['stream_updates'] += 1
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Fresh snapshot for symbol, or None (missing or older than max_age_sec)."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or time.time() - entry['updated'] > self.max_age_sec:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MomentumExecutor:
+    """
+    Consumes momentum events on a daemon thread and hands each to `handler`.
+    handler(event) returns True when an order was placed.
+    """
+
+    def __init__(self, events: queue.Queue, handler: Callable[[dict], bool]):
+        self.events = events
+        self.handler = handler
+        self.processed = 0
+        self.orders = 0
+        self.errors = 0
+        self._decision_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._order_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name='momentum-executor')
+        self._thread.start()
+        logger.warning("[MOMENTUM] Executor thread started — events handled on arrival")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                event = self.events.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            self.process(event)
+
+    def process(self, event: dict) -> bool:
+        """Handle one event and record its latency. Never raises."""
+        try:
+            placed = bool(self.handler(event))
+        except Exception as e:
+            logger.error(f"[MOMENTUM] Processing error: {e}", exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return False
+
+        elapsed_ms = (time.time() - event.get('timestamp', time.time())) * 1000
+        with self._lock:
+            self.processed += 1
+            self._decision_ms.append(elapsed_ms)
+            if placed:
+                self.orders += 1
+                self._order_ms.append(elapsed_ms)
+        return placed
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, Optional[float]]:
+        if not samples:
+            return {'p50': None, 'p95': None, 'max': None}
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1)
+        return {'p50': pick(0.50), 'p95': pick(0.95), 'max': round(ordered[-1], 1)}
+
+    def get_stats(self) -> dict:
+        """Counters and event→decision / event→order latency (ms) for the dashboard."""
+        with self._lock:
+            return {
+                'running': self.is_running(),
+                'processed': self.processed,
+                'orders': self.orders,
+                'errors': self.errors,
+                'queued': self.events.qsize(),
+                'event_to_decision_ms': self._percentiles(self._decision_ms),
+                'event_to_order_ms': self._percentiles(self._order_ms),
+            }
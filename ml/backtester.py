@@ -13,6 +13,7 @@ import logging
 import yaml
 import pandas as pd
 from data.market import MarketData
+from data.history import HistoryDownloader
 from data.features import FeatureEngine
 from ml.triple_barrier import TripleBarrierLabeler, BarrierConfig
 from strategy.scanner import MarketScanner
@@ -39,9 +40,8 @@ def backtest_symbol(
     scanner = MarketScanner()
     labeler = TripleBarrierLabeler(tb_config)
 
-    # Fetch enough candles
-    limit = lookback_days * 24   # 1h candles
-    candles = market.fetch_ohlcv(symbol, timeframe, limit=limit)
+    # Full lookback from the local archive (paged download of missing bars)
+    candles = HistoryDownloader(market).load_candles(symbol, timeframe, lookback_days)
     if not candles:
         print(f"{symbol}: No candle data available")
         return pd.DataFrame()
@@ -114,9 +114,9 @@ class MonteCarloSimulator:
 
 def run_from_trades_db(db_path: str = "swingbot.db", n_runs: int = 1000) -> dict:
     """Run Monte Carlo using trades from the production database."""
-    import sqlite3
+    from storage.connection_pool import get_pool
 
-    conn = sqlite3.connect(db_path)
+    conn = get_pool(db_path).connection()
     cursor = conn.cursor()
     cursor.execute(
         "SELECT pnl_percent FROM positions WHERE status = 'CLOSED' AND pnl_percent IS NOT NULL AND pnl_percent != 0"
@@ -24,7 +24,6 @@ class Bandit:
         self.n_arms = len(ARMS)
         self.states: Dict[str, Dict[str, list]] = {}
         self._reset_states()
-        self._ensure_regime_column()
 
     def _reset_states(self) -> None:
         self.states = {
@@ -47,17 +46,6 @@ class Bandit:
         }
         return aliases.get(value, "transition")
 
-    def _ensure_regime_column(self) -> None:
-        """Upgrade existing databases without requiring a manual migration."""
-        conn = self.store.get_connection()
-        try:
-            columns = {row["name"] for row in conn.execute("PRAGMA table_info(arm_performance)")}
-            if "regime" not in columns:
-                conn.execute("ALTER TABLE arm_performance ADD COLUMN regime TEXT NOT NULL DEFAULT 'transition'")
-                conn.commit()
-        finally:
-            conn.close()
-
     def update_stats(self) -> None:
         self._reset_states()
         conn = self.store.get_connection()
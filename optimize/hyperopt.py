@@ -47,11 +47,11 @@ class StrategyHyperopt:
             return self._df_cache
 
         from data.market import MarketData
+        from data.history import HistoryDownloader
         from data.features import FeatureEngine
 
         market = MarketData(exchange_id='bybit')
-        limit = min(self.days * 24, 1000)
-        candles = market.fetch_ohlcv(self.symbol, '1h', limit=limit)
+        candles = HistoryDownloader(market).load_candles(self.symbol, '1h', self.days)
         if not candles or len(candles) < 100:
             raise ValueError(f"Not enough data for {self.symbol}")
 
@@ -26,29 +26,8 @@ class ConservativeMode:
     def __init__(self, store, config: dict = None):
         self.store = store
         self.config = config or {}
-        self._ensure_table()
         self._state = self._load_state()
 
-    def _ensure_table(self) -> None:
-        """Create the conservative_mode_state table if not exists."""
-        conn = self.store.get_connection()
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS conservative_mode_state (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                active INTEGER DEFAULT 0,
-                reason TEXT DEFAULT '',
-                activated_at TEXT DEFAULT '',
-                consecutive_wins INTEGER DEFAULT 0,
-                risk_multiplier REAL DEFAULT 1.0
-            )
-        """)
-        conn.execute("""
-            INSERT OR IGNORE INTO conservative_mode_state (id, active, reason, activated_at, consecutive_wins, risk_multiplier)
-            VALUES (1, 0, '', '', 0, 1.0)
-        """)
-        conn.commit()
-        conn.close()
-
     def _load_state(self) -> dict:
         """Load state from SQLite."""
         conn = self.store.get_connection()
@@ -1,5 +1,6 @@
-from typing import Tuple, List
-from core.types import Signal, Position
+from typing import Tuple, List, Union
+from core.types import Signal, Position, MarketInfo
+from data.market_index import as_market_info
 
 class RiskEngine:
     def __init__(self,
@@ -176,15 +177,15 @@ class RiskEngine:
 
         return position_size
 
-    def check_min_notional(self, size: float, price: float, market_structure: dict) -> Tuple[bool, str]:
-        if not market_structure:
+    def check_min_notional(self, size: float, price: float,
+                           market_structure: Union[MarketInfo, dict, None]) -> Tuple[bool, str]:
+        info = as_market_info(market_structure)
+        if info is None:
             return True, ""
 
-        limits = market_structure.get('limits', {})
         cost = size * price
-
-        min_cost = limits.get('cost', {}).get('min') or 0
-        min_amount = limits.get('amount', {}).get('min') or 0
+        min_cost = info.min_notional
+        min_amount = info.min_qty
 
         if cost < min_cost:
             return False, f"Cost {cost} < Min {min_cost}"
@@ -200,7 +201,7 @@ class RiskEngine:
         risk_pct: float,
         entry_price: float,
         stop_price: float,
-        market_structure: dict = None
+        market_structure: Union[MarketInfo, dict, None] = None
     ) -> float:
         """
         Convert a risk percentage into an exchange-valid order quantity.
@@ -212,13 +213,12 @@ class RiskEngine:
             risk_pct: Risk as percentage (e.g. 3.0 for 3%)
             entry_price: Expected entry price
             stop_price: Stop-loss price
-            market_structure: ccxt market info dict (from exchange.market(symbol))
+            market_structure: MarketInfo from MarketData.get_market_info()
+                (a raw ccxt market dict is still accepted)
 
         Returns:
             Exchange-valid quantity, or 0.0 if order would be below minimums.
         """
-        import math
-
         sl_distance = abs(entry_price - stop_price)
         if sl_distance == 0 or entry_price == 0:
             return 0.0
@@ -230,37 +230,23 @@ class RiskEngine:
         max_qty = capital / entry_price
         qty = min(qty, max_qty)
 
-        if not market_structure:
+        info = as_market_info(market_structure)
+        if info is None:
             return qty
 
-        # Apply exchange precision constraints
-        limits = market_structure.get('limits', {})
-        precision = market_structure.get('precision', {})
-
-        # Step size / amount precision
-        amount_precision = precision.get('amount')
-        if amount_precision is not None:
-            if isinstance(amount_precision, int):
-                # Decimal places (e.g. 3 means 0.001 step)
-                factor = 10 ** amount_precision
-                qty = math.floor(qty * factor) / factor
-            elif isinstance(amount_precision, float) and amount_precision > 0:
-                # Step size (e.g. 0.01)
-                qty = math.floor(qty / amount_precision) * amount_precision
+        # Step size / amount precision (floor to the lot step)
+        qty = info.round_qty(qty)
 
         # Min amount check
-        min_amount = limits.get('amount', {}).get('min')
-        if min_amount and qty < min_amount:
+        if info.min_qty and qty < info.min_qty:
             return 0.0
 
         # Min cost (notional) check
-        min_cost = limits.get('cost', {}).get('min')
-        if min_cost and (qty * entry_price) < min_cost:
+        if info.min_notional and (qty * entry_price) < info.min_notional:
             return 0.0
 
         # Max amount check
-        max_amount = limits.get('amount', {}).get('max')
-        if max_amount and qty > max_amount:
-            qty = max_amount
+        if info.max_qty and qty > info.max_qty:
+            qty = info.max_qty
 
         return qty
@@ -28,7 +28,15 @@ from core.utils import setup_logging, load_json
 from core.clock import Clock
 from core.types import Side, Reason, PositionStatus
 from data.market import MarketData
+from data.exchange_registry import registry
+from data.ticker_hub import ticker_hub
 from data.features import FeatureEngine
+from data.incremental_features import IncrementalFeatureEngine
+from data.batch_features import compute_indicators_batch
+from data.htf import HtfTrendService
+from data.funding import FundingRateSnapshot
+from data.kline_stream import KlineStream
+from data.tick_recorder import TickRecorder
 from storage.sqlite_store import SQLiteStore
 from strategy.rsi_ema import RsiEmaStrategy
 from strategy.regimes import RegimeDetector
@@ -42,18 +50,18 @@ from execution.broker_paper import PaperBroker
 from execution.broker_binance import BinanceBroker
 from execution.broker_bybit import BybitBroker
 from execution.broker_mexc import MexcBroker
+from execution.momentum_executor import MomentumExecutor, SymbolFeatureCache
 from optimize.bandit import Bandit
 from reports.daily_report import DailyReport
 from optimize.param_sets import ARMS
 from data.sentiment import SentimentEngine
 from strategy.selector import SymbolSelector
-from data.polymarket_client import PolymarketClient
-from strategy.macro_filter import compute_macro_risk_scale
+from data.polymarket_client import PolymarketClient, PolymarketRefresher
 from signals.dump_btc import get_btc_risk_factor_for_symbol
 from ml.model import SwingbotModel
 from ml.triple_barrier import TripleBarrierLabeler, BarrierConfig
 from core.goal_tracker import GoalTracker
-from core.notifier import Notifier
+from core.notifier import Notifier, NotificationOutbox
 from core.health_monitor import HealthMonitor
 from core.trading_hours import is_good_time_to_trade
 from risk.conservative_mode import ConservativeMode
@@ -291,8 +299,20 @@ def main():
     trading_exchange    = CONFIG.get('trading_exchange', 'mexc')
     data_exchange       = CONFIG.get('market_data_exchange', 'bybit')
 
-    market      = MarketData(exchange_id=data_exchange, sandbox=False)   # data source
+    # Shared ccxt clients + on-disk markets cache (fast restarts)
+    registry.configure(ttl=CONFIG.get('markets_cache_ttl_hours', 12) * 3600)
+    # One in-memory ticker snapshot per exchange for scanner, selector and dashboard
+    hub_conf = CONFIG.get('ticker_hub', {})
+    ticker_hub.configure(refresh_sec=hub_conf.get('refresh_sec', 10),
+                         max_age_sec=hub_conf.get('max_age_sec', 30),
+                         use_websocket=hub_conf.get('websocket', True))
+
+    candle_store = store if CONFIG.get('candle_cache', True) else None
+    market      = MarketData(exchange_id=data_exchange, sandbox=False,
+                             store=candle_store)                         # data source
     market_mexc = MarketData(exchange_id='mexc', sandbox=False)          # MEXC symbol check
+    htf_trend   = HtfTrendService(market)                                # MTF gate from scan bars
+    funding_rates = FundingRateSnapshot(market, ttl=CONFIG.get('funding_cache_ttl_sec', 900))
 
     if is_live:
         if trading_exchange == 'mexc':
@@ -351,6 +371,7 @@ def main():
             data_exchange=market.exchange  # Only return symbols that exist here (Bybit)
         )
         dynamic_scanner.refresh()  # Initial load at startup
+        dynamic_scanner.start()    # Then rebuilt in the background every 4h
 
     # Committee — 5-agent voting system
     committee = Committee(config=CONFIG) if CONFIG.get('committee_enabled', False) else None
@@ -370,6 +391,12 @@ def main():
 
     # Week 1 features
     notifier          = Notifier(CONFIG)
+    # Trading path only enqueues; a worker delivers (survives restarts)
+    notification_outbox = None
+    if CONFIG.get('notifications', {}).get('outbox', True):
+        notification_outbox = NotificationOutbox(store, notifier)
+        notifier.outbox = notification_outbox
+        notification_outbox.start()
     conservative_mode = ConservativeMode(store, CONFIG)
     weekly_report     = WeeklyReport(store, CONFIG)
     goal_tracker      = GoalTracker(CONFIG, store)
@@ -430,13 +457,36 @@ def main():
             on_momentum=on_momentum_detected,
             momentum_threshold=CONFIG.get('momentum_min_change', 0.003),
             volume_multiplier=CONFIG.get('momentum_min_volume', 2.0),
+            max_streams_per_connection=ws_config.get('max_streams_per_connection'),
+            recorder=TickRecorder(ws_config['record_dir']) if ws_config.get('record_dir') else None,
         )
         ws_monitor.start()
         logger.warning(f"[WS] Monitoring {len(initial_symbols)} symbols in real-time")
 
-    poly_client = None
+    # Latest trading-timeframe row per symbol, read by the momentum executor.
+    # Seeded from each cycle's frames, advanced by every kline stream update.
+    momentum_features = SymbolFeatureCache(
+        max_age_sec=CONFIG.get('momentum_executor', {}).get('feature_max_age_sec', 60))
+
+    # -- Kline streams: live candles in the candle cache (scan/exits skip REST)
+    kline_stream = None
+    if WS_AVAILABLE and candle_store is not None and CONFIG.get('kline_stream', {}).get('enabled', True):
+        def on_bar_closed(symbol, tf, candle):
+            logger.debug(f"[KLINE] {symbol} {tf} bar closed @ {candle.close}")
+
+        def on_bar_update(symbol, tf, candle, closed):
+            momentum_features.update_bar(symbol, candle.timestamp, candle.high, candle.low,
+                                         candle.close, candle.volume)
+
+        kline_stream = KlineStream(market, CONFIG['timeframe'], on_bar_close=on_bar_closed,
+                                   reconcile_limit=CONFIG['lookback'], on_bar_update=on_bar_update)
+        kline_stream.start()
+
+    # Macro snapshot refreshed in the background; job() only reads it
+    poly_refresher = None
     if CONFIG.get('polymarket', {}).get('enabled', False):
-        poly_client = PolymarketClient()
+        poly_refresher = PolymarketRefresher(PolymarketClient(), store, CONFIG)
+        poly_refresher.start()
 
     context = {
         "symbol": args.symbol or CONFIG.get('symbol', 'BTC/USDT'),
@@ -521,6 +571,32 @@ def main():
             print(i18n.get("BANNER_PAPER_BAL").format(total=broker.get_balance()))
     print("="*50 + "\n")
 
+    # --- Indicators -----------------------------------------------------------
+    # incremental: streaming state, only bars closed since the last cycle are computed
+    # batch:       whole scan in one vectorized NumPy pass
+    # pandas:      FeatureEngine.compute_indicators per symbol
+    feature_engine = CONFIG.get('feature_engine', 'incremental')
+    incremental_features = IncrementalFeatureEngine() if feature_engine == 'incremental' else None
+
+    def compute_features(sym, tf, candles):
+        if incremental_features is not None:
+            df = incremental_features.compute(sym, tf, candles)
+        else:
+            df = FeatureEngine.compute_indicators(candles)
+        if tf == timeframe:
+            momentum_features.update(sym, df)
+        return df
+
+    def compute_features_many(tf, candles_by_symbol):
+        if feature_engine != 'batch':
+            return {sym: compute_features(sym, tf, candles)
+                    for sym, candles in candles_by_symbol.items()}
+        frames = compute_indicators_batch(candles_by_symbol)
+        if tf == timeframe:
+            for sym, df in frames.items():
+                momentum_features.update(sym, df)
+        return frames
+
     # --- Triple-Barrier labeling on trade close ------------------------------
     def label_closed_trade(pos):
         """Fetch candles since entry, apply TB labeling, save to DB."""
@@ -572,6 +648,186 @@ def main():
         except Exception as e:
             logger.warning(f"[TB] Labeling failed for {pos.symbol}: {e}")
 
+    # --- Momentum entries ------------------------------------------------------
+    # Serializes the open-position check + order placement between job() and
+    # the momentum executor thread, so neither can double-book a symbol/slot
+    position_lock = threading.RLock()
+
+    # Risk inputs published by job() each cycle; no momentum entries until
+    # the first cycle has passed the circuit breaker
+    momentum_context = {
+        'trading_allowed': False,
+        'balance': 0.0,
+        'day_pnl': 0.0,
+        'peak_balance': 0.0,
+        'risk_scale': 1.0,
+    }
+    momentum_opened = {}   # symbol -> time opened (duplicate guard while the broker catches up)
+
+    def momentum_frame(sym, price):
+        """Cached indicator snapshot for sym; recomputed from candles when missing or stale."""
+        cached = momentum_features.get(sym)
+        if cached is not None:
+            return cached
+        try:
+            candles = market.fetch_ohlcv(sym, timeframe, limit=50)
+            if not candles:
+                return None
+            # Stateless engine: this may run on the executor thread
+            df = FeatureEngine.compute_indicators(candles)
+            if df.empty:
+                return None
+            momentum_features.update(sym, df)
+            return momentum_features.get(sym)
+        except Exception as e:
+            logger.debug(f"[MOMENTUM] {sym}: indicator refresh failed: {e}")
+            return {'atr': price * 0.01, 'atr_percent': 1.0, 'volume_ratio': 1.0, 'df': None}
+
+    def handle_momentum_event(event):
+        """Run one momentum event through the entry gates. Returns True if an order was placed."""
+        sym = event['symbol']
+        ctx = dict(momentum_context)
+
+        # Circuit breaker / daily loss limit (as of the last cycle)
+        if not ctx['trading_allowed']:
+            return False
+        if ctx['day_pnl'] < -(ctx['balance'] * CONFIG['daily_loss_limit_percent'] / 100):
+            return False
+
+        feats = momentum_frame(sym, event['price'])
+        if feats is None:
+            return False
+        df = feats['df']
+
+        # Generate momentum signal
+        sig = momentum_strategy.process_momentum_event(
+            symbol=sym,
+            direction=event['direction'],
+            price=event['price'],
+            price_change_pct=event['price_change_pct'],
+            volume_ratio=event['volume_ratio'],
+            atr=feats['atr'],
+            atr_pct=feats['atr_percent'],
+            timestamp=event['timestamp'],
+            allow_short=CONFIG.get('allow_short', True)
+        )
+
+        if not sig:
+            return False
+
+        # FIX 4: R:R gate for momentum signals too
+        if sig.stop_loss and sig.price and sig.take_profit:
+            sl_dist = abs(sig.price - sig.stop_loss)
+            tp_dist = abs(sig.price - sig.take_profit)
+            rr = tp_dist / sl_dist if sl_dist > 0 else 0
+            min_rr = CONFIG.get('min_rr_ratio', 2.0)
+            if rr < min_rr:
+                logger.warning(f"[MOMENTUM SKIP] {sym}: SKIPPED — RR ratio {rr:.2f} below minimum {min_rr}")
+                return False
+
+        # FIX 5: Volume confirmation for momentum signals
+        vol_ratio = feats['volume_ratio']
+        vol_mult = CONFIG.get('volume_multiplier', 1.2)
+        if vol_ratio < vol_mult * 0.95:  # 5% tolerance for floating point
+            logger.warning(f"[MOMENTUM SKIP] {sym}: SKIPPED — volume too low ({vol_ratio:.1f}x < {vol_mult}x)")
+            return False
+
+        base_balance = CONFIG.get('base_balance', 100.0)
+        mom_score = momentum_strategy.calculate_confidence_score(
+            event['price_change_pct'], event['volume_ratio']
+        )
+        market_info = market.get_market_info(sym)
+
+        with position_lock:
+            # FIX 1: Strict duplicate position guard
+            # Check both DB positions AND symbols opened moments ago
+            current_open = broker.get_open_positions()
+            if any(p.symbol == sym for p in current_open):
+                logger.warning(f"[MOMENTUM SKIP] {sym}: already have open position (duplicate blocked)")
+                return False
+            if time.time() - momentum_opened.get(sym, 0) < scan_interval_sec:
+                logger.warning(f"[MOMENTUM SKIP] {sym}: already opened this cycle (duplicate blocked)")
+                return False
+
+            # Skip if slots full
+            if len(current_open) >= risk_engine.max_open_positions:
+                return False
+
+            # Size the position
+            reserved = sum(p.entry_price * p.amount for p in current_open)
+
+            # Dynamic compounding risk for momentum trades
+            dynamic_risk = risk_engine.get_dynamic_risk_percent(
+                current_balance=ctx['balance'],
+                base_balance=base_balance,
+                setup_score=mom_score,
+                peak_balance=ctx['peak_balance']
+            )
+
+            base_size = risk_engine.calculate_position_size(
+                sig, reserved_capital=reserved, dynamic_risk_pct=dynamic_risk
+            )
+
+            if base_size <= 0:
+                return False
+
+            # Notional check
+            ok_notional, msg = risk_engine.check_min_notional(base_size, sig.price, market_info)
+            if not ok_notional:
+                logger.warning(f"[MOMENTUM SKIP] {sym}: {msg}")
+                return False
+
+            # Portfolio risk check
+            ok, msg = risk_engine.can_open_position_for_symbol(
+                sym, current_open, base_size, sig.price
+            )
+            if not ok:
+                logger.warning(f"[MOMENTUM SKIP] {sym}: {msg}")
+                return False
+
+            # EXECUTE
+            side_str = "BUY" if sig.side == Side.BUY else "SELL(SHORT)"
+            logger.warning(
+                f"[MOMENTUM {side_str}] {sym} | "
+                f"price={sig.price:.4f} | size={base_size:.6f} | "
+                f"change={event['price_change_pct']:+.3%} | "
+                f"vol={event['volume_ratio']:.1f}x | "
+                f"risk={dynamic_risk:.1f}%"
+            )
+            order = broker.place_order(sig, base_size)
+            if not order:
+                return False
+            momentum_opened[sym] = time.time()  # FIX 1: Mark as opened
+
+        # Save ML features for training
+        try:
+            if df is not None:
+                ml_features = FeatureEngine.extract_ml_features(
+                    df=df,
+                    scanner_score=mom_score,
+                    breakout_detected=False,
+                    macro_scale=ctx['risk_scale'],
+                    fear_greed=sentiment_engine.get_score() if hasattr(sentiment_engine, 'get_score') else 50.0
+                )
+                ml_features['trade_id'] = order.id
+                ml_features['symbol'] = sym
+                store.save_trade_features(ml_features)
+        except Exception:
+            pass
+
+        try:
+            notifier.notify_entry(sym, sig, base_size, mom_score, 0, atr=feats['atr'])
+        except Exception:
+            pass
+        return True
+
+    # Events are handled on arrival by a dedicated thread; with the executor
+    # disabled, job() drains the queue at the start of each cycle instead
+    momentum_executor = None
+    if CONFIG.get('momentum_executor', {}).get('enabled', True):
+        momentum_executor = MomentumExecutor(momentum_queue, handle_momentum_event)
+        momentum_executor.start()
+
     # --- Main cycle -----------------------------------------------------------
     def job():
         nonlocal last_summary_date
@@ -636,6 +892,7 @@ def main():
                 store.update_peak_balance(today_str, current_bal)
 
             peak_balance = store.get_peak_balance()
+            momentum_context.update(balance=current_bal, day_pnl=day_pnl, peak_balance=peak_balance)
 
             # Update dashboard state
             dashboard_state['total_balance'] = current_bal
@@ -668,12 +925,14 @@ def main():
                 dashboard_state['breaker_status'] = status['breaker']
                 logger.warning(f"[PAUSED] Trading halted until: {daily_stats['paused_until']}")
                 circuit_breaker_ok = False
+                momentum_context['trading_allowed'] = False
                 return
 
             if day_pnl < -(current_bal * CONFIG['daily_loss_limit_percent'] / 100):
                 logger.critical("Daily loss limit hit (%) -- halting for the day.")
                 store.update_daily_stats(today_str, {'paused_until': 'Next Day'})
                 circuit_breaker_ok = False
+                momentum_context['trading_allowed'] = False
                 try:
                     notifier.notify_circuit_breaker(f"Daily loss: ${day_pnl:.2f}")
                 except Exception:
@@ -689,40 +948,26 @@ def main():
                 )
                 store.update_daily_stats(today_str, {'paused_until': 'Next Day'})
                 circuit_breaker_ok = False
+                momentum_context['trading_allowed'] = False
                 try:
                     notifier.notify_circuit_breaker(f"Hard daily loss limit: ${day_pnl:.2f} / -${max_daily_loss_usd:.2f}")
                 except Exception:
                     pass
                 return
 
+            momentum_context['trading_allowed'] = circuit_breaker_ok
+
             # -- Macro risk filter ---------------------------------------------
-            if poly_client:
-                pm_conf = CONFIG['polymarket']
-                update_interval = pm_conf.get('update_hours', 6) * 3600
+            if poly_refresher:
                 last_snap = store.get_latest_polymarket_snapshot()
-
-                need_update = True
-                if last_snap and (time.time() - last_snap['timestamp']) < update_interval:
-                    need_update = False
+                if last_snap:
                     status['macro_prob'] = last_snap['probability']
                     status['risk_scale'] = last_snap['risk_scale']
-
-                if need_update:
-                    probs = [p for m in pm_conf.get('markets', [])
-                             for p in [poly_client.get_probability(m)] if p is not None]
-                    if probs:
-                        risk_scale = compute_macro_risk_scale(probs)
-                        macro_prob = sum(probs) / len(probs)
-                        store.save_polymarket_snapshot(int(time.time()), "multi", macro_prob, risk_scale)
-                        status['macro_prob'] = macro_prob
-                        status['risk_scale'] = risk_scale
-                    elif last_snap:
-                        status['risk_scale'] = last_snap['risk_scale']
-                        status['macro_prob'] = last_snap['probability']
-                    else:
-                        status['risk_scale'] = pm_conf.get('default_risk_scale_on_failure', 0.7)
+                else:
+                    status['risk_scale'] = CONFIG['polymarket'].get('default_risk_scale_on_failure', 0.7)
 
             dashboard_state['macro_scale'] = status['risk_scale']
+            momentum_context['risk_scale'] = status['risk_scale']
 
             # -- Sentiment gate ------------------------------------------------
             sentiment_ok = sentiment_engine.is_market_safe(
@@ -739,162 +984,28 @@ def main():
             # Update WebSocket status in dashboard
             if ws_monitor:
                 dashboard_state['websocket'] = ws_monitor.get_status()
+            dashboard_state['candle_cache'] = market.get_cache_stats()
+            dashboard_state['exchange_routing'] = market.get_routing_stats()
+            if kline_stream:
+                dashboard_state['kline_stream'] = kline_stream.get_status()
+            if momentum_executor:
+                dashboard_state['momentum_executor'] = momentum_executor.get_stats()
+            if notification_outbox:
+                dashboard_state['notifications'] = notification_outbox.get_stats()
+            dashboard_state['ticker_hub'] = ticker_hub.get_status()
 
             # ==================================================================
             # PHASE 0 — Process momentum signals from WebSocket (PRIORITY)
-            # These fire immediately — don't wait for the 10-min cycle
+            # Normally the momentum executor has already acted on these;
+            # this drain only runs with momentum_executor.enabled: false
             # ==================================================================
             momentum_signals_processed = 0
-            _momentum_opened_this_cycle = set()  # Prevent duplicate opens within same batch
-
-            while not momentum_queue.empty() and momentum_signals_processed < 5:
+            while momentum_executor is None and not momentum_queue.empty() and momentum_signals_processed < 5:
                 try:
                     event = momentum_queue.get_nowait()
                     momentum_signals_processed += 1
-
-                    sym = event['symbol']
-
-                    # FIX 1: Strict duplicate position guard
-                    # Check both DB positions AND symbols opened earlier in this cycle
-                    current_open = broker.get_open_positions()
-                    if any(p.symbol == sym for p in current_open):
-                        logger.warning(f"[MOMENTUM SKIP] {sym}: already have open position (duplicate blocked)")
-                        continue
-                    if sym in _momentum_opened_this_cycle:
-                        logger.warning(f"[MOMENTUM SKIP] {sym}: already opened this cycle (duplicate blocked)")
-                        continue
-
-                    # Skip if slots full
-                    if len(current_open) >= risk_engine.max_open_positions:
-                        continue
-
-                    # Circuit breaker check
-                    if not circuit_breaker_ok:
-                        continue
-
-                    # Daily loss limit check
-                    if day_pnl < -(current_bal * CONFIG['daily_loss_limit_percent'] / 100):
-                        continue
-
-                    # Get current ATR for this symbol
-                    try:
-                        candles = market.fetch_ohlcv(sym, CONFIG['timeframe'], limit=50)
-                        if not candles:
-                            continue
-                        df = FeatureEngine.compute_indicators(candles)
-                        if df.empty:
-                            continue
-                        atr = float(df.iloc[-1].get('atr', event['price'] * 0.01))
-                        atr_pct = float(df.iloc[-1].get('atr_percent', 1.0))
-                    except Exception:
-                        atr     = event['price'] * 0.01
-                        atr_pct = 1.0
-
-                    # Generate momentum signal
-                    sig = momentum_strategy.process_momentum_event(
-                        symbol=sym,
-                        direction=event['direction'],
-                        price=event['price'],
-                        price_change_pct=event['price_change_pct'],
-                        volume_ratio=event['volume_ratio'],
-                        atr=atr,
-                        atr_pct=atr_pct,
-                        timestamp=event['timestamp'],
-                        allow_short=CONFIG.get('allow_short', True)
-                    )
-
-                    if not sig:
-                        continue
-
-                    # FIX 4: R:R gate for momentum signals too
-                    if sig.stop_loss and sig.price and sig.take_profit:
-                        sl_dist = abs(sig.price - sig.stop_loss)
-                        tp_dist = abs(sig.price - sig.take_profit)
-                        rr = tp_dist / sl_dist if sl_dist > 0 else 0
-                        min_rr = CONFIG.get('min_rr_ratio', 2.0)
-                        if rr < min_rr:
-                            logger.warning(f"[MOMENTUM SKIP] {sym}: SKIPPED — RR ratio {rr:.2f} below minimum {min_rr}")
-                            continue
-
-                    # FIX 5: Volume confirmation for momentum signals
-                    vol_ratio = df.iloc[-1].get('volume_ratio', 1.0) if not df.empty else 1.0
-                    vol_mult = CONFIG.get('volume_multiplier', 1.2)
-                    if vol_ratio < vol_mult * 0.95:  # 5% tolerance for floating point
-                        logger.warning(f"[MOMENTUM SKIP] {sym}: SKIPPED — volume too low ({vol_ratio:.1f}x < {vol_mult}x)")
-                        continue
-
-                    # Size the position
-                    confidence = sig.strength
-                    reserved   = sum(p.entry_price * p.amount for p in current_open)
-
-                    # Dynamic compounding risk for momentum trades
-                    base_balance = CONFIG.get('base_balance', 100.0)
-                    mom_score = momentum_strategy.calculate_confidence_score(
-                        event['price_change_pct'], event['volume_ratio']
-                    )
-                    dynamic_risk = risk_engine.get_dynamic_risk_percent(
-                        current_balance=current_bal,
-                        base_balance=base_balance,
-                        setup_score=mom_score,
-                        peak_balance=peak_balance
-                    )
-
-                    base_size = risk_engine.calculate_position_size(
-                        sig, reserved_capital=reserved, dynamic_risk_pct=dynamic_risk
-                    )
-
-                    if base_size <= 0:
-                        continue
-
-                    # Notional check
-                    market_struct = market.get_market_structure(sym)
-                    ok_notional, msg = risk_engine.check_min_notional(base_size, sig.price, market_struct)
-                    if not ok_notional:
-                        logger.warning(f"[MOMENTUM SKIP] {sym}: {msg}")
-                        continue
-
-                    # Portfolio risk check
-                    ok, msg = risk_engine.can_open_position_for_symbol(
-                        sym, current_open, base_size, sig.price
-                    )
-                    if not ok:
-                        logger.warning(f"[MOMENTUM SKIP] {sym}: {msg}")
-                        continue
-
-                    # EXECUTE
-                    side_str = "BUY" if sig.side == Side.BUY else "SELL(SHORT)"
-                    logger.warning(
-                        f"[MOMENTUM {side_str}] {sym} | "
-                        f"price={sig.price:.4f} | size={base_size:.6f} | "
-                        f"change={event['price_change_pct']:+.3%} | "
-                        f"vol={event['volume_ratio']:.1f}x | "
-                        f"risk={dynamic_risk:.1f}%"
-                    )
-                    order = broker.place_order(sig, base_size)
-                    if order:
-                        _momentum_opened_this_cycle.add(sym)  # FIX 1: Mark as opened
-                        # Save ML features for training
-                        try:
-                            ml_features = FeatureEngine.extract_ml_features(
-                                df=df,
-                                scanner_score=mom_score,
-                                breakout_detected=False,
-                                macro_scale=status.get('risk_scale', 1.0),
-                                fear_greed=sentiment_engine.get_score() if hasattr(sentiment_engine, 'get_score') else 50.0
-                            )
-                            ml_features['trade_id'] = order.id
-                            ml_features['symbol'] = sym
-                            store.save_trade_features(ml_features)
-                        except Exception:
-                            pass
-
-                        try:
-                            notifier.notify_entry(sym, sig, base_size, mom_score, 0,
-                                                  atr=float(df.iloc[-1].get('atr', 0)) if not df.empty else 0)
-                        except Exception:
-                            pass
+                    if handle_momentum_event(event):
                         status['pos_state'] = "OPENING"
-
                 except Exception as e:
                     logger.error(f"[MOMENTUM] Processing error: {e}", exc_info=True)
 
@@ -934,7 +1045,7 @@ def main():
                     if not candles:
                         continue
 
-                    df = FeatureEngine.compute_indicators(candles)
+                    df = compute_features(sym, timeframe, candles)
                     if df.empty:
                         continue
 
@@ -967,7 +1078,8 @@ def main():
 
                     if sig and sig.side == exit_side:
                         logger.warning(f"[EXIT] {sym} | reason={sig.reason.value} | price={sig.price:.4f}")
-                        order = broker.place_order(sig, pos.amount)
+                        with position_lock:
+                            order = broker.place_order(sig, pos.amount)
 
                         # Update trade outcome for ML
                         if order:
@@ -1006,7 +1118,8 @@ def main():
                         exit_sig = broker.check_sl_tp(current_candle, symbol=sym)
                         if exit_sig:
                             logger.warning(f"[SL/TP] {sym} | reason={exit_sig.reason.value}")
-                            order = broker.place_order(exit_sig, pos.amount)
+                            with position_lock:
+                                order = broker.place_order(exit_sig, pos.amount)
 
                             if order:
                                 if pos.side == Side.BUY:
@@ -1100,18 +1213,27 @@ def main():
             all_scanned = []  # All results for dashboard display
             already_held = {p.symbol for p in open_positions}
 
-            for scan_idx, sym in enumerate(scan_candidates):
-                if sym in already_held:
-                    continue
-                # Rate limit: small delay between API calls to avoid Bybit 429
-                if scan_idx > 0 and scan_idx % 5 == 0:
-                    time.sleep(1.0)
+            # Candles are fetched concurrently (per-exchange rate limited) and
+            # scored as each symbol arrives
+            to_fetch = [sym for sym in scan_candidates if sym not in already_held]
+            fetches = market.fetch_ohlcv_many(
+                to_fetch, timeframe, limit=lookback,
+                max_workers=CONFIG.get('ohlcv_workers', 8))
+            frames = None
+            if feature_engine == 'batch':
+                # The vectorized pass needs the whole scan: collect it, compute once
+                fetches = [(sym, candles) for sym, candles in fetches if candles]
+                try:
+                    frames = compute_features_many(timeframe, dict(fetches))
+                except Exception as e:
+                    logger.error(f"Scan indicator computation failed: {e}")
+                    frames = {}
+            for sym, candles in fetches:
                 try:
-                    candles = market.fetch_ohlcv(sym, timeframe, limit=lookback)
                     if not candles:
                         continue
-                    df = FeatureEngine.compute_indicators(candles)
-                    if df.empty or len(df) < 3:
+                    df = frames.get(sym) if frames is not None else compute_features(sym, timeframe, candles)
+                    if df is None or df.empty or len(df) < 3:
                         continue
                     # Classify on the last CLOSED candle (no repaint).
                     regime = RegimeDetector.detect(df.iloc[-2])
@@ -1135,12 +1257,18 @@ def main():
                 except Exception as e:
                     logger.error(f"Scan error for {sym}: {e}")
 
-            scored.sort(key=lambda x: x['score'], reverse=True)
-            all_scanned.sort(key=lambda x: x['score'], reverse=True)
+            # Results arrive in completion order — break score ties by volume rank as before
+            volume_rank = {sym: i for i, sym in enumerate(to_fetch)}
+            scored.sort(key=lambda x: (-x['score'], volume_rank[x['symbol']]))
+            all_scanned.sort(key=lambda x: (-x['score'], volume_rank[x['symbol']]))
+
+            # Stream candles for everything scanned or held
+            if kline_stream:
+                kline_stream.update_symbols(to_fetch + sorted(already_held))
 
             # Update WebSocket symbols after scan
             if ws_monitor and all_scanned:
-                top_ws_symbols = [s['symbol'] for s in all_scanned[:10]]
+                top_ws_symbols = [s['symbol'] for s in all_scanned[:ws_config.get('max_symbols', 100)]]
                 ws_monitor.update_symbols(top_ws_symbols)
                 logger.debug(f"[WS] Updated monitoring: {top_ws_symbols[:5]}...")
 
@@ -1194,6 +1322,13 @@ def main():
                 _log_status(status, time.time() - cycle_start, scan_interval_sec)
                 return
 
+            # Committee sentiment for the whole shortlist in one concurrent batch
+            if committee:
+                sentiment_engine.prefetch([c['symbol'] for c in scored[:slots_available]])
+            # Funding snapshots the shortlist's perps need, refreshed before the loop reads them
+            if funding_filter:
+                funding_rates.prefetch([c['symbol'] for c in scored[:slots_available]])
+
             entries_opened = 0
             for candidate in scored[:slots_available]:
                 sym    = candidate['symbol']
@@ -1233,23 +1368,25 @@ def main():
                 # Only take 1H longs when 4H trend is up, shorts when 4H is down
                 if mtf_enabled and sig is not None:
                     try:
-                        htf = market.fetch_htf_trend(sym, htf_timeframe, htf_ema_period)
-                        htf_trend = htf.get('trend', 'flat')
-                        if sig.side.value == 'BUY' and htf_trend == 'down':
+                        htf = htf_trend.trend(sym, candidate.get('candles'), timeframe,
+                                              htf_timeframe, htf_ema_period)
+                        htf_dir = htf.get('trend', 'flat')
+                        if sig.side.value == 'BUY' and htf_dir == 'down':
                             logger.warning(f"[MTF_SKIP] {sym}: 1H long blocked — {htf_timeframe} trend is DOWN")
                             continue
-                        if sig.side.value == 'SELL' and htf_trend == 'up':
+                        if sig.side.value == 'SELL' and htf_dir == 'up':
                             logger.warning(f"[MTF_SKIP] {sym}: 1H short blocked — {htf_timeframe} trend is UP")
                             continue
-                    except Exception:
-                        pass   # MTF check optional — don't block on error
+                    except Exception as e:
+                        # MTF check optional — don't block on error, but make a broken gate visible
+                        logger.warning(f"[MTF] {sym}: {htf_timeframe} trend check failed: {e}")
 
                 # -- Funding Rate filter (Bybit public API, perps only) ---------
                 # Positive funding = longs overcrowded → avoid longs
                 # Negative funding = shorts overcrowded → avoid shorts
                 if funding_filter and sig is not None and ':' in sym:
                     try:
-                        fr = market.fetch_funding_rate(sym)
+                        fr = funding_rates.get(sym)
                         if fr is not None:
                             if sig.side.value == 'BUY' and fr > funding_long_block:
                                 logger.warning(f"[FR_SKIP] {sym}: long blocked — funding={fr:.4%} (longs overcrowded)")
@@ -1367,13 +1504,13 @@ def main():
                 # Use risk_to_qty for exchange-precision quantities
                 max_risk_pct = CONFIG.get('max_risk_per_trade_pct', dynamic_risk)
                 actual_risk_pct = min(dynamic_risk, max_risk_pct)
-                market_struct = market.get_market_structure(sym)
+                market_info = market.get_market_info(sym)
                 base_size = RiskEngine.risk_to_qty(
                     capital=current_bal - reserved,
                     risk_pct=actual_risk_pct,
                     entry_price=sig.price,
                     stop_price=sig.stop_loss,
-                    market_structure=market_struct
+                    market_structure=market_info
                 )
                 if base_size <= 0:
                     # Fallback to old method if risk_to_qty returns 0
@@ -1413,29 +1550,36 @@ def main():
                 if size <= 0:
                     continue
 
-                # Portfolio risk check
-                ok, msg = risk_engine.can_open_position_for_symbol(
-                    sym, open_positions, size, sig.price
-                )
-                if not ok:
-                    logger.warning(f"[SKIP] {sym}: risk check failed -- {msg}")
-                    continue
-
-                market_struct = market.get_market_structure(sym)
-                ok, msg = risk_engine.check_min_notional(size, sig.price, market_struct)
+                ok, msg = risk_engine.check_min_notional(size, sig.price, market_info)
                 if not ok:
                     logger.warning(f"[SKIP] {sym}: min-notional check failed -- {msg}")
                     continue
 
-                side_str = "BUY" if sig.side == Side.BUY else "SELL(SHORT)"
-                logger.warning(
-                    f"[{side_str}] {sym} | score={cand_score:.0f} | "
-                    f"price={sig.price:.4f} | size={size:.6f} | "
-                    f"SL={sig.stop_loss:.4f} | TP={sig.take_profit:.4f} | "
-                    f"ATR={float(df.iloc[-1].get('atr', 0)):.6f} | regime={regime.value} | "
-                    f"risk={dynamic_risk:.1f}% | ML={confidence:.0%}"
-                )
-                order = broker.place_order(sig, size)
+                with position_lock:
+                    # The momentum executor may have opened positions since the scan began
+                    open_positions = broker.get_open_positions()
+                    if (any(p.symbol == sym for p in open_positions)
+                            or len(open_positions) >= risk_engine.max_open_positions):
+                        logger.warning(f"[SKIP] {sym}: position or slot taken by a momentum entry")
+                        continue
+
+                    # Portfolio risk check
+                    ok, msg = risk_engine.can_open_position_for_symbol(
+                        sym, open_positions, size, sig.price
+                    )
+                    if not ok:
+                        logger.warning(f"[SKIP] {sym}: risk check failed -- {msg}")
+                        continue
+
+                    side_str = "BUY" if sig.side == Side.BUY else "SELL(SHORT)"
+                    logger.warning(
+                        f"[{side_str}] {sym} | score={cand_score:.0f} | "
+                        f"price={sig.price:.4f} | size={size:.6f} | "
+                        f"SL={sig.stop_loss:.4f} | TP={sig.take_profit:.4f} | "
+                        f"ATR={float(df.iloc[-1].get('atr', 0)):.6f} | regime={regime.value} | "
+                        f"risk={dynamic_risk:.1f}% | ML={confidence:.0%}"
+                    )
+                    order = broker.place_order(sig, size)
                 if order:
                     # Save ML features for training
                     ml_features['trade_id'] = order.id
@@ -0,0 +1,192 @@
+"""
+storage/connection_pool.py — a small pool of long-lived SQLite connections.
+
+Every store call used to open a fresh sqlite3 connection and close it again,
+so each call paid connect + schema parse and the statement cache was always
+empty. The pool keeps up to MAX_IDLE_CONNECTIONS open connections per
+database, each opened once with:
+
+  - journal_mode=WAL       readers (dashboard threads) never block the writer
+  - synchronous=NORMAL     fsync at checkpoints only — safe with WAL
+  - cache_size / mmap_size a larger page cache, hot pages read via mmap
+  - cached_statements      prepared statements reused across calls
+
+A thread checks a connection out on its first connection() call; nested
+calls on the same thread share it, so a thread always sees its own
+uncommitted writes. When the thread's last handle is released the connection
+goes back to the idle list for any thread to reuse — which is what keeps
+short-lived threads (one per Flask dev-server request) from opening a new
+connection every time.
+
+Callers keep the connect/close pattern:
+
+    conn = get_pool(db_path).connection()
+    ...
+    conn.commit()
+    conn.close()        # hands the connection back; never really closes it
+
+When the last handle on a connection is released (close() or garbage-collected
+after an exception, on whichever thread), any uncommitted transaction is
+rolled back, as closing a real connection would.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_SEC = 10.0
+CACHED_STATEMENTS = 256
+MAX_IDLE_CONNECTIONS = 8        # more idle than this are really closed
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # KiB → 16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",    # 128 MB
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class PooledConnection:
+    """A checked-out handle on the thread's connection. close() returns it to the pool."""
+
+    __slots__ = ('_conn', '_pool', '_released')
+
+    def __init__(self, conn: sqlite3.Connection, pool: 'ConnectionPool'):
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_released', False)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self) -> None:
+        if not self._released:
+            object.__setattr__(self, '_released', True)
+            self._pool._release(self._conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Reusable connections to one database file, checked out per thread."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._by_thread: Dict[int, sqlite3.Connection] = {}
+        self._owner: Dict[sqlite3.Connection, int] = {}     # checked-out connection → thread id
+        self._handles: Dict[sqlite3.Connection, int] = {}   # checked-out connection → open handles
+        self.stats = {'opened': 0, 'reused': 0, 'checkouts': 0, 'rollbacks': 0, 'closed': 0}
+
+    def _open(self) -> sqlite3.Connection:
+        # Released connections move between threads, so sqlite3's same-thread check is off;
+        # the pool guarantees one thread uses a connection at a time.
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SEC,
+                               cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"[DB] {pragma} failed on {self.db_path}: {e}")
+        return conn
+
+    def connection(self) -> PooledConnection:
+        thread_id = threading.get_ident()
+        with self._lock:
+            self.stats['checkouts'] += 1
+            conn = self._by_thread.get(thread_id)
+            if conn is None and self._idle:
+                conn = self._idle.pop()
+                self.stats['reused'] += 1
+            if conn is not None:
+                self._checkout(conn, thread_id)
+                return PooledConnection(conn, self)
+        conn = self._open()
+        with self._lock:
+            self.stats['opened'] += 1
+            self._checkout(conn, thread_id)
+        return PooledConnection(conn, self)
+
+    def _checkout(self, conn: sqlite3.Connection, thread_id: int) -> None:
+        self._by_thread[thread_id] = conn
+        self._owner[conn] = thread_id
+        self._handles[conn] = self._handles.get(conn, 0) + 1
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Counted per connection, so a handle garbage-collected on another
+        # thread still releases the thread that checked it out.
+        with self._lock:
+            handles = self._handles.get(conn, 0) - 1
+            if handles > 0:
+                self._handles[conn] = handles
+                return
+            self._handles.pop(conn, None)
+            thread_id = self._owner.pop(conn, None)
+            if self._by_thread.get(thread_id) is conn:
+                del self._by_thread[thread_id]
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+                with self._lock:
+                    self.stats['rollbacks'] += 1
+        except sqlite3.Error as e:
+            logger.warning(f"[DB] Dropping pooled connection to {self.db_path}: {e}")
+            self._close(conn)
+            return
+        with self._lock:
+            if len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    def _close(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self.stats['closed'] += 1
+
+    def close_idle(self) -> None:
+        """Really close every idle connection (checked-out ones are left alone)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'db_path': self.db_path, 'idle': len(self._idle),
+                    'in_use': len(self._handles), **self.stats}
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """The process-wide pool for db_path (one per database file)."""
+    key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
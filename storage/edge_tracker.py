@@ -13,7 +13,7 @@ and deprioritize symbols that consistently lose.
 Inspired by Freqtrade's Edge positioning.
 """
 import logging
-import sqlite3
+from storage.connection_pool import get_pool
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -61,7 +61,7 @@ class EdgeTracker:
         import time
 
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_pool(self.db_path).connection()
             cursor = conn.cursor()
 
             # Get all closed trades from last N days
@@ -0,0 +1,128 @@
+"""
+storage/migrations.py — versioned schema migrations for the SQLite store.
+
+schema.sql creates any missing tables on a fresh database. Everything that
+changes an existing database (new columns, indexes, seeded rows) is a
+numbered step below. The applied version lives in PRAGMA user_version, so a
+database that is already up to date costs one pragma read at startup.
+
+Steps run in order, each in its own write transaction together with its
+user_version bump. A failed step rolls back and leaves the version where it
+was. Steps must tolerate databases that were upgraded by the old ad-hoc
+startup checks (e.g. a column that already exists).
+
+To change the schema, append a step — never edit one that has shipped.
+"""
+import logging
+import sqlite3
+from typing import Callable, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _columns(conn, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_columns(conn, table: str, columns: dict) -> None:
+    existing = _columns(conn, table)
+    for col, col_type in columns.items():
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
+
+
+def _trade_features_columns(conn) -> None:
+    _add_columns(conn, 'trade_features', {
+        'tb_label': 'INTEGER',
+        'tb_hours_to_barrier': 'REAL',
+        'tb_barrier_hit': 'TEXT',
+        'tb_upper_barrier': 'REAL',
+        'tb_lower_barrier': 'REAL',
+        'tb_return_pct': 'REAL',
+        'btc_correlation': 'REAL',  # Altcoin-BTC correlation feature
+    })
+
+
+def _arm_performance_regime(conn) -> None:
+    _add_columns(conn, 'arm_performance', {'regime': "TEXT NOT NULL DEFAULT 'transition'"})
+
+
+def _conservative_mode_state(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS conservative_mode_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            active INTEGER DEFAULT 0,
+            reason TEXT DEFAULT '',
+            activated_at TEXT DEFAULT '',
+            consecutive_wins INTEGER DEFAULT 0,
+            risk_multiplier REAL DEFAULT 1.0
+        )
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO conservative_mode_state (id, active, reason, activated_at, consecutive_wins, risk_multiplier)
+        VALUES (1, 0, '', '', 0, 1.0)
+    """)
+
+
+def _hot_query_indexes(conn) -> None:
+    # Closed-trade history (reports, dashboard, edge tracker, Monte Carlo):
+    # status + exit_time range / ORDER BY, covering the pnl columns they read
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_positions_status_exit
+                    ON positions (status, exit_time, symbol, pnl, pnl_percent)""")
+    # Open-position checks, per symbol before every entry
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_positions_status_symbol ON positions (status, symbol)")
+    # Outcome / barrier-label updates by trade id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_trade_features_trade_id ON trade_features (trade_id)")
+    # Labelled training rows, in capture order
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_trade_features_labelled
+                    ON trade_features (captured_at, outcome) WHERE outcome IS NOT NULL""")
+    # Bandit arm statistics: covering (regime, arm) → r_multiple
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_arm_performance_regime_arm
+                    ON arm_performance (regime, arm_id, r_multiple)""")
+    # Latest macro snapshot
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_polymarket_snapshots_timestamp ON polymarket_snapshots (timestamp)")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'trade_features triple-barrier / correlation columns', _trade_features_columns),
+    Migration(2, 'arm_performance.regime', _arm_performance_regime),
+    Migration(3, 'conservative_mode_state table', _conservative_mode_state),
+    Migration(4, 'hot-query indexes', _hot_query_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn) -> int:
+    """Apply pending migrations to conn's database. Returns the resulting version."""
+    version = schema_version(conn)
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if schema_version(conn) >= step.version:
+                conn.rollback()
+                version = schema_version(conn)
+                continue
+            step.apply(conn)
+            conn.execute(f"PRAGMA user_version = {step.version:d}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"[DB] Migration {step.version} ({step.description}) failed", exc_info=True)
+            raise
+        version = step.version
+        logger.info(f"[DB] Applied migration {step.version}: {step.description}")
+    return version
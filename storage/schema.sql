@@ -1,3 +1,6 @@
+-- Tables for a fresh database. Changes to existing databases (new columns,
+-- indexes, seed rows) go in storage/migrations.py as a new numbered step.
+
 CREATE TABLE IF NOT EXISTS candles (
     symbol TEXT,
     timestamp INTEGER,
@@ -168,3 +171,14 @@ CREATE TABLE IF NOT EXISTS trade_features (
     -- Timestamps
     captured_at     INTEGER NOT NULL
 );
+
+-- Pending notifications, one row per platform; deleted once delivered
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform        TEXT NOT NULL,      -- discord / telegram / custom
+    channel         TEXT NOT NULL,
+    payload         TEXT NOT NULL,      -- JSON (discord/custom) or message text (telegram)
+    created_at      REAL NOT NULL,
+    attempts        INTEGER DEFAULT 0,
+    next_attempt_at REAL NOT NULL
+);
@@ -1,10 +1,11 @@
-import sqlite3
 import json
 import uuid
 import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from core.types import Candle, Order, Position, Trade, OrderStatus, PositionStatus, Side, OrderType, Reason, ScanResult
+from typing import List, Optional, Dict, Any, Union
+from storage.connection_pool import get_pool
+from storage.migrations import migrate
+from core.types import Candle, CandleBlock, Order, Position, Trade, OrderStatus, PositionStatus, Side, OrderType, Reason, ScanResult
 
 try:
     import pandas as pd
@@ -16,50 +17,32 @@ except ImportError:
 class SQLiteStore:
     def __init__(self, db_path: str = "swingbot.db"):
         self.db_path = db_path
+        self.pool = get_pool(db_path)   # thread-local WAL connections, shared process-wide
         self._init_db()
 
     def _init_db(self):
         with open('storage/schema.sql', 'r', encoding='utf-8') as f:
             schema = f.read()
-        conn = sqlite3.connect(self.db_path)
+        conn = self.get_connection()
         conn.executescript(schema)
-        # Migrate: add triple-barrier columns if missing
-        self._migrate_tb_columns(conn)
-        conn.close()
-
-    def _migrate_tb_columns(self, conn):
-        """Add triple-barrier and newer columns to trade_features if they don't exist."""
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(trade_features)")
-        existing = {row[1] for row in cursor.fetchall()}
-        new_cols = {
-            'tb_label': 'INTEGER',
-            'tb_hours_to_barrier': 'REAL',
-            'tb_barrier_hit': 'TEXT',
-            'tb_upper_barrier': 'REAL',
-            'tb_lower_barrier': 'REAL',
-            'tb_return_pct': 'REAL',
-            'btc_correlation': 'REAL',  # Altcoin-BTC correlation feature
-        }
-        for col, col_type in new_cols.items():
-            if col not in existing:
-                try:
-                    cursor.execute(f"ALTER TABLE trade_features ADD COLUMN {col} {col_type}")
-                except sqlite3.OperationalError:
-                    pass
-        conn.commit()
+        # Versioned upgrades for existing databases (columns, indexes, seed rows)
+        migrate(conn)
+        conn.close()
 
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """This thread's pooled connection (rows are sqlite3.Row); close() hands it back."""
+        return self.pool.connection()
 
     # --- Candles ---------------------------------------------------------------
 
-    def save_candles(self, candles: List[Candle], symbol: str):
+    def save_candles(self, candles: Union[CandleBlock, List[Candle]], symbol: str):
         conn = self.get_connection()
         cursor = conn.cursor()
-        data = [(symbol, c.timestamp, c.open, c.high, c.low, c.close, c.volume) for c in candles]
+        if isinstance(candles, CandleBlock):
+            data = [(symbol, *row) for row in zip(*(getattr(candles, col).tolist()
+                                                    for col in CandleBlock.COLUMNS))]
+        else:
+            data = [(symbol, c.timestamp, c.open, c.high, c.low, c.close, c.volume) for c in candles]
         cursor.executemany("""
             INSERT OR REPLACE INTO candles (symbol, timestamp, open, high, low, close, volume)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -67,7 +50,7 @@ class SQLiteStore:
         conn.commit()
         conn.close()
 
-    def get_latest_candles(self, symbol: str, limit: int = 500) -> List[Candle]:
+    def get_latest_candles(self, symbol: str, limit: int = 500) -> CandleBlock:
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
@@ -78,17 +61,22 @@ class SQLiteStore:
         rows = cursor.fetchall()
         conn.close()
 
-        candles = []
-        for row in reversed(rows):
-            candles.append(Candle(
-                timestamp=row['timestamp'],
-                open=row['open'],
-                high=row['high'],
-                low=row['low'],
-                close=row['close'],
-                volume=row['volume']
-            ))
-        return candles
+        return CandleBlock.from_ohlcv([tuple(row) for row in reversed(rows)])
+
+    def prune_candles(self, symbol: str, keep: int = 1000):
+        """Delete all but the newest `keep` candles stored for a symbol."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM candles WHERE symbol = ? AND timestamp < (
+                SELECT MIN(timestamp) FROM (
+                    SELECT timestamp FROM candles WHERE symbol = ?
+                    ORDER BY timestamp DESC LIMIT ?
+                )
+            )
+        """, (symbol, symbol, keep))
+        conn.commit()
+        conn.close()
 
     # --- Orders ----------------------------------------------------------------
 
@@ -743,3 +731,54 @@ class SQLiteStore:
         row = cursor.fetchone()
         conn.close()
         return int(row['cnt']) if row else 0
+
+    # --- Notification Outbox ---------------------------------------------------
+
+    def enqueue_notifications(self, rows: List[tuple]) -> None:
+        """rows: (platform, channel, payload, created_at)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO notification_outbox (platform, channel, payload, created_at, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(platform, channel, payload, created, created) for platform, channel, payload, created in rows])
+        conn.commit()
+        conn.close()
+
+    def get_due_notifications(self, now: float, limit: int = 100) -> List[Dict[str, Any]]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM notification_outbox
+            WHERE next_attempt_at <= ?
+            ORDER BY id LIMIT ?
+        """, (now, limit))
+        rows = [dict(r) for r in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def delete_notifications(self, ids: List[int]) -> None:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("DELETE FROM notification_outbox WHERE id = ?", [(i,) for i in ids])
+        conn.commit()
+        conn.close()
+
+    def reschedule_notifications(self, ids: List[int], next_attempt_at: float) -> None:
+        """Count a failed attempt and push the rows back."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            UPDATE notification_outbox SET attempts = attempts + 1, next_attempt_at = ?
+            WHERE id = ?
+        """, [(next_attempt_at, i) for i in ids])
+        conn.commit()
+        conn.close()
+
+    def get_notification_outbox_stats(self) -> Dict[str, Any]:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) AS depth, MIN(created_at) AS oldest FROM notification_outbox")
+        row = cursor.fetchone()
+        conn.close()
+        return {'depth': row['depth'], 'oldest': row['oldest']}
@@ -3,38 +3,98 @@ Multi-Exchange Dynamic Symbol Scanner.
 
 Aggregates USDT trading pairs from Binance, Bybit, and MEXC simultaneously.
 Merges 24h volumes across all exchanges for accurate ranking.
-Refreshes every 4 hours. All public APIs — no keys needed.
+Refreshes every 4 hours in the background. All public APIs — no keys needed.
 
 Symbol universe flow:
   1. Fetch tickers from Binance, Bybit, MEXC in parallel (all public)
-  2. Merge by base currency, sum volumes across exchanges
+  2. Merge by base currency, sum volumes across exchanges (one pass over the tickers)
   3. Filter: min volume, active status, no stablecoins/leverage tokens
   4. Sort by combined 24h volume descending
   5. Return top N (default 50)
+
+Stale-while-revalidate: readers always get the last published universe
+immediately. Only the very first load blocks; after that a background thread
+rebuilds the universe and publishes it with a single reference swap.
 """
 import logging
+import re
 import time
 import threading
-from typing import List, Dict, Optional
+from typing import List, Dict, Mapping, NamedTuple, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import ccxt
 
+from data.exchange_registry import registry
+from data.ticker_hub import ticker_hub
+
 logger = logging.getLogger(__name__)
 
 BANNED_BASES = {'USDC', 'BUSD', 'DAI', 'TUSD', 'UST', 'FDUSD', 'USDP', 'USDD', 'PYUSD'}
 BANNED_KEYWORDS = ('UP', 'DOWN', 'BEAR', 'BULL', '3L', '3S', '2L', '2S', '5L', '5S')
+# One pass per symbol: USDT spot pair (derivatives carry ':'), base free of
+# leverage-token keywords; captures the base currency
+_SPOT_USDT_BASE = re.compile(r'^(?![^/]*(?:' + '|'.join(re.escape(kw) for kw in BANNED_KEYWORDS) + r'))'
+                             r'([^/:]*)/USDT[^:]*$')
 
 REFRESH_INTERVAL = 4 * 3600  # 4 hours
+RETRY_INTERVAL = 5 * 60      # after a refresh where every exchange failed
 
 # Exchanges to aggregate (all public, no keys)
 EXCHANGE_IDS = ['binance', 'bybit', 'mexc']
 
+DEFAULT_SYMBOLS = ('BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT',
+                   'DOGE/USDT', 'ADA/USDT', 'AVAX/USDT', 'DOT/USDT', 'MATIC/USDT')
+
+
+class _Universe(NamedTuple):
+    symbols: Tuple[str, ...]
+    exchange_map: Mapping[str, List[str]]   # symbol → exchanges that list it
+    built_at: float
+
+
+def merge_universe(all_tickers: Mapping[str, Mapping[str, dict]],
+                   min_volume: float, max_symbols: int) -> List[dict]:
+    """
+    Rank USDT spot bases by 24h quote volume summed across exchanges.
+
+    all_tickers: exchange id → {symbol: ccxt ticker}. Returns up to
+    max_symbols of {'symbol', 'total_volume', 'exchanges'}, highest volume
+    first (ties keep first-seen order).
+    """
+    # The tickers arrive as per-exchange dicts, so one Python pass over them is
+    # the floor; a DataFrame/NumPy groupby only adds conversion on top of it
+    match = _SPOT_USDT_BASE.match
+    totals: Dict[str, float] = {}
+    exchanges: Dict[str, List[str]] = {}
+    for eid, tickers in all_tickers.items():
+        for symbol, ticker in (tickers or {}).items():
+            m = match(symbol)
+            if m is None:
+                continue
+            base = m.group(1)
+            if base in BANNED_BASES:
+                continue
+            volume = float((ticker.get('quoteVolume') if ticker else None) or 0.0)
+            if base in totals:
+                totals[base] += volume
+                exchanges[base].append(eid)
+            else:
+                totals[base] = volume
+                exchanges[base] = [eid]
+
+    # sorted() is stable, so ties keep first-seen order
+    top = sorted((base for base, volume in totals.items() if volume >= min_volume),
+                 key=totals.__getitem__, reverse=True)[:max_symbols]
+    return [{'symbol': f"{base}/USDT", 'total_volume': totals[base], 'exchanges': exchanges[base]}
+            for base in top]
+
 
 class DynamicScanner:
     """
     Fetches and caches the top USDT trading pairs by combined 24h volume
-    across Binance, Bybit, and MEXC. Thread-safe. Auto-refreshes every 4h.
+    across Binance, Bybit, and MEXC. Thread-safe. Refreshed every 4h by a
+    background thread; readers never wait once the first universe exists.
     """
 
     def __init__(self, config: dict, fallback_exchange: Optional[ccxt.Exchange] = None,
@@ -42,21 +102,17 @@ class DynamicScanner:
         self.config = config
         self.fallback_exchange = fallback_exchange
         self.data_exchange = data_exchange  # Exchange used for OHLCV (must have the symbol)
-        self._symbols: List[str] = []
-        self._exchange_map: Dict[str, List[str]] = {}  # symbol → list of exchanges that have it
+        self._universe = _Universe((), {}, 0.0)   # replaced wholesale on publish
         self._data_exchange_symbols: set = set()  # symbols available on the data exchange
-        self._last_refresh: float = 0
-        self._lock = threading.Lock()
+        self._next_attempt: float = 0
+        self._refresh_lock = threading.Lock()     # one rebuild at a time
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
 
-        # Initialize exchange connections (public only)
-        self._exchanges: Dict[str, ccxt.Exchange] = {}
-        for eid in EXCHANGE_IDS:
-            try:
-                ex = getattr(ccxt, eid)({'enableRateLimit': True})
-                self._exchanges[eid] = ex
-                logger.info(f"[SCANNER] {eid} connected (public API)")
-            except Exception as e:
-                logger.warning(f"[SCANNER] {eid} init failed: {e}")
+        # Shared public exchange connections (see data.exchange_registry)
+        self._exchanges: Dict[str, ccxt.Exchange] = registry.preload(EXCHANGE_IDS)
+        for eid in self._exchanges:
+            logger.info(f"[SCANNER] {eid} connected (public API)")
 
         # Load available symbols from the data exchange (for filtering)
         self._load_data_exchange_symbols()
@@ -78,29 +134,54 @@ class DynamicScanner:
         except Exception as e:
             logger.warning(f"[SCANNER] Could not load data exchange markets: {e}")
 
+    # ── Background refresh ──────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Refresh the universe on a schedule in a daemon thread."""
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name='dynamic-scanner')
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.wait(max(1.0, self._next_attempt - time.time())):
+            self.refresh()
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self.refresh, daemon=True, name='dynamic-scanner-refresh').start()
+
     @property
     def symbols(self) -> List[str]:
-        """Get cached symbol list, refreshing if stale."""
-        now = time.time()
-        if now - self._last_refresh > REFRESH_INTERVAL or not self._symbols:
-            self.refresh()
-        with self._lock:
-            return list(self._symbols)
+        """Last published symbol list; a stale one is served while it is rebuilt."""
+        universe = self._universe
+        if not universe.symbols:
+            self.refresh()   # Nothing to serve yet — first load blocks
+            universe = self._universe
+        elif time.time() >= self._next_attempt:
+            self._refresh_in_background()
+        return list(universe.symbols)
 
     def refresh(self) -> List[str]:
-        """Fetch from all exchanges in parallel, merge, and rank."""
+        """Fetch from all exchanges in parallel, merge, rank and publish."""
+        with self._refresh_lock:
+            return self._rebuild()
+
+    def _rebuild(self) -> List[str]:
         max_symbols = self.config.get('max_symbols', 50)
         min_volume = self.config.get('min_24h_volume_usdt', 1_000_000)
 
         # Fetch tickers from all exchanges in parallel
-        all_tickers: Dict[str, Dict] = {}  # exchange_id → {symbol: ticker_data}
+        all_tickers: Dict[str, Mapping] = {}  # exchange_id → {symbol: ticker_data}
 
         def _fetch_one(eid: str):
             ex = self._exchanges.get(eid)
             if not ex:
                 return eid, {}
             try:
-                tickers = ex.fetch_tickers()
+                tickers = ticker_hub.get(eid, client=ex, max_age=REFRESH_INTERVAL / 4)
                 return eid, tickers
             except Exception as e:
                 logger.warning(f"[SCANNER] {eid} ticker fetch failed: {e}")
@@ -118,60 +199,24 @@ class DynamicScanner:
                     logger.warning(f"[SCANNER] Ticker future failed: {e}")
 
         if not all_tickers:
+            self._next_attempt = time.time() + RETRY_INTERVAL
+            if self._universe.symbols:
+                logger.error("[SCANNER] All exchanges failed — keeping previous universe")
+                return list(self._universe.symbols)
             logger.error("[SCANNER] All exchanges failed — using defaults")
-            with self._lock:
-                self._symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT',
-                                 'DOGE/USDT', 'ADA/USDT', 'AVAX/USDT', 'DOT/USDT', 'MATIC/USDT']
-                self._last_refresh = time.time()
-            return self._symbols
-
-        # Merge: aggregate volume by base currency across all exchanges
-        merged: Dict[str, Dict] = {}  # base → {total_vol, symbol, exchanges}
-
-        for eid, tickers in all_tickers.items():
-            for symbol, data in tickers.items():
-                if '/USDT' not in symbol:
-                    continue
-                # Skip derivatives for symbol discovery
-                if ':' in symbol:
-                    continue
-
-                base = symbol.split('/')[0]
-                if base in BANNED_BASES:
-                    continue
-                if any(kw in base for kw in BANNED_KEYWORDS):
-                    continue
-
-                vol_24h = float(data.get('quoteVolume', 0) or 0)
-
-                if base not in merged:
-                    merged[base] = {
-                        'symbol': f"{base}/USDT",
-                        'total_volume': 0,
-                        'exchanges': [],
-                        'last_price': 0,
-                    }
-                merged[base]['total_volume'] += vol_24h
-                merged[base]['exchanges'].append(eid)
-                price = float(data.get('last', 0) or 0)
-                if price > 0:
-                    merged[base]['last_price'] = price
-
-        # Filter by minimum volume (MarketData handles exchange fallback for OHLCV)
-        candidates = [
-            v for v in merged.values()
-            if v['total_volume'] >= min_volume and len(v['exchanges']) >= 1
-        ]
-        candidates.sort(key=lambda x: x['total_volume'], reverse=True)
-        candidates = candidates[:max_symbols]
+            self._universe = _Universe(DEFAULT_SYMBOLS, {}, time.time())
+            return list(DEFAULT_SYMBOLS)
+
+        # Merge: aggregate volume by base currency across all exchanges,
+        # filter by minimum volume (MarketData handles exchange fallback for OHLCV)
+        candidates = merge_universe(all_tickers, min_volume, max_symbols)
 
         symbols = [c['symbol'] for c in candidates]
         exchange_map = {c['symbol']: c['exchanges'] for c in candidates}
 
-        with self._lock:
-            self._symbols = symbols
-            self._exchange_map = exchange_map
-            self._last_refresh = time.time()
+        # Publish atomically: readers see the old universe or the new one, never a mix
+        self._universe = _Universe(tuple(symbols), exchange_map, time.time())
+        self._next_attempt = time.time() + REFRESH_INTERVAL
 
         # Log summary
         sources = {eid for eid in all_tickers}
@@ -198,5 +243,4 @@ class DynamicScanner:
 
     def get_exchanges_for_symbol(self, symbol: str) -> List[str]:
         """Return which exchanges list this symbol."""
-        with self._lock:
-            return self._exchange_map.get(symbol, [])
+        return self._universe.exchange_map.get(symbol, [])
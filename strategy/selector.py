@@ -5,6 +5,7 @@ from typing import List, Optional
 from core.types import ScanResult
 from data.features import FeatureEngine
 from data.market import MarketData
+from data.ticker_hub import ticker_hub
 from strategy.regimes import RegimeDetector, MarketRegime
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,7 @@ class SymbolSelector:
 
     def get_top_pairs(self, limit: int = 5, min_volume_usdt: float = 10_000_000) -> List[str]:
         try:
-            tickers = self.exchange.fetch_tickers()
+            tickers = ticker_hub.get(self.exchange.id, client=self.exchange)
 
             candidates = []
 
@@ -78,8 +79,8 @@ class SymbolSelector:
             return []
 
         try:
-            # Step 1: Fetch tickers (1 API call), filter USDT spot pairs by volume
-            tickers = self.exchange.fetch_tickers()
+            # Step 1: Tickers (shared TickerHub snapshot), filter USDT spot pairs by volume
+            tickers = ticker_hub.get(self.exchange.id, client=self.exchange)
 
             candidates = []
             for symbol, data in tickers.items():